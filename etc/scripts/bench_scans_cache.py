@@ -0,0 +1,250 @@
+#!/usr/bin/python2
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import __builtin__
+from collections import OrderedDict
+from contextlib import contextmanager
+from hashlib import sha1
+import json
+import os
+from time import time
+
+import click
+click.disable_unicode_literals_warning = True
+
+from commoncode import fileutils
+
+from scancode.cache import get_scans_cache_class
+from scancode.cache import record_formats
+from scancode.cache import scans_cache_backends
+
+
+"""
+Benchmark the ScanCode scan results cache backends and record formats with
+synthetic file infos and scans. Ensure you are in the scancode virtualenv and
+call: etc/scripts/bench_scans_cache.py -h
+
+For example, to compare the backends on a million files:
+etc/scripts/bench_scans_cache.py --files 1000000
+
+Or to compare the record formats with the sqlite backend using the file infos
+and scans of an existing JSON scan as samples:
+etc/scripts/bench_scans_cache.py --backend sqlite --sample scan.json --files 500000
+
+Or to count the file system calls made per file when putting and getting file
+infos and scans:
+etc/scripts/bench_scans_cache.py --backend file --format json --syscalls
+"""
+
+
+# names of the os module functions counted as file system calls. Note that
+# os.path functions such as exists() or isdir() call os.stat().
+COUNTED_CALLS = ('stat', 'lstat', 'mkdir', 'rename', 'chmod', 'listdir', 'remove', 'unlink',)
+
+
+@contextmanager
+def counting_calls(counts):
+    """
+    Count the file system calls made in this context in the `counts` mapping of
+    {call name: count}. Only the calls made from Python are counted, not the
+    calls made by SQLite.
+    """
+    def counted(name, func):
+        def wrapper(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    originals = [(os, name, getattr(os, name)) for name in COUNTED_CALLS]
+    originals.append((__builtin__, 'open', __builtin__.open))
+    for module, name, func in originals:
+        setattr(module, name, counted(name, func))
+    try:
+        yield counts
+    finally:
+        for module, name, func in originals:
+            setattr(module, name, func)
+
+
+def get_file_info(path, i):
+    """
+    Return a synthetic file info mapping for a path.
+    """
+    info = OrderedDict()
+    info['path'] = path
+    info['type'] = 'file'
+    info['name'] = fileutils.file_name(path)
+    info['size'] = i
+    info['sha1'] = sha1(str(i)).hexdigest()
+    info['md5'] = None
+    info['is_text'] = True
+    info['scan_errors'] = []
+    return info
+
+
+def get_scan(i):
+    """
+    Return a synthetic scan result mapping.
+    """
+    lic = OrderedDict()
+    lic['key'] = 'gpl-2.0'
+    lic['score'] = 100.0
+    lic['short_name'] = 'GPL 2.0'
+    lic['category'] = 'Copyleft'
+    lic['start_line'] = 1
+    lic['end_line'] = i % 20 + 1
+    scan = OrderedDict()
+    scan['licenses'] = [lic]
+    scan['copyrights'] = [OrderedDict([('statements', ['Copyright (c) %d Foo' % i]), ('start_line', 1)])]
+    scan['scan_errors'] = []
+    return scan
+
+
+def get_samples(location):
+    """
+    Return a list of (file info, scan) tuples built from the files of the JSON
+    scan at `location`.
+    """
+    scan_names = ('licenses', 'copyrights', 'packages', 'emails', 'urls', 'scan_errors',)
+    with open(location, 'rb') as scan_file:
+        scan = json.load(scan_file, object_pairs_hook=OrderedDict)
+    samples = []
+    for scanned_file in scan['files']:
+        file_info = OrderedDict((k, v) for k, v in scanned_file.items() if k not in scan_names)
+        file_scan = OrderedDict((k, v) for k, v in scanned_file.items() if k in scan_names)
+        samples.append((file_info, file_scan))
+    return samples
+
+
+def disk_usage(location):
+    """
+    Return a tuple of (files count, size in bytes, allocated size in bytes) for
+    the files under `location`.
+    """
+    count = size = allocated = 0
+    for top, _dirs, files in os.walk(location):
+        for f in files:
+            count += 1
+            stat = os.stat(os.path.join(top, f))
+            size += stat.st_size
+            allocated += getattr(stat, 'st_blocks', 0) * 512
+    return count, size, allocated
+
+
+def bench(backend, record_format, files_count, samples=None, syscalls=False):
+    """
+    Run a benchmark for a cache `backend` and `record_format` and return a
+    mapping of measures. Use the `samples` list of (file info, scan) tuples as
+    cached data if provided. If `syscalls` is True, also return the number of
+    file system calls per file when putting and getting (this slows down the
+    benchmark).
+    """
+    cache_dir = fileutils.get_temp_dir('bench_scans_cache')
+    cache_class = get_scans_cache_class(cache_dir, backend=backend, record_format=record_format)
+    cache = cache_class()
+    paths = ['dir%d/file%d.c' % (i % 1000, i) for i in xrange(files_count)]
+
+    put_calls = {}
+    get_calls = {}
+    put_counter = counting_calls(put_calls) if syscalls else no_counting()
+    get_counter = counting_calls(get_calls) if syscalls else no_counting()
+
+    start = time()
+    with open(cache.cache_files_log, 'wb') as logfile_fd, put_counter:
+        for i, path in enumerate(paths):
+            cache.log_file_path(logfile_fd, path)
+            if samples:
+                file_info, scan = samples[i % len(samples)]
+                file_info = OrderedDict(file_info)
+                file_info['path'] = path
+                file_info['sha1'] = sha1(str(i)).hexdigest()
+            else:
+                file_info = get_file_info(path, i)
+                scan = get_scan(i)
+            cache.put_info(path, file_info)
+            cache.put_scan(path, file_info, scan)
+    put_time = time() - start
+
+    start = time()
+    with get_counter:
+        for _result in cache.iterate(['infos', 'licenses', 'copyrights']):
+            pass
+    iterate_time = time() - start
+
+    files, size, allocated = disk_usage(cache.cache_base_dir)
+    cache.clear()
+    fileutils.delete(cache_dir)
+    results = OrderedDict([
+        ('put_time', put_time),
+        ('puts_per_second', files_count / put_time),
+        ('iterate_time', iterate_time),
+        ('gets_per_second', files_count / iterate_time),
+        ('cache_files', files),
+        ('cache_bytes', size),
+        ('cache_allocated_bytes', allocated),
+    ])
+    if syscalls:
+        for phase, calls in (('put', put_calls), ('get', get_calls)):
+            per_file = ', '.join('%s: %.2f' % (name, count / files_count)
+                                 for name, count in sorted(calls.items()))
+            results[phase + '_syscalls_per_file'] = per_file
+    return results
+
+
+@contextmanager
+def no_counting():
+    yield
+
+
+@click.command()
+@click.option('--files', default=10000, show_default=True, help='Number of synthetic files to cache.')
+@click.option('--backend', multiple=True, type=click.Choice(list(scans_cache_backends)),
+              help='Cache backend to benchmark. Can be repeated. [default: all]')
+@click.option('--format', 'record_format', multiple=True, type=click.Choice(list(record_formats)),
+              help='Cache record format to benchmark. Can be repeated. [default: all]')
+@click.option('--sample', type=click.Path(exists=True, dir_okay=False, readable=True),
+              help='Use the file infos and scans of this JSON scan rather than small synthetic scans.')
+@click.option('--syscalls', is_flag=True, default=False,
+              help='Also count the file system calls per file made when putting and getting.')
+@click.help_option('-h', '--help')
+def cli(files, backend, record_format, sample, syscalls):
+    """
+    Benchmark putting and iterating scan results in the scans cache backends.
+    """
+    samples = sample and get_samples(sample)
+    for name in backend or scans_cache_backends:
+        for format_name in record_format or record_formats:
+            results = bench(name, format_name, files, samples, syscalls)
+            click.echo('%(name)s backend with %(format_name)s records and %(files)d files:' % locals())
+            for measure, value in results.items():
+                click.echo('  %(measure)s: %(value)r' % locals())
+
+
+if __name__ == '__main__':
+    cli()
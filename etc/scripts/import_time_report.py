@@ -0,0 +1,133 @@
+#!/usr/bin/python2
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import __builtin__
+import sys
+from time import time
+
+import click
+click.disable_unicode_literals_warning = True
+
+
+"""
+Report the time spent importing each module when importing a module such as
+scancode.cli, similar to the Python 3.7 "python -X importtime" option. Ensure
+you are in the scancode virtualenv and call: etc/scripts/import_time_report.py -h
+
+The self time of a module is the time spent importing this module excluding
+the time spent importing the other modules it imports. The cumulative time
+includes these imports.
+
+For example, to report the 20 slowest imports of the scancode CLI:
+etc/scripts/import_time_report.py --top 20 scancode.cli
+
+The ScanCode plugins are loaded on first use rather than on import. To also
+report the imports done when loading these plugins:
+etc/scripts/import_time_report.py --plugins scancode.cli
+"""
+
+
+def time_imports(func, *args):
+    """
+    Call `func` with `args` and return a tuple of (total time, list of (module
+    name, self time, cumulative time)) for each module imported by this call.
+    """
+    original_import = __builtin__.__import__
+    # stack of the time spent importing other modules for each import in progress
+    nested_times = []
+    timings = []
+
+    def timed_import(name, *args, **kwargs):
+        already_imported = set(sys.modules)
+        nested_times.append(0)
+        start = time()
+        try:
+            return original_import(name, *args, **kwargs)
+        finally:
+            cumulative = time() - start
+            nested = nested_times.pop()
+            if nested_times:
+                nested_times[-1] += cumulative
+            imported = [m for m in sys.modules if m not in already_imported and sys.modules[m]]
+            if imported:
+                timings.append((name, cumulative - nested, cumulative))
+
+    __builtin__.__import__ = timed_import
+    start = time()
+    try:
+        func(*args)
+    finally:
+        __builtin__.__import__ = original_import
+    return time() - start, timings
+
+
+def load_plugins():
+    """
+    Load all the ScanCode plugins.
+    """
+    import plugincode.output
+    import plugincode.post_scan
+    import plugincode.pre_scan
+    plugincode.pre_scan.initialize()
+    plugincode.output.initialize()
+    plugincode.post_scan.initialize()
+
+
+def echo_timings(timings, top):
+    """
+    Print the `top` slowest imports of a `timings` list.
+    """
+    click.echo('%10s %10s  %s' % ('self (ms)', 'cumul (ms)', 'module'))
+    for name, self_time, cumulative in sorted(timings, key=lambda t: t[1], reverse=True)[:top]:
+        click.echo('%10.1f %10.1f  %s' % (self_time * 1000, cumulative * 1000, name))
+
+
+@click.command()
+@click.argument('module', metavar='<module>', default='scancode.cli')
+@click.option('--top', default=30, show_default=True, help='Number of slowest imports to report.')
+@click.option('--plugins', is_flag=True, default=False,
+              help='Also report the imports done when loading the ScanCode plugins after importing <module>.')
+@click.help_option('-h', '--help')
+def cli(module, top, plugins):
+    """
+    Report the time spent importing each module when importing <module>.
+    """
+    total, timings = time_imports(__import__, module)
+    click.echo('Imported %s in %.3fs (%d modules loaded in total).' % (module, total, len(sys.modules)))
+    echo_timings(timings, top)
+
+    if plugins:
+        total, timings = time_imports(load_plugins)
+        click.echo('Loaded the plugins in %.3fs (%d modules loaded in total).' % (total, len(sys.modules)))
+        echo_timings(timings, top)
+
+
+if __name__ == '__main__':
+    cli()
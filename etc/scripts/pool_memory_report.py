@@ -0,0 +1,148 @@
+#!/usr/bin/python2
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import os
+import sys
+
+import click
+click.disable_unicode_literals_warning = True
+
+from commoncode import fileutils
+
+# Import early because this import has monkey-patching side effects
+from scancode.pool import get_pool
+
+from scancode.api import get_copyrights
+from scancode.api import get_licenses
+from scancode.cli import _init_scan_worker
+from scancode.cli import scan_one
+
+
+"""
+Report the resident memory (RSS) used by each scan pool worker process when
+scanning files for licenses and copyrights: when a worker starts, after its
+initialization and after scanning. Ensure you are in the scancode virtualenv and
+call: etc/scripts/pool_memory_report.py -h
+
+Note that the RSS of a forked worker includes the pages it still shares
+copy-on-write with the parent process such as a license index loaded in the
+parent.
+
+For example, to compare with and without worker initialization:
+etc/scripts/pool_memory_report.py --processes 4 samples
+etc/scripts/pool_memory_report.py --processes 4 --no-initializer samples
+"""
+
+
+def get_rss():
+    """
+    Return the resident set size in KB of the current process. Fall back to
+    the peak resident set size if the current size is not available.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # this is in bytes on macOS
+        rss = rss // 1024
+    return rss
+
+
+# per-worker process mapping of {stage: RSS}
+_worker_rss = OrderedDict()
+
+
+def init_worker(with_initializer):
+    """
+    Pool worker initializer recording the worker RSS before and after
+    initialization.
+    """
+    _worker_rss['start'] = get_rss()
+    if with_initializer:
+        _init_scan_worker(with_licenses=True, with_copyrights=True)
+    _worker_rss['init'] = get_rss()
+
+
+def scan_file(location):
+    """
+    Scan the file at `location` and return a tuple of (process id, mapping of
+    {stage: RSS}).
+    """
+    scanners = OrderedDict([('licenses', get_licenses), ('copyrights', get_copyrights)])
+    scan_one(location, scanners)
+    _worker_rss['scanned'] = get_rss()
+    return os.getpid(), _worker_rss.copy()
+
+
+@click.command()
+@click.argument('input', metavar='<input>', type=click.Path(exists=True, readable=True))
+@click.option('--processes', default=2, show_default=True, help='Number of worker processes.')
+@click.option('--parent-index/--no-parent-index', default=True, show_default=True,
+              help='Load the license index in the parent process before starting the workers.')
+@click.option('--initializer/--no-initializer', default=True, show_default=True,
+              help='Initialize each worker with the scan worker initializer.')
+@click.help_option('-h', '--help')
+def cli(input, processes, parent_index, initializer):
+    """
+    Report the memory used by each scan pool worker after scanning the files in <input>.
+    """
+    if parent_index:
+        from licensedcode.cache import get_index
+        get_index(False)
+    click.echo('Parent RSS: %d KB' % get_rss())
+
+    files = [f for f in fileutils.resource_iter(input, with_dirs=False)]
+    pool = get_pool(processes=processes, initializer=init_worker, initargs=(initializer,))
+    try:
+        workers = OrderedDict()
+        for pid, rss in pool.imap_unordered(scan_file, files, chunksize=1):
+            workers[pid] = rss
+        pool.close()
+        pool.join()
+    finally:
+        pool.terminate()
+
+    click.echo('Scanned %d files with %d processes.' % (len(files), processes))
+    click.echo('Worker RSS in KB:')
+    click.echo('  %8s %10s %10s %10s' % ('pid', 'start', 'init', 'scanned'))
+    for pid, rss in sorted(workers.items()):
+        click.echo('  %8d %10d %10d %10d' % (pid, rss['start'], rss['init'], rss['scanned']))
+    total = sum(rss['scanned'] for rss in workers.values())
+    click.echo('Total workers RSS: %(total)d KB' % locals())
+
+
+if __name__ == '__main__':
+    cli()
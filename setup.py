@@ -197,6 +197,8 @@ setup(
         'console_scripts': [
             'scancode = scancode.cli:scancode',
             'extractcode = scancode.extract_cli:extractcode',
+            'scancode-merge = scancode.merge_cli:scancode_merge',
+            'scancode-serve = scancode.serve_cli:scancode_serve',
         ],
 
         # scancode_output_writers is an entry point to define plugins
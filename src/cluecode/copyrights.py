@@ -60,20 +60,40 @@ The process consists in:
 """
 
 
-def detect_copyrights(location):
+def detect_copyrights(location, deadline=None):
     """
     Yield tuples of:
     (copyrights list, authors list, years list, holders list, start line, end line)
     detected in file at location.
+
+    If `deadline` is a commoncode.timeutils.Deadline, stop the detection once
+    this deadline has expired: `deadline.reached` is then True.
     """
-    detector = CopyrightDetector()
+    detector = get_detector()
     for numbered_lines in candidate_lines(analysis.text_lines(location)):
+        if deadline and deadline.expired():
+            break
         detected = detector.detect(numbered_lines)
         cp, auth, yr, hold, _start, _end = detected
         if any([cp, auth, yr, hold]):
             yield detected
 
 
+# global in-memory cache of a CopyrightDetector: building its tagger and parser
+# is costly and a detector can be reused for any number of files
+_DETECTOR = None
+
+
+def get_detector():
+    """
+    Return a cached CopyrightDetector.
+    """
+    global _DETECTOR
+    if not _DETECTOR:
+        _DETECTOR = CopyrightDetector()
+    return _DETECTOR
+
+
 def detect(location):
     """
     Return lists of detected copyrights, authors, years and holders
@@ -32,7 +32,6 @@ import re
 import logging
 import unicodedata
 
-import chardet
 from text_unidecode import unidecode
 
 
@@ -226,6 +225,8 @@ def as_unicode(s):
         return s.decode('utf-8')
     except UnicodeDecodeError:
         try:
+            # chardet is slow to import and rarely needed
+            import chardet
             encoding = chardet.detect(s)
             if encoding:
                 encoding = encoding.get('encoding')
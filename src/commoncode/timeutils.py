@@ -26,6 +26,7 @@ from __future__ import absolute_import, print_function
 
 
 from datetime import datetime, tzinfo
+from time import time
 
 """
 Time is of the essence: path safe time stamps creation and conversion to
@@ -99,3 +100,26 @@ def tstamp2time(stamp):
         if 0 <= microsec <= 999999:
             datim = datim.replace(microsecond=microsec)
     return datim
+
+
+class Deadline(object):
+    """
+    A soft time limit checked cooperatively by long running code: call
+    expired() regularly and stop early, returning partial results, when it
+    returns True. `reached` is True once expired() has returned True.
+    A `timeout` of None or zero never expires.
+    """
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.end = time() + timeout if timeout else None
+        self.reached = False
+
+    def expired(self):
+        """
+        Return True if this deadline is past.
+        """
+        if self.end is None:
+            return False
+        if not self.reached and time() >= self.end:
+            self.reached = True
+        return self.reached
@@ -29,8 +29,6 @@ from __future__ import unicode_literals
 
 from collections import OrderedDict
 
-import unicodecsv
-
 from plugincode.output import scan_output_writer
 
 
@@ -62,6 +60,7 @@ def write_csv(scanned_files, output_file, *args, **kwargs):
     for key_group in headers.values():
         ordered_headers.extend(key_group)
 
+    import unicodecsv
     w = unicodecsv.DictWriter(output_file, ordered_headers)
     w.writeheader()
 
@@ -52,15 +52,48 @@ def write_json_pretty_printed(files_count, version, notice, scanned_files, optio
     _write_json(files_count, version, notice, scanned_files, options, output_file, pretty=True)
 
 
+class FilesCount(object):
+    """
+    The count of the scanned files of a `scanned_files` iterable known once
+    these files are iterated and serialized as a JSON number.
+    """
+    def __init__(self, scanned_files):
+        self.count = 0
+        self.scanned_files = self.counted(scanned_files)
+
+    def counted(self, scanned_files):
+        for scanned_file in scanned_files:
+            self.count += 1
+            yield scanned_file
+
+    def for_json(self):
+        return self.count
+
+
 def _write_json(files_count, version, notice, scanned_files, options, output_file, pretty=False):
-    scan = OrderedDict([
-        ('scancode_notice', notice),
-        ('scancode_version', version),
-        ('scancode_options', options),
-        ('files_count', files_count),
-        ('files', scanned_files),
-    ])
-    kwargs = dict(iterable_as_array=True, encoding='utf-8')
+    """
+    Write scan output formatted as JSON. If `files_count` is None, the files
+    are counted as they are written and the files count is written last.
+    """
+    if files_count is None:
+        # such as for a streamed scan: the count is known at the end
+        files_count = FilesCount(scanned_files)
+        scan = OrderedDict([
+            ('scancode_notice', notice),
+            ('scancode_version', version),
+            ('scancode_options', options),
+            ('files', files_count.scanned_files),
+            ('files_count', files_count),
+        ])
+    else:
+        scan = OrderedDict([
+            ('scancode_notice', notice),
+            ('scancode_version', version),
+            ('scancode_options', options),
+            ('files_count', files_count),
+            ('files', scanned_files),
+        ])
+    kwargs = dict(iterable_as_array=True, for_json=True, encoding='utf-8')
     if pretty:
         kwargs['indent'] = 2 * ' '
     else:
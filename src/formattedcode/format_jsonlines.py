@@ -29,6 +29,7 @@ from collections import OrderedDict
 
 import simplejson
 
+from commoncode.fileutils import path_to_unicode
 from plugincode.output import scan_output_writer
 
 
@@ -38,23 +39,44 @@ Output plugins to write scan results as JSON Lines.
 
 
 @scan_output_writer
-def write_jsonlines(files_count, version, notice, scanned_files, options, output_file, *args, **kwargs):
+def write_jsonlines(files_count, version, notice, scanned_files, options, output_file, input=None,  # @ReservedAssignment
+                    tag_input=False, *args, **kwargs):
     """
-    Write scan output formatted as JSON Lines.
+    Write scan output formatted as JSON Lines. If `tag_input` is True, each line
+    is tagged with the scanned `input` path such that the scans of several
+    inputs can be written to the same output.
+
+    If `files_count` is None, the files are counted as they are written and the
+    files count is written last in a second header line.
     """
     header = dict(header=OrderedDict([
         ('scancode_notice', notice),
         ('scancode_version', version),
         ('scancode_options', options),
-        ('files_count', files_count)
     ]))
+    if files_count is not None:
+        header['header']['files_count'] = files_count
+    tag = {}
+    if tag_input:
+        tag = dict(input=path_to_unicode(input))
+        header['header']['input'] = tag['input']
 
     kwargs = dict(iterable_as_array=True, encoding='utf-8', separators=(',', ':',))
 
     output_file.write(simplejson.dumps(header, **kwargs))
     output_file.write('\n')
 
+    count = 0
     for scanned_file in scanned_files:
+        count += 1
         scanned_file_line = {'files': [scanned_file]}
+        scanned_file_line.update(tag)
         output_file.write(simplejson.dumps(scanned_file_line, **kwargs))
         output_file.write('\n')
+
+    if files_count is None:
+        # such as for a streamed scan: the count is known at the end
+        count_header = dict(header=OrderedDict([('files_count', count)]))
+        count_header['header'].update(tag)
+        output_file.write(simplejson.dumps(count_header, **kwargs))
+        output_file.write('\n')
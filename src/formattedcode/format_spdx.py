@@ -30,17 +30,6 @@ from __future__ import unicode_literals
 import os
 from os.path import abspath
 
-from spdx.checksum import Algorithm
-from spdx.creationinfo import Tool
-from spdx.document import Document
-from spdx.document import License
-from spdx.document import ExtractedLicense
-from spdx.file import File
-from spdx.package import Package
-from spdx.utils import NoAssert
-from spdx.utils import SPDXNone
-from spdx.version import Version
-
 from plugincode.output import scan_output_writer
 
 
@@ -68,6 +57,19 @@ def write_spdx(version, notice, scanned_files, input, output_file, as_tagvalue=T
     """
     Write scan output formatted as SPDX Tag/value or RDF.
     """
+    # the spdx library is imported only when writing SPDX output as this is a
+    # slow import and the output plugins are loaded on every scancode run
+    from spdx.checksum import Algorithm
+    from spdx.creationinfo import Tool
+    from spdx.document import Document
+    from spdx.document import License
+    from spdx.document import ExtractedLicense
+    from spdx.file import File
+    from spdx.package import Package
+    from spdx.utils import NoAssert
+    from spdx.utils import SPDXNone
+    from spdx.version import Version
+
     absinput = abspath(input)
 
     if os.path.isdir(absinput):
@@ -112,7 +112,7 @@ def get_or_build_index_through_cache(
     _licenses_data_dir = _licenses_data_dir or licenses_data_dir
     _rules_data_dir = _rules_data_dir or rules_data_dir
 
-    has_cache = exists(_index_cache_file)
+    has_cache = exists(_index_cache_file) and exists(_arrays_file(_index_cache_file))
     has_tree_checksum = exists(_tree_checksum_file)
 
     # bypass check if no consistency check is needed
@@ -145,7 +145,7 @@ def get_or_build_index_through_cache(
                 rules_data_dir=_rules_data_dir)
             idx = LicenseIndex(rules)
             with open(_index_cache_file, 'wb') as ifc:
-                ifc.write(idx.dumps())
+                ifc.write(idx.dumps(_arrays_file(_index_cache_file)))
 
             # save the new checksums tree
             with open(_tree_checksum_file, 'wb') as ctcs:
@@ -166,10 +166,18 @@ def _load_index(_index_cache_file=index_cache_file):
 
     with open(_index_cache_file, 'rb') as ifc:
         # Note: weird but read() + loads() is much (twice++???) faster than load()
-        idx = LicenseIndex.loads(ifc.read())
+        idx = LicenseIndex.loads(ifc.read(), _arrays_file(_index_cache_file))
     return idx
 
 
+def _arrays_file(_index_cache_file=index_cache_file):
+    """
+    Return the location of the memory-mapped arrays file saved alongside an
+    index cache file.
+    """
+    return _index_cache_file + '_arrays'
+
+
 """Check the license index and reindex if needed."""
 reindex = partial(get_or_build_index_through_cache, check_consistency=True, return_index=False)
 
@@ -43,6 +43,7 @@ from commoncode.dict_utils import sparsify
 from licensedcode import MAX_DIST
 from licensedcode.cache import get_index
 from licensedcode.frequent_tokens import global_tokens_by_ranks
+from licensedcode import mapped
 
 from licensedcode import match
 from licensedcode import match_aho
@@ -405,12 +406,16 @@ class LicenseIndex(object):
                     print('  MATCHED RULE TEXT:', it)
                     print()
 
-    def match(self, location=None, query_string=None, min_score=0, detect_negative=True):
+    def match(self, location=None, query_string=None, min_score=0, detect_negative=True, deadline=None):
         """
         Return a sequence of LicenseMatch by matching the file at `location` or
         the `query_string` text against the index. Only include matches with
         scores greater or equal to `min_score`.
 
+        If `deadline` is a commoncode.timeutils.Deadline, the costly per query
+        run matching stops once this deadline has expired and only the matches
+        found so far are returned: `deadline.reached` is then True.
+
         `detect_negative` is for testing purpose only.
         """
         assert 0 <= min_score <= 100
@@ -481,6 +486,10 @@ class LicenseIndex(object):
             rules_subset = (self.regular_rids | self.small_rids)
 
             for qrnum, query_run in enumerate(qry.query_runs, 1):
+                if deadline and deadline.expired():
+                    if TRACE: logger_debug('#match: deadline reached at query run #:', qrnum)
+                    break
+
                 if TRACE_QUERY_RUN_SIMPLE:
                     logger_debug('#match: ===> processing query run #:', qrnum)
                     logger_debug('  #match:query_run:', query_run)
@@ -511,6 +520,8 @@ class LicenseIndex(object):
                 if TRACE_CANDIDATES: logger_debug('      #match: query_run: number of candidates for seq match #', len(candidates))
 
                 for candidate_num, candidate in enumerate(candidates):
+                    if deadline and deadline.expired():
+                        break
                     if TRACE_QUERY_RUN:
                         _, canrule, _ = candidate
                         logger_debug('         #match: query_run: seq matching candidate#:', candidate_num, 'candidate:', canrule)
@@ -635,22 +646,43 @@ class LicenseIndex(object):
         return u' '.join('None' if t is None else self.tokens_by_tid[t] for t in tokens)
 
     @staticmethod
-    def loads(saved):
+    def loads(saved, arrays_location=None):
         """
         Return a LicenseIndex from a pickled string.
+
+        If `arrays_location` is provided, the pickled string must have been
+        created with dumps() using the same `arrays_location` and the rules
+        token ids, postings and multisets are memory-mapped from this file.
         """
         idx = cPickle.loads(saved)
+        if arrays_location:
+            idx, layout = idx
+            mapped.load_index_arrays(idx, arrays_location, layout)
         # perform some optimizations on the dictionaries
         sparsify(idx.dictionary)
         return idx
 
-    def dumps(self):
+    def dumps(self, arrays_location=None):
         """
         Return a pickled string of self.
+
+        If `arrays_location` is provided, the rules token ids, postings and
+        multisets are saved as flat arrays in a file at this location rather
+        than pickled such that they can be memory-mapped and shared across
+        processes when loaded.
         """
         # here cPickle fails. Pickle is slower but works
         import pickle
-        return pickle.dumps(self, protocol=cPickle.HIGHEST_PROTOCOL)
+        if not arrays_location:
+            return pickle.dumps(self, protocol=cPickle.HIGHEST_PROTOCOL)
+
+        layout = mapped.dump_index_arrays(self, arrays_location)
+        arrays = self.tids_by_rid, self.high_postings_by_rid, self.tids_msets_by_rid
+        self.tids_by_rid = self.high_postings_by_rid = self.tids_msets_by_rid = None
+        try:
+            return pickle.dumps((self, layout), protocol=cPickle.HIGHEST_PROTOCOL)
+        finally:
+            self.tids_by_rid, self.high_postings_by_rid, self.tids_msets_by_rid = arrays
 
     def renumber_token_ids(self, frequencies_by_old_tid, _ranked_tokens=global_tokens_by_ranks):
         """
@@ -0,0 +1,290 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from abc import ABCMeta
+from abc import abstractmethod
+from array import array
+from collections import defaultdict
+from collections import OrderedDict
+import ctypes
+import mmap
+import os
+
+from commoncode.dict_utils import sparsify
+from commoncode.system import on_windows
+
+
+"""
+Memory-mapped storage for the large numeric structures of a LicenseIndex.
+
+A cached LicenseIndex is saved as a pickle and a separate file of flat arrays of
+32 bits integers. The rules token ids sequences, high postings and token ids
+multisets are stored in these arrays rather than pickled. When a cached index is
+loaded, this arrays file is memory-mapped and these structures are read from the
+mapped file instead of being unpickled in each process private memory: every
+process that loads the index shares the same memory pages through the OS page
+cache regardless of the number of processes.
+
+The token ids sequences are exposed as ctypes arrays viewing the mapped memory.
+The postings and multisets mappings are built from the mapped arrays when first
+accessed and only a limited number of these are kept cached in memory.
+"""
+
+
+# 32 bits integers for all the flat arrays
+ARRAY_TYPECODE = b'i'
+ARRAY_CTYPE = ctypes.c_int32
+ARRAY_ITEMSIZE = ctypes.sizeof(ARRAY_CTYPE)
+
+# maximum number of mappings built from the mapped arrays kept in memory
+MAPPINGS_CACHE_SIZE = 1000
+
+
+def dump_index_arrays(idx, location):
+    """
+    Save the token ids sequences, high postings and token ids multisets of a
+    LicenseIndex `idx` as flat arrays to a file at `location`. Return a layout
+    mapping of {array name: (offset, length)} for the saved arrays.
+    """
+    arrays = OrderedDict()
+
+    offsets, tids = flatten_sequences(idx.tids_by_rid)
+    arrays['tids_offsets'] = offsets
+    arrays['tids'] = tids
+
+    starts, ends, keys, positions = flatten_mappings(idx.high_postings_by_rid)
+    offsets, positions = flatten_sequences(positions)
+    arrays['postings_starts'] = starts
+    arrays['postings_ends'] = ends
+    arrays['postings_tids'] = keys
+    arrays['postings_offsets'] = offsets
+    arrays['postings_positions'] = positions
+
+    msets = [msets or (None, None) for msets in idx.tids_msets_by_rid]
+    low_msets, high_msets = zip(*msets) if msets else ([], [])
+    for prefix, msets in (('low_msets', low_msets), ('high_msets', high_msets),):
+        starts, ends, keys, counts = flatten_mappings(msets)
+        arrays[prefix + '_starts'] = starts
+        arrays[prefix + '_ends'] = ends
+        arrays[prefix + '_tids'] = keys
+        arrays[prefix + '_counts'] = counts
+
+    layout = OrderedDict()
+    offset = 0
+    # write to a new file and rename it such that processes that have mapped an
+    # existing file at this location keep a valid mapping
+    tmp_location = location + '.tmp'
+    with open(tmp_location, 'wb') as out:
+        for name, values in arrays.items():
+            values = array(ARRAY_TYPECODE, values)
+            values.tofile(out)
+            layout[name] = offset, len(values)
+            offset += len(values) * values.itemsize
+    if on_windows and os.path.exists(location):
+        os.remove(location)
+    os.rename(tmp_location, location)
+    return layout
+
+
+def load_index_arrays(idx, location, layout):
+    """
+    Attach to a LicenseIndex `idx` the token ids sequences, high postings and
+    token ids multisets read from the file at `location` memory-mapped using the
+    `layout` mapping returned by dump_index_arrays().
+    """
+    arrays = MappedArrays(location, layout)
+    idx.tids_by_rid = arrays.sequences('tids_offsets', 'tids')
+    idx.high_postings_by_rid = MappedPostings(arrays)
+    idx.tids_msets_by_rid = MappedMultisets(arrays)
+
+
+def flatten_sequences(sequences):
+    """
+    Return a tuple of (offsets, values) flat lists given a `sequences` list of
+    sequences of integers such that the sequence at index `i` is
+    values[offsets[i]:offsets[i + 1]].
+    """
+    offsets = [0]
+    values = []
+    for sequence in sequences:
+        values.extend(sequence)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def flatten_mappings(mappings):
+    """
+    Return a tuple of (starts, ends, keys, values) flat lists given a `mappings`
+    list of mappings (or None) of {integer: value} such that the items of the
+    mapping at index `i` sorted by key are the items of keys[starts[i]:ends[i]]
+    and values[starts[i]:ends[i]]. starts[i] and ends[i] are -1 for a None
+    mapping.
+    """
+    starts = []
+    ends = []
+    keys = []
+    values = []
+    for mapping in mappings:
+        if mapping is None:
+            starts.append(-1)
+            ends.append(-1)
+            continue
+        starts.append(len(keys))
+        for key, value in sorted(mapping.items()):
+            keys.append(key)
+            values.append(value)
+        ends.append(len(keys))
+    return starts, ends, keys, values
+
+
+class MappedArrays(object):
+    """
+    Named flat arrays of integers read from a memory-mapped file.
+    """
+    def __init__(self, location, layout):
+        self.location = location
+        self.layout = layout
+        with open(location, 'rb') as arrays_file:
+            # a private copy-on-write mapping is never written to but ctypes
+            # needs a writable buffer to create array views on this mapping.
+            self.mmap = mmap.mmap(arrays_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    def view(self, name, start=0, end=None):
+        """
+        Return a ctypes array of integers viewing the mapped memory of the
+        `name` array from `start` to `end` index positions.
+        """
+        offset, length = self.layout[name]
+        if end is None:
+            end = length
+        array_type = ARRAY_CTYPE * (end - start)
+        return array_type.from_buffer(self.mmap, offset + start * ARRAY_ITEMSIZE)
+
+    def sequences(self, offsets_name, values_name):
+        """
+        Return a list of ctypes arrays of integers viewing the sequences saved
+        with flatten_sequences() in the `offsets_name` and `values_name` arrays.
+        """
+        offsets = self.view(offsets_name)
+        return [self.view(values_name, offsets[i], offsets[i + 1])
+                for i in range(len(offsets) - 1)]
+
+
+class MappedMappings(object):
+    """
+    A read-only list-like of mappings (or None) built on demand from the flat
+    arrays of MappedArrays and cached up to MAPPINGS_CACHE_SIZE mappings.
+    Subclasses must implement __len__() and build().
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.cache = {}
+
+    @abstractmethod
+    def __len__(self):
+        """
+        Return the number of mappings.
+        """
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        try:
+            return self.cache[index]
+        except KeyError:
+            pass
+        mapping = self.build(index)
+        if len(self.cache) >= MAPPINGS_CACHE_SIZE:
+            self.cache.clear()
+        self.cache[index] = mapping
+        return mapping
+
+    @abstractmethod
+    def build(self, index):
+        """
+        Return a mapping or None built from the arrays for `index`.
+        """
+
+    def items(self, prefix, index):
+        """
+        Return a tuple of (keys, values start) ctypes arrays for the mapping at
+        `index` saved with flatten_mappings() in the `prefix` arrays or None for
+        a None mapping.
+        """
+        start = self.arrays.view(prefix + '_starts', index, index + 1)[0]
+        if start < 0:
+            return
+        end = self.arrays.view(prefix + '_ends', index, index + 1)[0]
+        return self.arrays.view(prefix + '_tids', start, end), start
+
+
+class MappedPostings(MappedMappings):
+    """
+    A list-like of rule id -> high postings mapping of {token id: positions}
+    where positions are ctypes arrays of integers.
+    """
+    def __len__(self):
+        return self.arrays.layout['postings_starts'][1]
+
+    def build(self, index):
+        items = self.items('postings', index)
+        if items is None:
+            return
+        tids, start = items
+        offsets = self.arrays.view('postings_offsets', start, start + len(tids) + 1)
+        view = self.arrays.view
+        postings = {tid: view('postings_positions', offsets[i], offsets[i + 1])
+                    for i, tid in enumerate(tids)}
+        sparsify(postings)
+        return postings
+
+
+class MappedMultisets(MappedMappings):
+    """
+    A list-like of rule id -> (low tids multiset, high tids multiset) where each
+    multiset is a defaultdict of {token id: count}.
+    """
+    def __len__(self):
+        return self.arrays.layout['low_msets_starts'][1]
+
+    def build(self, index):
+        msets = []
+        for prefix in ('low_msets', 'high_msets',):
+            items = self.items(prefix, index)
+            if items is None:
+                return
+            tids, start = items
+            counts = self.arrays.view(prefix + '_counts', start, start + len(tids))
+            mset = defaultdict(int, zip(tids, counts))
+            sparsify(mset)
+            msets.append(mset)
+        return tuple(msets)
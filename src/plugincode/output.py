@@ -45,7 +45,9 @@ def write_output(files_count, version, notice, scanned_files, options, input, ou
     Write the `scanned_files` scan results in the format supplied by
     the --format command line option.
     Parameters:
-     - `file_count`: the number of files and directories scanned.
+     - `file_count`: the number of files and directories scanned or None if
+        this number is not known before writing the `scanned_files` such as
+        when streaming.
      - `version`: ScanCode version
      - `notice`: ScanCode notice
      - `scanned_files`: an iterable of scan results for each file
@@ -61,12 +63,21 @@ def write_output(files_count, version, notice, scanned_files, options, input, ou
 output_plugins = PluginManager('scan_output_writer')
 output_plugins.add_hookspecs(sys.modules[__name__])
 
+# True once the plugins are loaded: these are loaded on first use rather than
+# on import as loading the entry points is slow
+_initialized = False
+
 
 def initialize():
     """
+    Load the output plugins once.
     NOTE: this defines the entry points for use in setup.py
     """
+    global _initialized
+    if _initialized:
+        return
     output_plugins.load_setuptools_entrypoints('scancode_output_writers')
+    _initialized = True
 
 
 def get_format_plugins():
@@ -75,4 +86,5 @@ def get_format_plugins():
     the output plugins. The mapping is ordered by sorted key.
     This is the main API for other code to access format plugins.
     """
+    initialize()
     return OrderedDict(sorted(output_plugins.list_name_plugin()))
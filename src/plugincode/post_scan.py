@@ -51,12 +51,21 @@ def post_scan_handler(active_scans, results):
 post_scan_plugins = PluginManager('post_scan')
 post_scan_plugins.add_hookspecs(sys.modules[__name__])
 
+# True once the plugins are loaded: these are loaded on first use rather than
+# on import as loading the entry points is slow
+_initialized = False
+
 
 def initialize():
     """
+    Load the post-scan plugins once.
     NOTE: this defines the entry points for use in setup.py
     """
+    global _initialized
+    if _initialized:
+        return
     post_scan_plugins.load_setuptools_entrypoints('scancode_post_scan')
+    _initialized = True
 
 
 def get_post_scan_plugins():
@@ -66,4 +75,5 @@ def get_post_scan_plugins():
     for all the post_scan plugins. The mapping is sorted by option name.
     This is the main API for other code to access post_scan plugins.
     """
+    initialize()
     return OrderedDict(sorted(post_scan_plugins.list_name_plugin()))
@@ -67,13 +67,25 @@ class PreScanPlugin(object):
 pre_scan_plugins = PluginManager('pre_scan')
 pre_scan_plugins.add_hookspecs(sys.modules[__name__])
 
+# True once the plugins are loaded: these are loaded on first use rather than
+# on import as loading the entry points is slow
+_initialized = False
+
 
 def initialize():
-    # NOTE: this defines the entry points for use in setup.py
+    """
+    Load the pre-scan plugins once.
+    NOTE: this defines the entry points for use in setup.py
+    """
+    global _initialized
+    if _initialized:
+        return
     pre_scan_plugins.load_setuptools_entrypoints('scancode_pre_scan')
-    for name, plugin in get_pre_scan_plugins().items():
+    for name, plugin in sorted(pre_scan_plugins.list_name_plugin()):
         if not issubclass(plugin, PreScanPlugin):
             raise Exception('Invalid pre-scan plugin "%(name)s": does not extend "plugincode.pre_scan.PreScanPlugin".' % locals())
+    _initialized = True
+
 
 def get_pre_scan_plugins():
     """
@@ -81,4 +93,5 @@ def get_pre_scan_plugins():
     for all the pre_scan plugins. The mapping is ordered by sorted key.
     This is the main API for other code to access pre_scan plugins.
     """
+    initialize()
     return OrderedDict(sorted(pre_scan_plugins.list_name_plugin()))
@@ -57,6 +57,14 @@ class Resource(object):
         self.rel_path = get_relative_path(posix_path, len_base_path, base_is_dir)
         self.infos = OrderedDict()
         self.infos['path'] = self.rel_path
+        # scan details reused from a previous scan if this file is unchanged
+        self.reused_scan = None
+        # the key of the file infos of this file in a persistent scans store
+        # such as the key of a git blob: the infos are stored once collected
+        self.stored_info_key = None
+        # file infos reused from a persistent scans store for a file that is
+        # not on disk such as a git blob that was not exported
+        self.stored_infos = None
 
     def put_info(self, infos):
         """
@@ -84,13 +92,16 @@ def extract_archives(location, recurse=True):
         yield xevent
 
 
-def get_copyrights(location):
+def get_copyrights(location, deadline=None):
     """
     Yield mappings of copyright data detected in the file at `location`.
+
+    If `deadline` is a commoncode.timeutils.Deadline, only the copyrights
+    detected before this deadline expires are returned.
     """
     from cluecode.copyrights import detect_copyrights
 
-    for copyrights, authors, _years, holders, start_line, end_line in detect_copyrights(location):
+    for copyrights, authors, _years, holders, start_line, end_line in detect_copyrights(location, deadline=deadline):
         result = OrderedDict()
         # FIXME: we should call this copyright instead, and yield one item per statement
         result['statements'] = copyrights
@@ -135,7 +146,44 @@ DEJACODE_LICENSE_URL = 'https://enterprise.dejacode.com/urn/urn:dje:license:{}'
 SPDX_LICENSE_URL = 'https://spdx.org/licenses/{}'
 
 
-def get_licenses(location, min_score=0, include_text=False, diag=False, license_url_template=DEJACODE_LICENSE_URL):
+# the fields of a license match that only depend on the matched license key
+LICENSE_DETAILS = (
+    'short_name', 'category', 'owner', 'homepage_url', 'text_url',
+    'reference_url', 'spdx_license_key', 'spdx_url',
+)
+
+
+def get_license_details(license_key, license_url_template=DEJACODE_LICENSE_URL):
+    """
+    Return a mapping of the LICENSE_DETAILS of the license with `license_key`
+    or None if there is no such license.
+    """
+    from licensedcode.cache import get_licenses_db
+
+    lic = get_licenses_db().get(license_key)
+    if not lic:
+        return
+    details = OrderedDict()
+    details['short_name'] = lic.short_name
+    details['category'] = lic.category
+    details['owner'] = lic.owner
+    details['homepage_url'] = lic.homepage_url
+    details['text_url'] = lic.text_urls[0] if lic.text_urls else ''
+    details['reference_url'] = license_url_template.format(lic.key)
+    spdx_key = lic.spdx_license_key
+    details['spdx_license_key'] = spdx_key
+    if spdx_key:
+        spdx_key = lic.spdx_license_key.rstrip('+')
+        spdx_url = SPDX_LICENSE_URL.format(spdx_key)
+    else:
+        spdx_url = ''
+    details['spdx_url'] = spdx_url
+    return details
+
+
+def get_licenses(location, min_score=0, include_text=False, diag=False,
+                 license_url_template=DEJACODE_LICENSE_URL, deadline=None,
+                 with_details=True):
     """
     Yield mappings of license data detected in the file at `location`.
 
@@ -149,35 +197,27 @@ def get_licenses(location, min_score=0, include_text=False, diag=False, license_
 
     If `diag` is True, additional match details are returned with the
     matched_rule key of the returned mapping.
+
+    If `deadline` is a commoncode.timeutils.Deadline, only the licenses
+    matched before this deadline expires are returned.
+
+    If `with_details` is False, the LICENSE_DETAILS of the matched licenses
+    are not returned: only the license key and the match-specific data are.
+    Use expand_license_details() to add these details back.
     """
     from licensedcode.cache import get_index
-    from licensedcode.cache import get_licenses_db
 
     idx = get_index()
-    licenses = get_licenses_db()
 
-    for match in idx.match(location=location, min_score=min_score):
+    for match in idx.match(location=location, min_score=min_score, deadline=deadline):
         if include_text:
             matched_text = match.matched_text(whole_lines=False)
         for license_key in match.rule.licenses:
-            lic = licenses.get(license_key)
             result = OrderedDict()
-            result['key'] = lic.key
+            result['key'] = license_key
             result['score'] = match.score()
-            result['short_name'] = lic.short_name
-            result['category'] = lic.category
-            result['owner'] = lic.owner
-            result['homepage_url'] = lic.homepage_url
-            result['text_url'] = lic.text_urls[0] if lic.text_urls else ''
-            result['reference_url'] = license_url_template.format(lic.key)
-            spdx_key = lic.spdx_license_key
-            result['spdx_license_key'] = spdx_key
-            if spdx_key:
-                spdx_key = lic.spdx_license_key.rstrip('+')
-                spdx_url = SPDX_LICENSE_URL.format(spdx_key)
-            else:
-                spdx_url = ''
-            result['spdx_url'] = spdx_url
+            if with_details:
+                result.update(get_license_details(license_key, license_url_template) or {})
             result['start_line'] = match.start_line
             result['end_line'] = match.end_line
             matched_rule = result['matched_rule'] = OrderedDict()
@@ -197,6 +237,48 @@ def get_licenses(location, min_score=0, include_text=False, diag=False, license_
             yield result
 
 
+def expand_license_details(scan_results, license_url_template=DEJACODE_LICENSE_URL):
+    """
+    Yield the `scan_results` iterable of scan result mappings adding the
+    LICENSE_DETAILS to their license matches obtained with get_licenses() and
+    `with_details` False. The details of a license are only built once per
+    license key. License matches that have their details already are unchanged.
+    """
+    # mapping of {license key: details}, None for unknown licenses
+    details_by_key = {}
+    for scan_result in scan_results:
+        licenses = scan_result and scan_result.get('licenses')
+        if licenses:
+            scan_result['licenses'] = [
+                _with_license_details(match, details_by_key, license_url_template)
+                for match in licenses]
+        yield scan_result
+
+
+def _with_license_details(match, details_by_key, license_url_template):
+    """
+    Return a `match` license match mapping with the details of its license
+    added after its score, using and updating the `details_by_key` mapping.
+    """
+    if 'short_name' in match:
+        return match
+    license_key = match.get('key')
+    try:
+        details = details_by_key[license_key]
+    except KeyError:
+        details = details_by_key[license_key] = get_license_details(
+            license_key, license_url_template)
+    if not details:
+        return match
+
+    expanded = OrderedDict()
+    for name, value in match.items():
+        expanded[name] = value
+        if name == 'score':
+            expanded.update(details)
+    return expanded
+
+
 def get_file_infos(location):
     """
     Return a mapping of file information collected from the file or
@@ -28,21 +28,26 @@ from __future__ import unicode_literals
 
 import codecs
 from collections import OrderedDict
+from contextlib import contextmanager
+import errno
 from functools import partial
 import json
 from hashlib import sha1
 import os
 import posixpath
 import sys
+import threading
 
 from commoncode import fileutils
 from commoncode.fileutils import as_posixpath
 from commoncode.fileutils import path_to_bytes
 from commoncode.fileutils import path_to_unicode
 from commoncode.system import on_linux
+from commoncode.system import on_windows
 from commoncode import timeutils
 
 from scancode import scans_cache_dir
+from scancode import records
 
 
 """
@@ -62,11 +67,28 @@ file info for that file and from the path and file info collect the cached scann
 result. This iterator is then streamed to the final JSON output.
 
 Finally once a scan is completed the cache is destroyed to free up disk space.
+Alternatively, a scan can use a kept cache directory: the cached file infos and
+scans are always written atomically such that a scan interrupted at any point can
+be resumed from this cache, scanning again only the files without a cached scan.
 
 Internally the cache is organized as a tree of directories named after the first few
 characters or a path hash or file hash. This is to avoid having having too many files
 per directory that can make some filesystems choke as well as having directories that
 are too deep or having file paths that are too long which problematic on some OS.
+
+Alternatively, the file info and scan data can be stored in a single SQLite database
+file rather than in two files per scanned file. This avoids creating millions of small
+files and directories on large scans. The "global" file paths log is the same for
+both backends.
+
+The file info and scan data are saved either as JSON or as compact binary records
+(see the scancode.records module) and are read back whatever their format.
+
+When the cached scans are later selected with a ScanFilter, a small scans index
+entry is also saved for the path of each cached scan: the scans with findings,
+the license keys and whether there were scan errors. A ScanFilter uses these
+entries to iterate only the matching cached scans without loading all the cached
+file infos and scans.
 """
 
 # Tracing flags
@@ -87,19 +109,125 @@ if TRACE:
         return logger.debug(' '.join(isinstance(a, unicode) and a or repr(a) for a in args))
 
 
-def get_scans_cache_class(cache_dir=scans_cache_dir):
+class ScanCacheError(Exception):
+    pass
+
+
+# name of the cache subdirectory created in a resume directory and of the marker
+# file saved in this subdirectory with the fingerprint of its scan options
+RESUME_CACHE_DIR = 'scancode-cache'
+RESUME_MARKER = 'scancode-cache-fingerprint'
+
+
+def get_scans_cache_class(cache_dir=scans_cache_dir, scans_store_dir=None, backend='file',
+                          record_format='json', resume_dir=None, scan_options=None,
+                          with_index=False):
     """
     Return a new persistent cache class configured with a unique storage directory.
+
+    If `resume_dir` is provided, a RESUME_CACHE_DIR subdirectory of this
+    directory is used as the storage directory instead: the file infos and
+    scans cached in this subdirectory by an earlier interrupted scan with the
+    same `scan_options` mapping are reused and only the files without a cached
+    scan are scanned again. Only this subdirectory is deleted when the cache is
+    cleared. Raise a ScanCacheError if this subdirectory was not created for a
+    scan with the same `scan_options`.
+
+    If `scans_store_dir` is provided, scans are also saved to and reused from
+    this persistent scans store directory. See get_scans_store_dir() for details.
+
+    `backend` is the name of the cache storage backend: one of the keys of the
+    `scans_cache_backends` mapping.
+
+    `record_format` is the name of the format of the saved file infos and scans:
+    one of the keys of the `record_formats` mapping.
+
+    If `with_index` is True, a scans index entry is saved with each scan for
+    use by a ScanFilter.
     """
-    # create a unique temp directory in cache_dir
-    fileutils.create_dir(cache_dir)
-    prefix = timeutils.time2tstamp() + u'-'
-    cache_dir = fileutils.get_temp_dir(cache_dir, prefix=prefix)
+    cache_class = scans_cache_backends[backend]
+    if resume_dir:
+        cache_dir = get_resume_cache_dir(resume_dir, scan_options)
+    else:
+        # create a unique temp directory in cache_dir
+        fileutils.create_dir(cache_dir)
+        prefix = timeutils.time2tstamp() + u'-'
+        cache_dir = fileutils.get_temp_dir(cache_dir, prefix=prefix)
     if on_linux:
         cache_dir = path_to_bytes(cache_dir)
-    sc = ScanFileCache(cache_dir)
+    sc = cache_class(cache_dir, scans_store_dir, record_format, with_index)
     sc.setup()
-    return partial(ScanFileCache, cache_dir)
+    return partial(cache_class, cache_dir, scans_store_dir, record_format, with_index)
+
+
+def get_resume_cache_dir(resume_dir, scan_options):
+    """
+    Return the path to the cache directory created in `resume_dir` for a scan
+    with a `scan_options` mapping. Raise a ScanCacheError if this cache
+    directory exists and was not created by a scan with the same scan options
+    and ScanCode code and license data.
+    """
+    if on_linux:
+        resume_dir = path_to_bytes(resume_dir)
+        cache_dir = os.path.join(resume_dir, path_to_bytes(RESUME_CACHE_DIR))
+        marker = os.path.join(cache_dir, path_to_bytes(RESUME_MARKER))
+    else:
+        resume_dir = path_to_unicode(resume_dir)
+        cache_dir = os.path.join(resume_dir, RESUME_CACHE_DIR)
+        marker = os.path.join(cache_dir, RESUME_MARKER)
+
+    fingerprint = get_scan_options_fingerprint(scan_options or {})
+    if os.path.exists(marker):
+        with open(marker, 'rb') as saved:
+            if saved.read().strip() != fingerprint:
+                raise ScanCacheError(
+                    'the cache in %s was created by a scan with different scan options '
+                    'or ScanCode code or license data' % path_to_unicode(cache_dir))
+    elif os.path.exists(cache_dir) and os.listdir(cache_dir):
+        # never reuse nor delete a directory that was not created by ScanCode
+        raise ScanCacheError(
+            '%s is not empty and was not created by ScanCode' % path_to_unicode(cache_dir))
+    else:
+        fileutils.create_dir(cache_dir)
+        with open(marker, 'wb') as saved:
+            saved.write(fingerprint)
+    return cache_dir
+
+
+def get_scan_options_fingerprint(scan_options):
+    """
+    Return a fingerprint hexdigest string for a `scan_options` mapping of
+    {option name: value} for the options that have an effect on the scan
+    results and for the ScanCode code and license data tree checksum.
+    """
+    from licensedcode.cache import tree_checksum
+
+    options = json.dumps(scan_options, sort_keys=True, ensure_ascii=True)
+    fingerprint = sha1(options)
+    fingerprint.update(tree_checksum())
+    return fingerprint.hexdigest()
+
+
+def get_scans_store_dir(store_dir, scan_options):
+    """
+    Return the path to a persistent scans store directory created under
+    `store_dir` for a `scan_options` mapping of {option name: value} for the
+    options that have an effect on the scan results.
+
+    A scans store is content-addressed: scans are keyed by the SHA1 of the
+    scanned file content and survive across runs. Each store directory is named
+    after a fingerprint of the scan options and of the ScanCode code and license
+    data tree checksum such that a stored scan is reused only if scanning again
+    the same content would return the same results.
+    """
+    fingerprint = get_scan_options_fingerprint(scan_options)
+    if on_linux:
+        store_dir = path_to_bytes(store_dir)
+    else:
+        store_dir = path_to_unicode(store_dir)
+    store_dir = os.path.join(os.path.abspath(store_dir), fingerprint)
+    fileutils.create_dir(store_dir)
+    return store_dir
 
 
 def info_keys(path, seed=None):
@@ -159,22 +287,253 @@ def keys_from_hash(hexdigest):
     return hexdigest[0], hexdigest[1], hexdigest[2:]
 
 
-def paths_from_keys(base_path, keys):
+def path_from_keys(base_path, keys):
     """
-    Return a tuple of (parent dir path, filename) for a cache entry built from a cache
-    keys triple and a base_directory. Ensure that the parent directory exist.
+    Return the path of a cache entry built from a cache keys triple and a
+    base_directory. The parent directories are not created: these are created
+    once with create_keys_dirs().
+    """
+    return posixpath.join(base_path, *keys)
+
+
+# the characters of a hash hexdigest used as cache keys directory names
+HEX_DIGITS = '0123456789abcdef'
+
+
+def create_keys_dirs(base_path):
+    """
+    Create the directories of all the possible cache keys (16 dirs each with 16
+    sub-dirs) under `base_path`.
     """
     if on_linux:
-        keys = [path_to_bytes(k) for k in keys]
         base_path = path_to_bytes(base_path)
+        digits = bytes(HEX_DIGITS)
     else:
-        keys = [path_to_unicode(k) for k in keys]
         base_path = path_to_unicode(base_path)
+        digits = HEX_DIGITS
+    for dir1 in digits:
+        for dir2 in digits:
+            fileutils.create_dir(os.path.join(base_path, dir1, dir2))
 
-    dir1, dir2, file_name = keys
-    parent = os.path.join(base_path, dir1, dir2)
-    fileutils.create_dir(parent)
-    return parent, file_name
+
+def open_in_dir(location, mode):
+    """
+    Return the file at `location` opened with `mode`. Create its parent
+    directory and retry if this directory does not exist such as when a cache
+    was not setup.
+    """
+    try:
+        return open(location, mode)
+    except IOError as e:
+        if e.errno != errno.ENOENT:
+            raise
+    fileutils.create_dir(os.path.dirname(location))
+    return open(location, mode)
+
+
+def get_rooted_path(path, root_dir=None):
+    """
+    Return a unicode POSIX path for a scanned `path` prefixed with `root_dir`
+    if provided.
+    """
+    # must be unicode
+    rooted_path = path_to_unicode(path)
+    if root_dir:
+        rooted_path = posixpath.join(path_to_unicode(root_dir), rooted_path)
+    return fileutils.as_posixpath(rooted_path)
+
+
+def build_scan_result(rooted_path, scan_names, file_info, scan_details):
+    """
+    Return a scan result mapping for the file at `rooted_path` for a list of
+    `scan_names` given a `file_info` mapping and a `scan_details` mapping of
+    scans. `scan_details` is ignored if only infos were requested and is
+    reported as an error if None otherwise.
+
+    Note: both `file_info` and `scan_details` are modified in place.
+    """
+    file_info.pop('path', None)
+    scan_result = OrderedDict(path=rooted_path)
+
+    if 'infos' in scan_names:
+        # info are always collected but only returned if requested
+        # we flatten these as direct attributes of a file object
+        scan_result.update(file_info.items())
+
+    if not scan_result.get('scan_errors'):
+        scan_result['scan_errors'] = []
+
+    # check if we have more than just infos
+    if ['infos'] != scan_names:
+        errors = scan_result['scan_errors']
+        if scan_details is None:
+            no_scan_details = (
+                'ERROR: scan details unavailable in cache: '
+                'This is either a bug or processing was aborted with CTRL-C.')
+            errors.append(no_scan_details)
+        else:
+            # append errors to other top level errors if any
+            scan_errors = scan_details.pop('scan_errors', [])
+            errors.extend(scan_errors)
+            scan_result.update(scan_details)
+    return scan_result
+
+
+def is_partial_scan(scan_result):
+    """
+    Return True if a `scan_result` mapping has scan errors such as a timeout or
+    scans truncated on a soft timeout. Partial scans are never stored for reuse
+    in other runs.
+    """
+    return bool(isinstance(scan_result, dict)
+                and (scan_result.get('scan_errors') or scan_result.get('truncated_scans')))
+
+
+def get_index_entry(scan_result, file_info=None):
+    """
+    Return a scans index entry mapping for a `scan_result` mapping of scans and
+    an optional `file_info` mapping with the names of the scans with findings,
+    the matched license keys and True if there are scan errors.
+    """
+    entry = OrderedDict()
+    entry['findings'] = [
+        scan_name for scan_name, scan_details in scan_result.items()
+        # note: only scans are lists: file infos are never lists
+        if scan_details and isinstance(scan_details, list)
+        and scan_name not in ('scan_errors', 'truncated_scans')]
+    license_keys = []
+    for license_match in scan_result.get('licenses') or []:
+        license_key = license_match.get('key')
+        if license_key not in license_keys:
+            license_keys.append(license_key)
+    entry['licenses'] = license_keys
+    entry['errors'] = bool(scan_result.get('scan_errors')
+                           or file_info and file_info.get('scan_errors'))
+    return entry
+
+
+class ScanFilter(object):
+    """
+    Select cached scans to iterate using the scans index:
+     - `path_prefix`: only the paths that are this path or are under this
+       directory path,
+     - `findings`: only the paths with findings for any of these scan names or
+       with scan errors, as the only-findings post-scan plugin does,
+     - `with_errors`: only the paths with scan errors,
+     - `license_keys`: only the paths with a license match for any of these
+       license keys.
+    """
+    def __init__(self, path_prefix=None, findings=None, with_errors=False, license_keys=None):
+        if path_prefix:
+            if on_linux:
+                path_prefix = as_posixpath(path_to_bytes(path_prefix)).rstrip(b'/')
+                self.dir_prefix = path_prefix + b'/'
+            else:
+                path_prefix = as_posixpath(path_to_unicode(path_prefix)).rstrip('/')
+                self.dir_prefix = path_prefix + '/'
+        self.path_prefix = path_prefix
+        self.findings = set(findings or [])
+        self.with_errors = with_errors
+        self.license_keys = set(license_keys or [])
+
+    @property
+    def uses_index(self):
+        """
+        Return True if this filter needs the scans index.
+        """
+        return bool(self.findings or self.with_errors or self.license_keys)
+
+    def matches_path(self, path):
+        """
+        Return True if the `path` path of a cached scan is selected.
+        """
+        prefix = self.path_prefix
+        if not prefix:
+            return True
+        return path == prefix or path.startswith(self.dir_prefix)
+
+    def matches(self, entry):
+        """
+        Return True if the scan with a scans index `entry` is selected.
+        """
+        if self.with_errors and not entry['errors']:
+            return False
+        if self.findings and not (entry['errors'] or self.findings.intersection(entry['findings'])):
+            return False
+        if self.license_keys and not self.license_keys.intersection(entry['licenses']):
+            return False
+        return True
+
+
+def dump_json(value):
+    """
+    Return a JSON byte string for `value`.
+    """
+    # note: json.dumps is much faster than json.dump to a file as it uses the
+    # C encoder and the output is ASCII with ensure_ascii
+    return json.dumps(value, check_circular=False)
+
+
+# mapping of {record format name: function returning a byte string for a value}
+record_formats = OrderedDict([
+    ('json', dump_json),
+    ('binary', records.dumps),
+])
+
+
+def load_record(data):
+    """
+    Return a value loaded from a `data` byte string saved in any of the
+    `record_formats`.
+    """
+    if records.is_record(data):
+        return records.loads(data)
+    return json.loads(data, object_pairs_hook=OrderedDict)
+
+
+def read_record(location):
+    """
+    Return a value loaded from the file at `location` saved in any of the
+    `record_formats`.
+    """
+    with open(location, 'rb') as record:
+        return load_record(record.read())
+
+
+def read_existing_record(location):
+    """
+    Return a value loaded from the file at `location` like read_record() or
+    None if there is no such file.
+    """
+    try:
+        record = open(location, 'rb')
+    except IOError as e:
+        if e.errno == errno.ENOENT:
+            return
+        raise
+    with record:
+        return load_record(record.read())
+
+
+def write_record(location, data):
+    """
+    Write the `data` byte string to the file at `location`. The data is first
+    written to a temporary file that is then renamed such that a partially
+    written file can never be read back even if a process is interrupted.
+    """
+    if on_linux:
+        temp_location = location + b'.%d.tmp' % os.getpid()
+    else:
+        temp_location = location + '.%d.tmp' % os.getpid()
+    with open_in_dir(temp_location, 'wb') as temp:
+        temp.write(data)
+    try:
+        os.rename(temp_location, location)
+    except OSError:
+        # on Windows, rename fails if another process saved this file first
+        if not os.path.exists(location):
+            raise
+        fileutils.delete(temp_location)
 
 
 class ScanFileCache(object):
@@ -182,32 +541,66 @@ class ScanFileCache(object):
     A file-based cache for scan results saving results in files and using no locking.
     This is NOT thread-safe and NOT multi-process safe but works OK in our context:
     we cache the scan for a given file once and read it only a few times.
+
+    If a `scans_store_dir` is provided, scans for files (but not directories)
+    without errors are saved to and reused from this persistent scans store
+    directory that is never cleared. Other scans are saved in the cache as usual.
+
+    File infos and scans are saved in the `record_format` format.
+
+    If `with_index` is True, a scans index entry is saved for each scan such
+    that a ScanFilter can select scans without loading them. Otherwise, no
+    index entry is saved and a ScanFilter loads the scans to select them.
     """
-    def __init__(self, cache_dir):
+    def __init__(self, cache_dir, scans_store_dir=None, record_format='json', with_index=False):
         # subdirs for info and scans_dir caches
         if on_linux:
             infos_dir = b'infos_dir/'
             scans_dir = b'scans_dir/'
+            index_dir = b'index_dir/'
             files_log = b'files_log'
             self.cache_base_dir = path_to_bytes(cache_dir)
 
         else:
             infos_dir = u'infos_dir/'
             scans_dir = u'scans_dir/'
+            index_dir = u'index_dir/'
             files_log = u'files_log'
             self.cache_base_dir = cache_dir
 
         self.cache_infos_dir = as_posixpath(os.path.join(self.cache_base_dir, infos_dir))
         self.cache_scans_dir = as_posixpath(os.path.join(self.cache_base_dir, scans_dir))
+        self.cache_index_dir = as_posixpath(os.path.join(self.cache_base_dir, index_dir))
         self.cache_files_log = as_posixpath(os.path.join(self.cache_base_dir, files_log))
 
+        # file infos stored by key such as for a git blob
+        self.store_infos_dir = None
+        if scans_store_dir:
+            if on_linux:
+                scans_store_dir = path_to_bytes(scans_store_dir)
+            scans_store_dir = as_posixpath(scans_store_dir)
+            self.store_infos_dir = as_posixpath(os.path.join(scans_store_dir, infos_dir))
+        self.scans_store_dir = scans_store_dir
+        self.record_format = record_format
+        self.dump_record = record_formats[record_format]
+        self.with_index = with_index
+        # (path, info keys) of the last path: a cache is typically used for the
+        # single path of a Resource
+        self._info_keys = None
+
     def setup(self):
         """
         Setup the cache: must be called at least once globally after cache
         initialization.
         """
-        fileutils.create_dir(self.cache_infos_dir)
-        fileutils.create_dir(self.cache_scans_dir)
+        # the keys directories are created once here rather than for each put
+        create_keys_dirs(self.cache_infos_dir)
+        create_keys_dirs(self.cache_scans_dir)
+        if self.with_index:
+            fileutils.create_dir(self.cache_index_dir)
+        if self.scans_store_dir:
+            create_keys_dirs(self.scans_store_dir)
+            create_keys_dirs(self.store_infos_dir)
 
     @classmethod
     def log_file_path(cls, logfile_fd, path):
@@ -221,13 +614,39 @@ class ScanFileCache(object):
             path = path_to_unicode(path) + '\n'
         logfile_fd.write(path)
 
+    @contextmanager
+    def files_log_writer(self):
+        """
+        Yield an opened files log file descriptor for use with log_file_path().
+        The log is written to a temporary file renamed when closed without
+        error such that the files log is never partially written.
+        """
+        if on_linux:
+            temp_log = self.cache_files_log + b'.tmp'
+            log_opener = partial(open, temp_log, 'wb')
+        else:
+            temp_log = self.cache_files_log + '.tmp'
+            log_opener = partial(codecs.open, temp_log, 'w', encoding='utf-8')
+        with log_opener() as logfile_fd:
+            yield logfile_fd
+        if on_windows and os.path.exists(self.cache_files_log):
+            os.remove(self.cache_files_log)
+        os.rename(temp_log, self.cache_files_log)
+
+    def get_info_keys(self, path):
+        """
+        Return the info_keys() of a path, memoized for the last path.
+        """
+        memo = self._info_keys
+        if memo is None or memo[0] != path:
+            memo = self._info_keys = path, info_keys(path)
+        return memo[1]
+
     def get_cached_info_path(self, path):
         """
         Return the path where to store a file info in the cache given a path.
         """
-        keys = info_keys(path)
-        paths = paths_from_keys(self.cache_infos_dir, keys)
-        return posixpath.join(*paths)
+        return path_from_keys(self.cache_infos_dir, self.get_info_keys(path))
 
     def put_info(self, path, file_info):
         """
@@ -235,10 +654,8 @@ class ScanFileCache(object):
         in file_info has already been scanned or False otherwise.
         """
         info_path = self.get_cached_info_path(path)
-        with codecs.open(info_path, 'wb', encoding='utf-8') as cached_infos:
-            json.dump(file_info, cached_infos, check_circular=False)
-        scan_path = self.get_cached_scan_path(path, file_info)
-        is_scan_cached = os.path.exists(scan_path)
+        write_record(info_path, self.dump_record(file_info))
+        is_scan_cached = bool(self.get_existing_scan_path(path, file_info))
         if TRACE:
             logger_debug('put_infos:', 'path:', path, 'is_scan_cached:', is_scan_cached, 'file_info:', file_info, '\n')
         return is_scan_cached
@@ -248,27 +665,70 @@ class ScanFileCache(object):
         Return file info from the cache for a path.
         Return None on failure to find the info in the cache.
         """
-        info_path = self.get_cached_info_path(path)
-        if os.path.exists(info_path):
-            with codecs.open(info_path, 'r', encoding='utf-8') as ci:
-                return json.load(ci, object_pairs_hook=OrderedDict)
+        return read_existing_record(self.get_cached_info_path(path))
+
+    def put_stored_info(self, key, file_info):
+        """
+        Save file_info in the persistent scans store for a `key` hash hexdigest
+        such as the key of a git blob. Do nothing if there is no scans store.
+        """
+        if self.store_infos_dir:
+            info_path = path_from_keys(self.store_infos_dir, keys_from_hash(key))
+            write_record(info_path, self.dump_record(file_info))
+
+    def get_stored_info(self, key):
+        """
+        Return file info from the persistent scans store for a `key` hash
+        hexdigest or None if there is no scans store or no such file info.
+        """
+        if self.store_infos_dir:
+            return read_existing_record(path_from_keys(self.store_infos_dir, keys_from_hash(key)))
+
+    def has_stored_scan(self, file_info):
+        """
+        Return True if the persistent scans store has a scan for file_info.
+        """
+        scan_path = self.get_stored_scan_path(file_info)
+        return bool(scan_path and os.path.exists(scan_path))
 
     def get_cached_scan_path(self, path, file_info):
         """
         Return the path where to store a scan in the cache given a path and file_info.
         """
-        keys = scan_keys(path, file_info)
-        paths = paths_from_keys(self.cache_scans_dir, keys)
-        return posixpath.join(*paths)
+        return path_from_keys(self.cache_scans_dir, scan_keys(path, file_info))
+
+    def get_stored_scan_path(self, file_info):
+        """
+        Return the path where to store a scan in the persistent scans store given
+        a file_info or None if there is no store or no SHA1 in file_info.
+        """
+        sha1_digest = file_info.get('sha1')
+        if self.scans_store_dir and sha1_digest:
+            return path_from_keys(self.scans_store_dir, keys_from_hash(sha1_digest))
+
+    def get_existing_scan_path(self, path, file_info):
+        """
+        Return the path of an existing cached scan given a path and file_info
+        looking first in the scans store if any, then in the cache. Return None
+        if there is no such cached scan.
+        """
+        for scan_path in (self.get_stored_scan_path(file_info),
+                          self.get_cached_scan_path(path, file_info)):
+            if scan_path and os.path.exists(scan_path):
+                return scan_path
 
     def put_scan(self, path, file_info, scan_result):
         """
         Put scan_result in the cache if not already cached.
         """
-        scan_path = self.get_cached_scan_path(path, file_info)
+        scan_path = self.get_stored_scan_path(file_info)
+        if not scan_path or is_partial_scan(scan_result):
+            # never store partial scans such as timeouts for reuse in other runs
+            scan_path = self.get_cached_scan_path(path, file_info)
         if not os.path.exists(scan_path):
-            with codecs.open(scan_path, 'wb', encoding='utf-8') as cached_scan:
-                json.dump(scan_result, cached_scan, check_circular=False)
+            write_record(scan_path, self.dump_record(scan_result))
+        if self.with_index and isinstance(scan_result, dict):
+            self.put_index(path, get_index_entry(scan_result, file_info))
         if TRACE:
             logger_debug('put_scan:', 'scan_path:', scan_path, 'file_info:', file_info, 'scan_result:', scan_result, '\n')
 
@@ -277,25 +737,55 @@ class ScanFileCache(object):
         Return scan results from the cache for a path and file_info.
         Return None on failure to find the scan results in the cache.
         """
-        scan_path = self.get_cached_scan_path(path, file_info)
-        if os.path.exists(scan_path):
-            with codecs.open(scan_path, 'r', encoding='utf-8') as cached_scan:
-                return json.load(cached_scan, object_pairs_hook=OrderedDict)
+        # note: reading and failing is cheaper than checking if a file exists
+        for scan_path in (self.get_stored_scan_path(file_info),
+                          self.get_cached_scan_path(path, file_info)):
+            if scan_path:
+                scan = read_existing_record(scan_path)
+                if scan is not None:
+                    return scan
 
-    def iterate(self, scan_names, root_dir=None, paths_subset=tuple()):
+    def put_index(self, path, entry):
         """
-        Yield scan data for all cached scans e.g. the whole cache given
-        a list of scan names.
-        If a `paths_subset` sequence of paths is provided, then only
-        these paths are iterated.
+        Save the scans index `entry` mapping for `path`.
+        """
+        # each process appends to its own index file: there is no locking
+        index_path = os.path.join(self.cache_index_dir, str(os.getpid()))
+        line = json.dumps([b''.join(self.get_info_keys(path)), entry], check_circular=False)
+        with open_in_dir(index_path, 'ab') as index:
+            index.write(line + b'\n')
 
-        The logfile MUST have been closed before calling this method.
+    def get_index(self):
         """
-        if on_linux:
-            paths_subset = set(path_to_bytes(p) for p in paths_subset)
-        else:
-            paths_subset = set(path_to_unicode(p) for p in paths_subset)
+        Return a mapping of {path key: scans index entry} for all the cached
+        scans where the path key is the joined info_keys() of a path.
+        """
+        index = {}
+        if not os.path.isdir(self.cache_index_dir):
+            return index
+        for index_name in os.listdir(self.cache_index_dir):
+            with open(os.path.join(self.cache_index_dir, index_name), 'rb') as lines:
+                for line in lines:
+                    # a line may be partial if a process was interrupted
+                    try:
+                        key, entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    index[key] = entry
+        return index
+
+    def flush(self):
+        """
+        Save the pending puts of the current process and thread. Each put is
+        saved right away in a file: there is nothing to save.
+        """
+        pass
 
+    def iter_paths(self):
+        """
+        Yield the paths of all the cached scans from the files log.
+        The logfile MUST have been closed before calling this method.
+        """
         if on_linux:
             log_opener = partial(open, self.cache_files_log, 'rb')
         else:
@@ -305,70 +795,367 @@ class ScanFileCache(object):
         with log_opener() as cached_files:
             # iterate paths, one by line
             for file_log in cached_files:
-                # must be unicode
-                path = file_log.rstrip(EOL)
-                if paths_subset and path not in paths_subset:
-                    continue
-                file_info = self.get_info(path)
-
-                if on_linux:
-                    unicode_path = path_to_unicode(path)
-                else:
-                    unicode_path = path
-
-                if root_dir:
-                    # must be unicode
-                    if on_linux:
-                        root_dir = path_to_unicode(root_dir)
-                    rooted_path = posixpath.join(root_dir, unicode_path)
-                else:
-                    rooted_path = unicode_path
-                rooted_path = fileutils.as_posixpath(rooted_path)
-                logger_debug('iterate:', 'rooted_path:', rooted_path)
-
-                # rare but possible corner case
-                if file_info is None:
-                    no_info = ('ERROR: file info unavailable in cache: '
-                               'This is either a bug or processing was aborted with CTRL-C.')
-                    scan_result = OrderedDict(path=rooted_path)
-                    scan_result['scan_errors'] = [no_info]
-                    if TRACE:
-                        logger_debug('iterate:', 'scan_result:', scan_result, 'for path:', rooted_path, '\n')
-                    yield scan_result
+                yield file_log.rstrip(EOL)
+
+    def iterate(self, scan_names, root_dir=None, paths_subset=tuple(), scan_filter=None):
+        """
+        Yield scan data for all cached scans e.g. the whole cache given
+        a list of scan names.
+        If a `paths_subset` sequence of paths is provided, then only
+        these paths are iterated in this order.
+        If a `scan_filter` ScanFilter is provided, then only the scans
+        selected by this filter are iterated.
+
+        The logfile MUST have been closed before calling this method.
+        """
+        if paths_subset:
+            # random access to the cached infos and scans by path
+            if on_linux:
+                paths = [path_to_bytes(p) for p in paths_subset]
+            else:
+                paths = [path_to_unicode(p) for p in paths_subset]
+            paths = OrderedDict.fromkeys(paths)
+        else:
+            paths = self.iter_paths()
+
+        index = None
+        if scan_filter:
+            paths = (path for path in paths if scan_filter.matches_path(path))
+            if scan_filter.uses_index:
+                index = self.get_index()
+
+        for path in paths:
+            entry = None
+            if index is not None:
+                entry = index.get(b''.join(self.get_info_keys(path)))
+                if entry is not None and not scan_filter.matches(entry):
                     continue
 
-                _unicode_path_from_file_info = file_info.pop('path')
-                scan_result = OrderedDict(path=rooted_path)
+            file_info = self.get_info(path)
 
-                if 'infos' in scan_names:
-                    # info are always collected but only returned if requested
-                    # we flatten these as direct attributes of a file object
-                    scan_result.update(file_info.items())
-
-                if not scan_result.get('scan_errors'):
-                    scan_result['scan_errors'] = []
-
-                # check if we have more than just infos
-                if ['infos'] != scan_names:
-                    errors = scan_result['scan_errors']
-                    scan_details = self.get_scan(path, file_info)
-                    if scan_details is None:
-                        no_scan_details = (
-                            'ERROR: scan details unavailable in cache: '
-                            'This is either a bug or processing was aborted with CTRL-C.')
-                        errors.append(no_scan_details)
-                    else:
-                        # append errors to other top level errors if any
-                        scan_errors = scan_details.pop('scan_errors', [])
-                        errors.extend(scan_errors)
-                        scan_result.update(scan_details)
+            rooted_path = get_rooted_path(path, root_dir)
+            logger_debug('iterate:', 'rooted_path:', rooted_path)
 
+            # rare but possible corner case
+            if file_info is None:
+                no_info = ('ERROR: file info unavailable in cache: '
+                           'This is either a bug or processing was aborted with CTRL-C.')
+                scan_result = OrderedDict(path=rooted_path)
+                scan_result['scan_errors'] = [no_info]
                 if TRACE:
                     logger_debug('iterate:', 'scan_result:', scan_result, 'for path:', rooted_path, '\n')
                 yield scan_result
+                continue
+
+            # check if we have more than just infos
+            scan_details = None
+            if ['infos'] != scan_names:
+                scan_details = self.get_scan(path, file_info)
+
+            scan_result = build_scan_result(rooted_path, scan_names, file_info, scan_details)
+            if index is not None and entry is None:
+                # not indexed such as a duplicate or a scan reused from a store
+                if not scan_filter.matches(get_index_entry(scan_result)):
+                    continue
+            if TRACE:
+                logger_debug('iterate:', 'scan_result:', scan_result, 'for path:', rooted_path, '\n')
+            yield scan_result
 
     def clear(self, *args):
         """
         Purge the cache by deleting the corresponding cached data files.
+        The persistent scans store if any is never deleted.
         """
         fileutils.delete(self.cache_base_dir)
+
+
+# a per-process mapping of {(process id, thread id, database path): opened connection}
+_db_connections = {}
+
+
+def _db_thread_key(location):
+    """
+    Return a key for the database at `location` used in the current process
+    and thread.
+    """
+    return os.getpid(), threading.current_thread().ident, location
+
+
+def get_db_connection(location):
+    """
+    Return an SQLite database connection for the database file at `location`,
+    reusing an already opened connection in the current process if any.
+
+    Connections are not shared across processes or threads: a forked process
+    or a thread always opens its own connection. Connections do not sync to
+    disk: a cache does not need to survive a system crash. Transactions are
+    explicit: see put_in_db().
+    """
+    key = _db_thread_key(location)
+    connection = _db_connections.get(key)
+    if connection is None:
+        # imported here to import sqlite only when using the db backend
+        import sqlite3
+        connection = sqlite3.connect(
+            path_to_unicode(location), timeout=DB_LOCK_TIMEOUT, isolation_level=None,
+            # a thread connection may be closed by another thread in clear()
+            check_same_thread=False)
+        connection.execute('PRAGMA synchronous = OFF')
+        _db_connections[key] = connection
+    return connection
+
+
+# seconds to wait for a database write lock held by another process
+DB_LOCK_TIMEOUT = 60 * 5
+
+# maximum number of puts saved together in a single database transaction
+DB_BATCH_PUTS = 256
+
+# a per-process mapping of {(process id, thread id, database path): mapping of
+# {(table, key): value} for the puts not yet saved}
+_db_pending_puts = {}
+
+
+def put_in_db(location, table, key, value):
+    """
+    Save `value` for `key` in the `table` of the database at `location`. The
+    puts of the current process and thread are saved in batches of
+    DB_BATCH_PUTS puts, each in a single transaction rather than one
+    transaction per put: flush_db_puts() must be called to save the last puts.
+    """
+    pending = _db_pending_puts.setdefault(_db_thread_key(location), OrderedDict())
+    pending[table, key] = value
+    if len(pending) >= DB_BATCH_PUTS:
+        flush_db_puts(location)
+
+
+def get_pending_puts(location):
+    """
+    Return a mapping of {(table, key): value} for the puts of the current
+    process and thread not yet saved to the database at `location`.
+    """
+    return _db_pending_puts.get(_db_thread_key(location)) or {}
+
+
+def flush_db_puts(location):
+    """
+    Save the pending puts of the current process and thread to the database at
+    `location` in a single transaction.
+    """
+    pending = _db_pending_puts.pop(_db_thread_key(location), None)
+    if not pending:
+        return
+    connection = get_db_connection(location)
+    # the write lock is taken upfront and held only while saving
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        for (table, key), value in pending.items():
+            query = 'INSERT OR REPLACE INTO %(table)s VALUES (?, ?)' % locals()
+            connection.execute(query, (key, value))
+    except:
+        connection.execute('ROLLBACK')
+        raise
+    connection.execute('COMMIT')
+
+
+class ScanDbCache(ScanFileCache):
+    """
+    A cache for scan results saving file infos and scans in a single SQLite
+    database file instead of saving two JSON files per scanned path. The
+    database is safe to use from multiple processes: each process uses its own
+    connection and the puts are saved in batches, each in a single short
+    transaction. A put is visible to other processes and threads only once
+    saved with flush().
+
+    Scans are keyed by file content SHA1 exactly like the ScanFileCache and
+    scans with a persistent `scans_store_dir` are saved in a database file in
+    that store directory.
+    """
+    def __init__(self, cache_dir, scans_store_dir=None, record_format='json', with_index=False):
+        super(ScanDbCache, self).__init__(cache_dir, scans_store_dir, record_format, with_index)
+        if on_linux:
+            db_name = b'scans.db'
+        else:
+            db_name = 'scans.db'
+        self.cache_db = os.path.join(self.cache_base_dir, db_name)
+        self.store_db = None
+        if self.scans_store_dir:
+            self.store_db = os.path.join(self.scans_store_dir, db_name)
+
+    def setup(self):
+        """
+        Setup the cache: must be called at least once globally after cache
+        initialization.
+        """
+        fileutils.create_dir(self.cache_base_dir)
+        for db in (self.cache_db, self.store_db):
+            if not db:
+                continue
+            connection = get_db_connection(db)
+            # write-ahead logging ensures that concurrent writers do not block readers
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS scans (key TEXT PRIMARY KEY, value TEXT)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS infos (key TEXT PRIMARY KEY, value TEXT)')
+            if db == self.cache_db:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS scans_index (key TEXT PRIMARY KEY, value TEXT)')
+
+    def _get(self, db, table, key):
+        """
+        Return a value loaded from the `table` of the `db` database for `key` or
+        None.
+        """
+        value = get_pending_puts(db).get((table, key))
+        if value is None:
+            query = 'SELECT value FROM %(table)s WHERE key = ?' % locals()
+            row = get_db_connection(db).execute(query, (key,)).fetchone()
+            value = row and row[0]
+        if value:
+            return load_record(bytes(value))
+
+    def _has(self, db, key):
+        """
+        Return True if the `db` database has a scan for `key`.
+        """
+        if ('scans', key) in get_pending_puts(db):
+            return True
+        query = 'SELECT 1 FROM scans WHERE key = ?'
+        return bool(get_db_connection(db).execute(query, (key,)).fetchone())
+
+    def _put(self, db, table, key, value):
+        """
+        Save `value` in the `table` of the `db` database for `key`.
+        """
+        import sqlite3
+        value = sqlite3.Binary(self.dump_record(value))
+        put_in_db(db, table, key, value)
+
+    def flush(self):
+        """
+        Save the pending puts of the current process and thread.
+        """
+        for db in (self.cache_db, self.store_db):
+            if db:
+                flush_db_puts(db)
+
+    def get_scan_db_and_key(self, path, file_info):
+        """
+        Return a tuple of (database, key) where to find an existing scan given a
+        path and file_info or (None, None) if there is no such cached scan.
+        """
+        sha1_digest = file_info.get('sha1')
+        if self.store_db and sha1_digest and self._has(self.store_db, sha1_digest):
+            return self.store_db, sha1_digest
+        key = b''.join(scan_keys(path, file_info))
+        if self._has(self.cache_db, key):
+            return self.cache_db, key
+        return None, None
+
+    def put_info(self, path, file_info):
+        """
+        Put file_info for path in the cache and return True if the file referenced
+        in file_info has already been scanned or False otherwise.
+        """
+        self._put(self.cache_db, 'infos', b''.join(self.get_info_keys(path)), file_info)
+        db, _key = self.get_scan_db_and_key(path, file_info)
+        return bool(db)
+
+    def get_info(self, path):
+        """
+        Return file info from the cache for a path.
+        Return None on failure to find the info in the cache.
+        """
+        return self._get(self.cache_db, 'infos', b''.join(self.get_info_keys(path)))
+
+    def put_stored_info(self, key, file_info):
+        """
+        Save file_info in the persistent scans store for a `key` hash hexdigest
+        such as the key of a git blob. Do nothing if there is no scans store.
+        """
+        if self.store_db:
+            self._put(self.store_db, 'infos', key, file_info)
+
+    def get_stored_info(self, key):
+        """
+        Return file info from the persistent scans store for a `key` hash
+        hexdigest or None if there is no scans store or no such file info.
+        """
+        if self.store_db:
+            return self._get(self.store_db, 'infos', key)
+
+    def has_stored_scan(self, file_info):
+        """
+        Return True if the persistent scans store has a scan for file_info.
+        """
+        sha1_digest = file_info.get('sha1')
+        return bool(self.store_db and sha1_digest and self._has(self.store_db, sha1_digest))
+
+    def put_scan(self, path, file_info, scan_result):
+        """
+        Put scan_result in the cache if not already cached.
+        """
+        if self.with_index and isinstance(scan_result, dict):
+            self.put_index(path, get_index_entry(scan_result, file_info))
+        if self.get_scan_db_and_key(path, file_info)[0]:
+            return
+        sha1_digest = file_info.get('sha1')
+        if self.store_db and sha1_digest and not is_partial_scan(scan_result):
+            self._put(self.store_db, 'scans', sha1_digest, scan_result)
+        else:
+            # never store partial scans such as timeouts for reuse in other runs
+            self._put(self.cache_db, 'scans', b''.join(scan_keys(path, file_info)), scan_result)
+
+    def put_index(self, path, entry):
+        """
+        Save the scans index `entry` mapping for `path`.
+        """
+        self._put(self.cache_db, 'scans_index', b''.join(self.get_info_keys(path)), entry)
+
+    def get_index(self):
+        """
+        Return a mapping of {path key: scans index entry} for all the cached
+        scans where the path key is the joined info_keys() of a path.
+        """
+        rows = get_db_connection(self.cache_db).execute('SELECT key, value FROM scans_index')
+        index = {bytes(key): load_record(bytes(value)) for key, value in rows}
+        for (table, key), value in get_pending_puts(self.cache_db).items():
+            if table == 'scans_index':
+                index[bytes(key)] = load_record(bytes(value))
+        return index
+
+    def get_scan(self, path, file_info):
+        """
+        Return scan results from the cache for a path and file_info.
+        Return None on failure to find the scan results in the cache.
+        """
+        db, key = self.get_scan_db_and_key(path, file_info)
+        if db:
+            return self._get(db, 'scans', key)
+
+    def clear(self, *args):
+        """
+        Purge the cache by deleting the corresponding cached data files.
+        The persistent scans store if any is never deleted.
+        """
+        if self.store_db:
+            flush_db_puts(self.store_db)
+        pid = os.getpid()
+        for key in list(_db_pending_puts):
+            key_pid, _thread_id, location = key
+            if key_pid == pid and location == self.cache_db:
+                # these puts are not needed anymore
+                del _db_pending_puts[key]
+        for key in list(_db_connections):
+            key_pid, _thread_id, location = key
+            if key_pid == pid and location == self.cache_db:
+                _db_connections.pop(key).close()
+        super(ScanDbCache, self).clear()
+
+
+# mapping of {backend name: scans cache class}
+scans_cache_backends = OrderedDict([
+    ('file', ScanFileCache),
+    ('sqlite', ScanDbCache),
+])
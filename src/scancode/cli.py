@@ -27,17 +27,16 @@ from __future__ import print_function
 from __future__ import division
 from __future__ import unicode_literals
 
-# Import early because this import has monkey-patching side effects
-from scancode.pool import get_pool
-
-import codecs
+from collections import deque
 from collections import OrderedDict
 from functools import partial
+from itertools import chain
 from itertools import imap
 import os
 from os.path import expanduser
 from os.path import abspath
 import sys
+import threading
 from time import time
 import traceback
 from types import GeneratorType
@@ -53,15 +52,13 @@ from commoncode.fileutils import path_to_unicode
 from commoncode import ignore
 from commoncode.system import on_linux
 from commoncode.text import toascii
-
-import plugincode.output
-import plugincode.post_scan
-import plugincode.pre_scan
+from commoncode.timeutils import Deadline
 
 from scancode import __version__ as version
 
 from scancode.api import DEJACODE_LICENSE_URL
 from scancode.api import _empty_file_infos
+from scancode.api import expand_license_details
 from scancode.api import get_copyrights
 from scancode.api import get_emails
 from scancode.api import get_file_infos
@@ -70,8 +67,30 @@ from scancode.api import get_package_infos
 from scancode.api import get_urls
 from scancode.api import Resource
 
+from scancode.cache import build_scan_result
+from scancode.cache import get_rooted_path
 from scancode.cache import get_scans_cache_class
+from scancode.cache import get_scans_store_dir
+from scancode.cache import record_formats
+from scancode.cache import scans_cache_backends
+from scancode.cache import ScanCacheError
 from scancode.cache import ScanFileCache
+from scancode.cache import ScanFilter
+
+from scancode.gitscan import export_commits
+from scancode.gitscan import GitError
+
+from scancode.incremental import PreviousScan
+from scancode.incremental import PreviousScanError
+
+from scancode.shard import parse_shard
+from scancode.shard import Shard
+from scancode.shard import BY_PATH
+from scancode.shard import BY_SIZE
+from scancode.shard import SHARD_MODES
+
+from scancode.pipeline import bounded_imap
+from scancode.pipeline import QUEUE_DEPTH
 
 from scancode.interrupt import DEFAULT_TIMEOUT
 from scancode.interrupt import fake_interruptible
@@ -81,8 +100,18 @@ from scancode.interrupt import TimeoutError
 from scancode.utils import BaseCommand
 from scancode.utils import compute_fn_max_len
 from scancode.utils import fixed_width_file_name
+from scancode.utils import get_relative_path
 from scancode.utils import progressmanager
 
+from scancode.timing import get_peak_rss
+from scancode.timing import reset_peak_rss
+from scancode.timing import ScanTimings
+
+from scancode.prefilter import get_prefilters
+from scancode.prefilter import get_skipped_scans
+from scancode.prefilter import OPTIONAL_PREFILTERS
+from scancode.prefilter import SkippedScans
+
 
 echo_stderr = partial(click.secho, err=True)
 
@@ -99,12 +128,6 @@ except NameError:
     unicode = str
 
 
-# this will init the plugins
-plugincode.pre_scan.initialize()
-plugincode.output.initialize()
-plugincode.post_scan.initialize()
-
-
 info_text = '''
 ScanCode scans code and other files for origin and license.
 Visit https://github.com/nexB/scancode-toolkit/ for support and download.
@@ -246,6 +269,11 @@ Note: when you run scancode, a progress bar is displayed with a counter of the
 number of files processed. Use --verbose to display file-by-file progress.
 '''
 
+# options that print some information and exit: the plugins are not loaded when
+# only these options are used
+INFO_OPTIONS = ('--about', '--examples', '--version',)
+
+
 class ScanCommand(BaseCommand):
     short_usage_help = '''
 Try 'scancode --help' for help on options and arguments.'''
@@ -255,6 +283,42 @@ Try 'scancode --help' for help on options and arguments.'''
                  options_metavar='[OPTIONS]', add_help_option=True):
         super(ScanCommand, self).__init__(name, context_settings, callback,
                  params, help, epilog, short_help, options_metavar, add_help_option)
+        # the plugins and their options are loaded on first use rather than on
+        # import as loading the plugins is slow
+        self.plugins_loaded = False
+        # the command can be run concurrently in threads such as in scancode-serve
+        self.plugins_lock = threading.Lock()
+
+    def parse_args(self, ctx, args):
+        if args and all(arg in INFO_OPTIONS for arg in args):
+            # no plugin is needed to print information: the plugins are not
+            # loaded for this call only
+            ctx.meta['scancode.skip_plugins'] = True
+        return super(ScanCommand, self).parse_args(ctx, args)
+
+    def get_params(self, ctx):
+        if not self.plugins_loaded and not ctx.meta.get('scancode.skip_plugins'):
+            self.load_plugins()
+        return super(ScanCommand, self).get_params(ctx)
+
+    def load_plugins(self):
+        """
+        Load the plugins and add the options of the pre-scan and post-scan
+        plugins to this command once. This is thread-safe.
+        """
+        with self.plugins_lock:
+            if not self.plugins_loaded:
+                self._load_plugins()
+                self.plugins_loaded = True
+
+    def _load_plugins(self):
+        import plugincode.output
+        import plugincode.post_scan
+        import plugincode.pre_scan
+
+        for param in self.params:
+            if param.name == 'format':
+                param.help = param.help % ', '.join(plugincode.output.get_format_plugins())
 
         for name, callback in plugincode.post_scan.get_post_scan_plugins().items():
             # normalize white spaces in help.
@@ -320,6 +384,7 @@ def validate_formats(ctx, param, value):
     """
     Validate formats and template files. Raise a BadParameter on errors.
     """
+    import plugincode.output
     value_lower = value.lower()
     if value_lower in plugincode.output.get_format_plugins():
         return value_lower
@@ -329,6 +394,19 @@ def validate_formats(ctx, param, value):
     return value
 
 
+def validate_shard(ctx, param, value):
+    """
+    Validate and return a shard "i/N" value as a (shard number, shards count)
+    tuple. Raise a BadParameter on errors.
+    """
+    if not value:
+        return
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter('Invalid <i/N> shard: "%(value)s": %(e)s' % locals())
+
+
 def validate_exclusive(ctx, exclusive_options):
     """
     Validate mutually exclusive options.
@@ -375,8 +453,9 @@ def validate_exclusive(ctx, exclusive_options):
                    'This cannot be combined with the `--strip-root` option.', group=OUTPUT, cls=ScanOption)
 
 @click.option('-f', '--format', is_flag=False, default='json', show_default=True, metavar='<format>',
+              # the format names are added to the help when the plugins are loaded
               help=('Set <output_file> format to one of: %s or use <format> '
-                    'as the path to a custom template file' % ', '.join(plugincode.output.get_format_plugins())),
+                    'as the path to a custom template file'),
                      callback=validate_formats, group=OUTPUT, cls=ScanOption)
 
 @click.option('--verbose', is_flag=True, default=False, help='Print verbose file-by-file progress messages.', group=OUTPUT, cls=ScanOption)
@@ -390,6 +469,83 @@ def validate_exclusive(ctx, exclusive_options):
 
 @click.option('--diag', is_flag=True, default=False, help='Include additional diagnostic information such as error messages or result details.', group=CORE, cls=ScanOption)
 @click.option('--timeout', is_flag=False, default=DEFAULT_TIMEOUT, type=float, show_default=True, help='Stop scanning a file if scanning takes longer than a timeout in seconds.', group=CORE, cls=ScanOption)
+@click.option('--soft-timeout', is_flag=False, default=None, type=float, metavar='<seconds>',
+              help='Stop the license and copyright scans of a file if each takes longer than <seconds> '
+                   'and keep their partial results. The names of these truncated scans are listed in '
+                   'a "truncated_scans" attribute of the file. Use a value below --timeout.',
+              group=CORE, cls=ScanOption)
+@click.option('--cache-store', is_flag=False, default=None, metavar='<dir>',
+              type=click.Path(file_okay=False, writable=True, path_type=fileutils.PATH_TYPE),
+              help='Save scan results to and reuse them from a persistent store in <dir>. Stored scans are keyed by '
+                   'the SHA1 of the file content under a directory named after a checksum of the scan options that '
+                   'affect the results and of the ScanCode code and license data files. A file is not scanned again '
+                   'if its content was already scanned with the same options and unchanged ScanCode code and data.',
+              group=CORE, cls=ScanOption)
+@click.option('--cache-backend', is_flag=False, default='file', show_default=True,
+              type=click.Choice(list(scans_cache_backends)),
+              help='Set the storage used to cache scan results while scanning: either one file per scanned file '
+                   'or a single SQLite database file. Using a database is faster on very large codebases.', group=CORE, cls=ScanOption)
+@click.option('--cache-format', is_flag=False, default='json', show_default=True,
+              type=click.Choice(list(record_formats)),
+              help='Set the format of the scan results cached while scanning: either JSON or compact binary '
+                   'records. Binary records use about half the disk space of JSON on very large codebases.',
+              group=CORE, cls=ScanOption)
+@click.option('--resume', is_flag=False, default=None, metavar='<cache_dir>',
+              type=click.Path(file_okay=False, writable=True, path_type=fileutils.PATH_TYPE),
+              help='Cache scan results in a "scancode-cache" subdirectory of <cache_dir> rather than in a temporary '
+                   'directory. If a scan is interrupted, run the same scan again with the same <cache_dir> to resume '
+                   'it: only the files not scanned yet are scanned. A scan is not resumed if its scan options or the '
+                   'ScanCode code and license data changed. The "scancode-cache" subdirectory is deleted once a '
+                   'scan completes successfully.',
+              group=CORE, cls=ScanOption)
+@click.option('--stream', is_flag=True, default=False,
+              help='Save scan results to <output_file> as soon as each file is scanned rather than '
+                   'caching all the scan results on disk first.', group=CORE, cls=ScanOption)
+@click.option('--stream-in-order', is_flag=True, default=False,
+              help='Save streamed scan results in the same order as when not streaming, buffering the results '
+                   'of files scanned out of order. Has no effect unless --stream is requested.', group=CORE, cls=ScanOption)
+@click.option('--largest-first', is_flag=True, default=False,
+              help='Scan the largest files first such that a scan does not end with a few large files scanned while '
+                   'the other processes are idle. The file infos of all the files are collected before scanning. '
+                   'Has no effect with --stream-in-order.', group=CORE, cls=ScanOption)
+@click.option('--info-threads', is_flag=False, default=0, type=click.IntRange(min=0), show_default=True, metavar='<n>',
+              help='Collect the file infos such as checksums and file types with <n> threads of the main process '
+                   'rather than in the scan processes such that this I/O-bound work overlaps with the scans. '
+                   'Has no effect with --processes 0.', group=CORE, cls=ScanOption)
+@click.option('--queue-depth', is_flag=False, default=QUEUE_DEPTH, type=click.IntRange(min=1), show_default=True, metavar='<n>',
+              help='Queue at most <n> files or batches of small files per process at each stage of the scan such that '
+                   'the memory used stays bounded and a slow <output_file> slows down the scan rather than '
+                   'accumulating results. Has no effect with --processes 0.', group=CORE, cls=ScanOption)
+@click.option('--prefilter', is_flag=False, multiple=True, type=click.Choice(OPTIONAL_PREFILTERS.keys()),
+              help='Also skip the license, copyright, email and url scans of these kinds of files that rarely '
+                   'contain such findings: media files, large binary data files or files mostly made of a few '
+                   'repeated bytes. Can be repeated. Empty files and files without text are always skipped.',
+              group=CORE, cls=ScanOption)
+@click.option('--timing', is_flag=True, default=False,
+              help='Record the time and peak memory used by each scanner on each file and report '
+                   'the per-scanner totals and time histograms and the slowest files.', group=CORE, cls=ScanOption)
+@click.option('--incremental-from', is_flag=False, default=None, metavar='<previous_scan>',
+              type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, path_type=fileutils.PATH_TYPE),
+              help='Reuse the scan results of the files unchanged since a <previous_scan> JSON output of the same <input> '
+                   'and only scan new and modified files. The previous scan must have used the --info option and the same '
+                   'scan options and ScanCode version.', group=CORE, cls=ScanOption)
+@click.option('--git-commits', is_flag=False, default=None, metavar='<commits>',
+              help='Scan the files of a commit of the git repository at <input> as <commit> or only the files added '
+                   'or modified between two commits as <base>..<head>. Files are read from the local git repository '
+                   'rather than from the working tree. This cannot be combined with the `--full-root` option.',
+              group=CORE, cls=ScanOption)
+@click.option('--shard', is_flag=False, default=None, metavar='<i/N>', callback=validate_shard,
+              help='Scan only the shard i of N shards of the files of <input> such that N scancode processes '
+                   'can each scan one shard. Use scancode-merge to merge the N shard scans in a single scan.',
+              group=CORE, cls=ScanOption)
+@click.option('--shard-by', is_flag=False, default=BY_PATH, show_default=True, type=click.Choice(SHARD_MODES),
+              help='Assign files to shards by a hash of their path or by size such that the shards have balanced '
+                   'total sizes. Has no effect unless --shard is requested.', group=CORE, cls=ScanOption)
+@click.option('--batch', is_flag=True, default=False,
+              help='Read <input> as a file listing the paths of the files or directories to scan, one per line. '
+                   'All the inputs are scanned in a single run reusing the same license index and scan processes. '
+                   'Their scan results are saved to <output_file> as a single JSON Lines stream where each line '
+                   'is tagged with its input. Requires the jsonlines output format.', group=CORE, cls=ScanOption)
 @click.option('--reindex-licenses', is_flag=True, default=False, is_eager=True, callback=reindex_licenses, help='Force a check and possible reindexing of the cached license index.', group=MISC, cls=ScanOption)
 
 def scancode(ctx,
@@ -399,7 +555,9 @@ def scancode(ctx,
              license_score, license_text, license_url_template,
              strip_root, full_root,
              format, verbose, quiet, processes,
-             diag, timeout, *args, **kwargs):
+             diag, timeout, soft_timeout, cache_store, cache_backend, cache_format,
+             resume, stream, stream_in_order, largest_first, info_threads, queue_depth, prefilter, timing, incremental_from,
+             git_commits, shard, shard_by, batch, *args, **kwargs):
     """scan the <input> file or directory for origin clues and license and save results to the <output_file>.
 
     The scan results are printed to stdout if <output_file> is not provided.
@@ -407,6 +565,21 @@ def scancode(ctx,
     """
 
     validate_exclusive(ctx, ['strip_root', 'full_root'])
+    validate_exclusive(ctx, ['git_commits', 'full_root'])
+    validate_exclusive(ctx, ['batch', 'git_commits'])
+    validate_exclusive(ctx, ['batch', 'incremental_from'])
+    validate_exclusive(ctx, ['batch', 'resume'])
+    validate_exclusive(ctx, ['stream', 'resume'])
+    if batch and format != 'jsonlines':
+        raise click.UsageError('The `--batch` option requires the jsonlines output `--format`.')
+    if soft_timeout is not None and soft_timeout <= 0:
+        raise click.UsageError('The `--soft-timeout` option requires a number of seconds above zero.')
+
+    # a resident pool of scan workers is provided when running in scancode-serve
+    resident_pool = None
+    if ctx.obj:
+        resident_pool = ctx.obj['pool']
+        processes = ctx.obj['processes']
 
     possible_scans = OrderedDict([
         ('infos', info),
@@ -431,6 +604,12 @@ def scancode(ctx,
         ('--format', format),
         ('--diag', diag),
     ])
+    if prefilter:
+        # the optional pre-filters skip scans: they have an effect on the results
+        options['--prefilter'] = sorted(set(prefilter))
+    if license_url_template != DEJACODE_LICENSE_URL:
+        # the license details of the results have a reference URL built from it
+        options['--license-url-template'] = license_url_template
 
     # Use default scan options when no options are provided on the command line.
     if not any(possible_scans.values()):
@@ -452,7 +631,9 @@ def scancode(ctx,
         if options[key] == False:
             del options[key]
 
-    get_licenses_with_score = partial(get_licenses, min_score=license_score, include_text=license_text, diag=diag, license_url_template=license_url_template)
+    # the license details are not cached with each license match but added
+    # once per license key when saving the results
+    get_licenses_with_score = partial(get_licenses, min_score=license_score, include_text=license_text, diag=diag, with_details=False)
 
     # List of scan functions in the same order as "possible_scans".
     scan_functions = [
@@ -467,7 +648,35 @@ def scancode(ctx,
     # FIXME: this is does not make sense to use tuple and positional values
     scanners = OrderedDict(zip(possible_scans.keys(), zip(possible_scans.values(), scan_functions)))
 
-    scans_cache_class = get_scans_cache_class()
+    # only the options that have an effect on the cached scan results
+    store_options = OrderedDict([
+        ('scans', [k for k, v in possible_scans.items() if v and k != 'infos']),
+        ('license_score', license_score),
+        ('license_text', license_text),
+        ('license_url_template', license_url_template),
+        ('diag', diag),
+        ('prefilters', sorted(set(prefilter))),
+    ])
+
+    scans_store_dir = None
+    if cache_store:
+        scans_store_dir = get_scans_store_dir(cache_store, store_options)
+
+    resume_options = None
+    if resume:
+        # the scans truncated with --soft-timeout are cached in a resume directory
+        resume_options = OrderedDict(store_options)
+        resume_options['soft_timeout'] = soft_timeout
+
+    if shard:
+        # recorded in the scan output to validate merged shards
+        options['--shard'] = '%d/%d' % shard
+        options['--shard-by'] = shard_by
+        shard = Shard(*shard, by=shard_by)
+
+    import plugincode.post_scan
+    import plugincode.pre_scan
+
     pre_scan_plugins = []
     for name, plugin in plugincode.pre_scan.get_pre_scan_plugins().items():
         user_input = kwargs[name.replace('-', '_')]
@@ -475,20 +684,20 @@ def scancode(ctx,
             options['--' + name] = user_input
             pre_scan_plugins.append(plugin(user_input))
 
-    try:
-        files_count, results, success = scan(
-            input_path=input,
-            scanners=scanners,
-            verbose=verbose,
-            quiet=quiet,
-            processes=processes,
-            timeout=timeout,
-            diag=diag,
-            scans_cache_class=scans_cache_class,
-            strip_root=strip_root,
-            full_root=full_root,
-            pre_scan_plugins=pre_scan_plugins)
+    previous_scan = None
+    if incremental_from:
+        scan_names = [k for k, v in scanners.items() if v[0]]
+        try:
+            previous_scan = PreviousScan(incremental_from, scan_names, options, version)
+        except PreviousScanError as e:
+            if not quiet:
+                echo_stderr('Cannot reuse the previous scan: %s. Scanning all files.' % e, fg='yellow')
 
+    def save_scan(files_count, results, scanned_input=input):
+        """
+        Run the requested post-scan plugins on the `results` scan results
+        iterable of the `scanned_input` and save them.
+        """
         # Find all scans that are both enabled and have a valid function
         # reference. This deliberately filters out the "info" scan
         # (which always has a "None" function reference) as there is no
@@ -497,6 +706,9 @@ def scancode(ctx,
         # FIXME: we should not use positional tings tuples for v[0], v[1] that are mysterious values for now
         active_scans = [k for k, v in scanners.items() if v[0] and v[1]]
 
+        if 'licenses' in active_scans:
+            results = expand_license_details(results, license_url_template)
+
         has_requested_post_scan_plugins = False
 
         for option, post_scan_handler in plugincode.post_scan.get_post_scan_plugins().items():
@@ -517,33 +729,209 @@ def scancode(ctx,
             echo_stderr('Saving results.', fg='green')
 
         # FIXME: we should have simpler args: a scan "header" and scan results
-        save_results(scanners, files_count, results, format, options, input, output_file)
+        save_results(scanners, files_count, results, format, options, scanned_input, output_file,
+                     tag_input=batch)
+
+    def scan_input(input_path):
+        """
+        Scan the `input_path` file or directory and save its scan results.
+        Return True on success.
+        """
+        scan_filter = None
+        if kwargs.get('only_findings'):
+            # iterate only the cached scans with findings using the scans index
+            active_scans = [k for k, v in scanners.items() if v[0] and v[1]]
+            scan_filter = ScanFilter(findings=active_scans)
 
+        try:
+            scans_cache_class = get_scans_cache_class(
+                scans_store_dir=scans_store_dir, backend=cache_backend, record_format=cache_format,
+                resume_dir=resume, scan_options=resume_options,
+                with_index=bool(scan_filter and scan_filter.uses_index))
+        except ScanCacheError as e:
+            raise click.UsageError('Cannot resume the scan from --resume <cache_dir>: %s.' % e)
+
+        scanned_path = input_path
+        git_export = None
+        if git_commits:
+            # the files of the commits are exported and scanned instead of <input>
+            try:
+                git_export = export_commits(input_path, git_commits, scans_cache=scans_cache_class())
+            except GitError as e:
+                raise click.UsageError('Invalid --git-commits for <input>: %s' % e)
+            scanned_path = git_export.target_dir
+
+        success = saved = False
+        try:
+            files_count, results, success = scan(
+                input_path=scanned_path,
+                scanners=scanners,
+                verbose=verbose,
+                quiet=quiet,
+                processes=processes,
+                timeout=timeout,
+                soft_timeout=soft_timeout,
+                diag=diag,
+                scans_cache_class=scans_cache_class,
+                strip_root=strip_root,
+                full_root=full_root,
+                pre_scan_plugins=pre_scan_plugins,
+                stream_to=stream and partial(save_scan, scanned_input=input_path) or None,
+                stream_in_order=stream_in_order,
+                largest_first=largest_first,
+                info_threads=info_threads,
+                queue_depth=queue_depth,
+                prefilters=get_prefilters(prefilter),
+                timing=timing,
+                previous_scan=previous_scan,
+                shard=shard,
+                resident_pool=resident_pool,
+                scan_filter=scan_filter,
+                git_export=git_export)
+
+            if not stream:
+                save_scan(files_count, results, scanned_input=input_path)
+            saved = True
+
+        finally:
+            # cleanup
+            cache = scans_cache_class()
+            if resume and not (saved and success):
+                # keep the cache to resume this scan
+                if not quiet:
+                    resume_dir = path_to_unicode(resume)
+                    echo_stderr('Scan cache kept in: %(resume_dir)s. '
+                                'Run this scan again with the same --resume option to resume it.' % locals(),
+                                fg='yellow')
+            else:
+                cache.clear()
+            if git_commits:
+                fileutils.delete(fileutils.parent_directory(scanned_path))
+        return success
+
+    inputs = [input]
+    batch_pool = None
+    if batch:
+        try:
+            inputs = read_batch_inputs(input)
+        except IOError as e:
+            raise click.UsageError('Invalid --batch <input>: %s' % e)
+        if processes and not resident_pool:
+            # a single pool of scan workers is used to scan all the inputs: the
+            # license index is loaded first such that the workers share it
+            with_licenses = scanners['licenses'][0]
+            with_copyrights = scanners['copyrights'][0]
+            _init_scan_worker(with_licenses, with_copyrights)
+            from scancode.pool import get_pool
+            resident_pool = batch_pool = get_pool(
+                processes=processes, maxtasksperchild=1000,
+                initializer=_init_scan_worker, initargs=(with_licenses, with_copyrights,))
+
+    success = True
+    try:
+        for input_path in inputs:
+            success = scan_input(input_path) and success
     finally:
-        # cleanup
-        cache = scans_cache_class()
-        cache.clear()
+        if batch_pool:
+            batch_pool.terminate()
 
     rc = 0 if success else 1
     ctx.exit(rc)
 
 
+def read_batch_inputs(location):
+    """
+    Return a list of input paths read from the file at `location` listing one
+    input path per line, ignoring empty lines. Raise an IOError if the file
+    cannot be read or if a listed input does not exist.
+    """
+    inputs = []
+    with open(location, 'rb') as inputs_file:
+        for line in inputs_file:
+            input_path = line.rstrip(b'\r\n')
+            if not input_path.strip():
+                continue
+            if not on_linux:
+                input_path = input_path.decode('utf-8')
+            if not os.path.exists(input_path):
+                raise IOError('listed input does not exist: %s' % path_to_unicode(input_path))
+            inputs.append(input_path)
+    return inputs
+
+
 def scan(input_path,
          scanners,
          verbose=False, quiet=False,
          processes=1, timeout=DEFAULT_TIMEOUT,
+         soft_timeout=None,
          diag=False,
          scans_cache_class=None,
          strip_root=False,
          full_root=False,
-         pre_scan_plugins=None):
+         pre_scan_plugins=None,
+         stream_to=None,
+         stream_in_order=False,
+         largest_first=False,
+         info_threads=0,
+         queue_depth=QUEUE_DEPTH,
+         prefilters=None,
+         timing=False,
+         previous_scan=None,
+         shard=None,
+         resident_pool=None,
+         scan_filter=None,
+         git_export=None):
     """
     Return a tuple of (files_count, scan_results, success) where
-    scan_results is an iterable and success is a boolean.
+    scan_results is an iterable and success is a boolean. A scan aborted with
+    Ctrl+C is never successful.
 
     Run each requested scan proper: each individual file scan is cached
     on disk to free memory. Then the whole set of scans is loaded from
     the cache and streamed at the end.
+
+    If `stream_to` is provided, the scan results are instead not cached
+    and streamed as soon as each file is scanned: `stream_to` is a
+    callable accepting a files_count (always None as the files are counted
+    only as they are streamed) and an iterable of scan results. The
+    scan results are streamed out of order unless `stream_in_order` is
+    True. In this case the returned scan_results are None.
+
+    If `largest_first` is True, the file infos of all the files are collected
+    first and the files are scanned from the largest to the smallest estimated
+    scan cost (this has no effect when streaming in order).
+
+    If `soft_timeout` is not None, the license and copyright scans of a file
+    are stopped once each has run for `soft_timeout` seconds and their partial
+    results are kept.
+
+    If `info_threads` is not zero, the file infos are collected with this number
+    of threads in the main process rather than in the scan processes.
+
+    When scanning with processes, each stage of the scan pipeline queues at
+    most `queue_depth` files or batches of files per process or thread such that
+    the memory used is bounded and a slow output throttles the scan and walk.
+
+    If `prefilters` is a sequence of Prefilters, the scans these pre-filters
+    skip for a file are not run and the skipped scans are counted and reported.
+
+    If `timing` is True, the time and peak memory used by each scanner on each
+    file are recorded and reported.
+
+    If `previous_scan` is a PreviousScan, the scan results of the files
+    unchanged since this previous scan are reused rather than scanned again.
+
+    If `shard` is a Shard, only the files of this shard are scanned.
+
+    If `resident_pool` is a pool of scan workers with `processes` processes,
+    this pool is used and left running rather than started for this scan.
+
+    If `scan_filter` is a ScanFilter, only the cached scan results selected by
+    this filter are returned. This has no effect when streaming.
+
+    If `git_export` is a GitExport for the files of git commits exported to
+    `input_path`, the file infos of these files are stored and reused by git
+    blob in the persistent scans store if any.
     """
     assert scans_cache_class
     scan_summary = OrderedDict()
@@ -569,7 +957,9 @@ def scan(input_path,
         if not quiet:
             echo_stderr('Building license detection index...', fg='green', nl=False)
         from licensedcode.cache import get_index
+        from licensedcode.cache import get_licenses_db
         get_index(False)
+        get_licenses_db()
         indexing_time = time() - scan_start
         if not quiet:
             echo_stderr('Done.', fg='green', nl=True)
@@ -577,23 +967,39 @@ def scan(input_path,
     scan_summary['indexing_time'] = indexing_time
 
     pool = None
+    thread_pool = None
 
-    resources = resource_paths(input_path, diag, scans_cache_class, pre_scan_plugins=pre_scan_plugins)
+    root_dir = _get_root_dir(input_path, strip_root, full_root)
+    resources = resource_paths(input_path, scans_cache_class, pre_scan_plugins=pre_scan_plugins, shard=shard,
+                               git_export=git_export)
     paths_with_error = []
+    # set if the scan was aborted before all the files were scanned
+    interrupted = []
+    # when streaming, the scan results with errors are kept for diagnostics
+    streamed_errors = []
+    # the count of the streamed scan results
+    streamed_count = [0]
     files_count = 0
 
-    logfile_path = scans_cache_class().cache_files_log
-    if on_linux:
-        file_logger = partial(open, logfile_path, 'wb')
-    else:
-        file_logger = partial(codecs.open, logfile_path, 'w', encoding='utf-8')
-
-    with file_logger() as logfile_fd:
+    with scans_cache_class().files_log_writer() as logfile_fd:
 
         logged_resources = _resource_logger(logfile_fd, resources)
 
-        scanit = partial(_scanit, scanners=scanners, scans_cache_class=scans_cache_class,
-                         diag=diag, timeout=timeout, processes=processes)
+        infoit = partial(_infoit, diag=diag, stream=bool(stream_to))
+        scanit = partial(_scanit, scanners=scanners, diag=diag, timeout=timeout,
+                         soft_timeout=soft_timeout, processes=processes,
+                         stream=bool(stream_to), timing=timing, prefilters=prefilters)
+        scan_timings = ScanTimings()
+        skipped_scans = SkippedScans()
+
+        # files with the same content are scanned only once, except when
+        # streaming in order as this would require buffering all the duplicates
+        scheduler = DuplicatesScheduler(enabled=not (stream_to and stream_in_order))
+        largest_first = largest_first and not (stream_to and stream_in_order)
+
+        # the time when each of the last scan tasks completed: the "tail time" is
+        # the time spent finishing the scan with less tasks than processes.
+        scan_completions = deque(maxlen=processes or 1)
 
         max_file_name_len = compute_fn_max_len()
         # do not display a file name in progress bar if there is less than 5 chars available.
@@ -601,15 +1007,59 @@ def scan(input_path,
         try:
             if processes:
                 # maxtasksperchild helps with recycling processes in case of leaks
-                pool = get_pool(processes=processes, maxtasksperchild=1000)
-                # Using chunksize is documented as much more efficient in the Python doc.
-                # Yet "1" still provides a better and more progressive feedback.
-                # With imap_unordered, results are returned as soon as ready and out of order.
-                scanned_files = pool.imap_unordered(scanit, logged_resources, chunksize=1)
-                pool.close()
+                # the initializer loads once the scans data in each worker
+                with_copyrights, _ = scanners.get('copyrights', (False, ''))
+                # imported only when scanning with processes as this import is
+                # slow and has monkey-patching side effects on multiprocessing
+                from scancode.pool import get_pool
+                pool = resident_pool or get_pool(processes=processes, maxtasksperchild=1000,
+                                                 initializer=_init_scan_worker,
+                                                 initargs=(with_licenses, with_copyrights,))
+                # Each pipeline stage feeds the pool with at most queue_depth
+                # tasks per process queued or in flight such that a slow
+                # consumer throttles the upstream stages and the walk.
+                # When streaming in order, results are buffered and returned in
+                # order. Otherwise, results are returned as soon as ready and
+                # out of order.
+                ordered = bool(stream_to and stream_in_order)
+                pool_imap = partial(bounded_imap, pool, max_queued=queue_depth * processes, ordered=ordered)
+                # file infos are collected first such that files can be
+                # scheduled for scanning based on their content
+                # small files are sent to the workers in batches to reduce
+                # the inter-process communication overhead
+                infoit_batch = partial(_run_batch, func=infoit)
+                info_batches = batched(logged_resources, get_cost=_info_cost)
+                if info_threads:
+                    # the file infos collection is mostly I/O and C code that
+                    # releases the GIL: threads collect these infos and feed
+                    # the files to scan to the scan processes
+                    from scancode.pool import get_thread_pool
+                    thread_pool = get_thread_pool(processes=info_threads)
+                    with_infos = bounded_imap(thread_pool, infoit_batch, info_batches,
+                                              max_queued=queue_depth * info_threads, ordered=ordered)
+                else:
+                    with_infos = pool_imap(infoit_batch, info_batches)
+                with_infos = chain.from_iterable(with_infos)
+                if previous_scan:
+                    with_infos = previous_scan.reusable(with_infos, root_dir)
+
+                to_scan = scheduler.unique(with_infos)
+                if largest_first:
+                    to_scan = sorted(to_scan, key=_scan_cost, reverse=True)
+                scanit_batch = partial(_run_batch, func=scanit)
+                scan_batches = batched(to_scan, get_cost=_scan_cost)
+                scanned_batches = pool_imap(scanit_batch, scan_batches)
+                scanned_batches = _track_completions(scanned_batches, scan_completions)
+                scanned_files = chain.from_iterable(scanned_batches)
             else:
                 # no multiprocessing with processes=0
-                scanned_files = imap(scanit, logged_resources)
+                with_infos = imap(infoit, logged_resources)
+                if previous_scan:
+                    with_infos = previous_scan.reusable(with_infos, root_dir)
+                to_scan = scheduler.unique(with_infos)
+                if largest_first:
+                    to_scan = sorted(to_scan, key=_scan_cost, reverse=True)
+                scanned_files = imap(scanit, to_scan)
                 if not quiet:
                     echo_stderr('Disabling multi-processing and multi-threading...', fg='yellow')
 
@@ -620,7 +1070,7 @@ def scan(input_path,
                 """Progress event displayed each time a file is scanned"""
                 if quiet or not item or not display_fn:
                     return ''
-                _scan_success, _scanned_path = item
+                _scan_success, _scanned_path = item[:2]
                 _scanned_path = unicode(toascii(_scanned_path))
                 if verbose:
                     _progress_line = _scanned_path
@@ -628,30 +1078,72 @@ def scan(input_path,
                     _progress_line = fixed_width_file_name(_scanned_path, max_file_name_len)
                 return style('Scanned: ') + style(_progress_line, fg=_scan_success and 'green' or 'red')
 
-            scanning_errors = []
-            files_count = 0
-            with progressmanager(
-                scanned_files, item_show_func=scan_event, show_pos=True,
-                verbose=verbose, quiet=quiet, file=sys.stderr) as scanned:
-                while True:
-                    try:
-                        result = scanned.next()
-                        scan_success, scanned_rel_path = result
-                        if not scan_success:
-                            paths_with_error.append(scanned_rel_path)
-                        files_count += 1
-                    except StopIteration:
-                        break
-                    except KeyboardInterrupt:
-                        print('\nAborted with Ctrl+C!')
-                        if pool:
-                            pool.terminate()
-                        break
+            def fanned_out():
+                """
+                Yield a tuple of (success, scanned relative path, scan result or
+                None if not streaming) for each scanned file, fanning out a scan
+                to all the files with the same content.
+                """
+                for scan_success, scanned_rel_path, infos, scan_details, timings, skipped in scanned_files:
+                    scan_timings.add(scanned_rel_path, timings)
+                    skipped_scans.add(skipped)
+                    duplicates = scheduler.duplicates(infos.get('sha1'))
+                    scanned_files_infos = [(scanned_rel_path, infos)]
+                    scanned_files_infos.extend((dupe.rel_path, dupe.infos) for dupe in duplicates)
+
+                    for rel_path, file_infos in scanned_files_infos:
+                        scan_result = None
+                        if stream_to:
+                            # the scan details are modified when building a result
+                            details = scan_details and OrderedDict(scan_details)
+                            rooted_path = get_rooted_path(rel_path, root_dir)
+                            scan_result = build_scan_result(rooted_path, scans, file_infos, details)
+                        yield scan_success, rel_path, scan_result
+
+            def scanned_results():
+                """
+                Yield the scanned results (or None if not streaming) as files are
+                scanned, displaying progress.
+                """
+                with progressmanager(
+                    fanned_out(), item_show_func=scan_event, show_pos=True,
+                    verbose=verbose, quiet=quiet, file=sys.stderr) as scanned:
+                    while True:
+                        try:
+                            scan_success, scanned_rel_path, scan_result = scanned.next()
+                            streamed_count[0] += 1
+                            if not scan_success:
+                                paths_with_error.append(scanned_rel_path)
+                                if scan_result:
+                                    streamed_errors.append(scan_result)
+                            yield scan_result
+                        except StopIteration:
+                            break
+                        except KeyboardInterrupt:
+                            print('\nAborted with Ctrl+C!')
+                            interrupted.append(True)
+                            if pool and not resident_pool:
+                                pool.terminate()
+                            if thread_pool:
+                                thread_pool.terminate()
+                            break
+
+            if stream_to:
+                # the files count is not known upfront: the streamed files are
+                # counted as they are saved and the count is saved last
+                stream_to(None, scanned_results())
+                files_count = streamed_count[0]
+            else:
+                files_count = sum(1 for _ in scanned_results())
         finally:
-            if pool:
+            if pool and not resident_pool:
                 # ensure the pool is really dead to work around a Python 2.7.3 bug:
                 # http://bugs.python.org/issue15101
                 pool.terminate()
+            if thread_pool:
+                thread_pool.terminate()
+            # save the data cached in this process such as with processes=0
+            scans_cache_class().flush()
 
     # TODO: add stats to results somehow
 
@@ -663,6 +1155,9 @@ def scan(input_path,
     scanning_time = total_time - indexing_time
     scan_summary['total_time'] = total_time
     scan_summary['scanning_time'] = scanning_time
+    tail_time = 0
+    if len(scan_completions) > 1:
+        tail_time = scan_completions[-1] - scan_completions[0]
 
     files_scanned_per_second = round(float(files_count) / scanning_time , 2)
     scan_summary['files_scanned_per_second'] = files_scanned_per_second
@@ -674,10 +1169,12 @@ def scan(input_path,
         if paths_with_error:
             if diag:
                 echo_stderr('Some files failed to scan properly:', fg='red')
-                # iterate cached results to collect all scan errors
-                cached_scan = scans_cache_class()
-                root_dir = _get_root_dir(input_path, strip_root, full_root)
-                scan_results = cached_scan.iterate(scans, root_dir, paths_subset=paths_with_error)
+                if stream_to:
+                    scan_results = streamed_errors
+                else:
+                    # iterate cached results to collect all scan errors
+                    cached_scan = scans_cache_class()
+                    scan_results = cached_scan.iterate(scans, root_dir, paths_subset=paths_with_error)
                 for scan_result in scan_results:
                     errored_path = scan_result.get('path', '')
                     echo_stderr('Path: ' + errored_path, fg='red')
@@ -694,13 +1191,26 @@ def scan(input_path,
         echo_stderr('Scan options:    %(_scans)s with %(processes)d process(es).' % locals())
         echo_stderr('Scanning speed:  %(files_scanned_per_second)s files per sec.' % locals())
         echo_stderr('Scanning time:   %(scanning_time)ds.' % locals())
+        echo_stderr('Tail time:       %(tail_time)ds.' % locals())
         echo_stderr('Indexing time:   %(indexing_time)ds.' % locals(), reset=True)
+        if previous_scan:
+            reused_count = previous_scan.reused_count
+            echo_stderr('Reused scans:    %(reused_count)d unchanged files.' % locals())
+        if skipped_scans.counts:
+            echo_stderr('Skipped scans:')
+            for line in skipped_scans.report():
+                echo_stderr(line)
+        if timing:
+            for line in scan_timings.report():
+                echo_stderr(line)
+
+    success = not paths_with_error and not interrupted
+    if stream_to:
+        return files_count, None, success
 
-    success = not paths_with_error
     # finally return an iterator on cached results
     cached_scan = scans_cache_class()
-    root_dir = _get_root_dir(input_path, strip_root, full_root)
-    return files_count, cached_scan.iterate(scans, root_dir), success
+    return files_count, cached_scan.iterate(scans, root_dir, scan_filter=scan_filter), success
 
 
 def _get_root_dir(input_path, strip_root=False, full_root=False):
@@ -736,14 +1246,220 @@ def _resource_logger(logfile_fd, resources):
         yield resource
 
 
-def _scanit(resource, scanners, scans_cache_class, diag, timeout=DEFAULT_TIMEOUT, processes=1):
+class DuplicatesScheduler(object):
+    """
+    Schedule scanning only once the files that have the same content SHA1 and
+    track the duplicated files such that the scan of the first file can be fanned
+    out to all the files with the same content when this scan is completed.
+
+    Note: unique() is consumed by the pool task handling thread while
+    duplicates() is called in the main thread when a scan is completed.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        # mapping of {sha1: [list of Resource]} for the files with a scan in
+        # progress and the list of files waiting for this scan.
+        self.waiting = {}
+
+    def unique(self, resources):
+        """
+        Yield the resources from a `resources` iterable of Resource with
+        collected infos that need to be scanned, skipping files with the same
+        content as a file whose scan is in progress.
+        """
+        for resource in resources:
+            sha1_digest = self.enabled and resource.infos.get('sha1')
+            if sha1_digest:
+                with self.lock:
+                    duplicates = self.waiting.get(sha1_digest)
+                    if duplicates is not None:
+                        duplicates.append(resource)
+                        continue
+                    self.waiting[sha1_digest] = []
+            yield resource
+
+    def duplicates(self, sha1_digest):
+        """
+        Return a list of Resource for the files with the same `sha1_digest`
+        content as a file whose scan has been completed. Files with this content
+        scheduled after this call are scanned again.
+        """
+        if not sha1_digest:
+            return []
+        with self.lock:
+            return self.waiting.pop(sha1_digest, [])
+
+
+# Pool tasks batching: the estimated cost of a file is a fixed base cost plus
+# its size in bytes. Files are batched up to a maximum cost and number of files
+# and a file that costs more than a batch is sent alone to a worker.
+FILE_BASE_COST = 4 * 1024
+BATCH_MAX_COST = 256 * 1024
+BATCH_MAX_FILES = 64
+
+
+def batched(items, get_cost, max_cost=BATCH_MAX_COST, max_items=BATCH_MAX_FILES):
+    """
+    Yield lists of items from an `items` iterable grouped in batches such that
+    the sum of the estimated `get_cost(item)` of the items of a batch does not
+    exceed `max_cost` and a batch has at most `max_items`. An item that costs
+    more than `max_cost` is yielded alone in its own batch.
+    """
+    batch = []
+    batch_cost = 0
+    for item in items:
+        cost = get_cost(item)
+        if batch and (batch_cost + cost > max_cost or len(batch) >= max_items):
+            yield batch
+            batch = []
+            batch_cost = 0
+        batch.append(item)
+        batch_cost += cost
+    if batch:
+        yield batch
+
+
+def _info_cost(resource):
+    """
+    Return the estimated cost to collect the file infos of a `resource`
+    Resource: this is mostly reading the file for checksums.
+    """
+    try:
+        size = os.path.getsize(resource.abs_path)
+    except (OSError, IOError):
+        size = 0
+    return FILE_BASE_COST + size
+
+
+def _scan_cost(resource):
     """
-    Run scans and cache results on disk. Return a tuple of (success, scanned relative
-    path) where sucess is True on success, False on error. Note that this is really
+    Return the estimated cost to scan a `resource` Resource with collected
+    infos. Binary files cost less per byte than text files as only their
+    strings are scanned.
+    """
+    if resource.is_cached:
+        # the scan of this file is not run again
+        return FILE_BASE_COST
+    infos = resource.infos
+    size = infos.get('size') or 0
+    if infos.get('is_binary') and not infos.get('is_text'):
+        size = size // 2
+    return FILE_BASE_COST + size
+
+
+def _track_completions(results, completions):
+    """
+    Yield the results from a `results` iterable, appending to a `completions`
+    list-like the time when each result is received.
+    """
+    for result in results:
+        completions.append(time())
+        yield result
+
+
+def _run_batch(batch, func):
+    """
+    Return a list of the results of calling `func` with each Resource of a
+    `batch` list. The cached data of the batch is saved at the end of the batch
+    such that it is visible to the other processes. Note that this is really
     only a wrapper function used as an execution unit for parallel processing.
     """
+    results = [func(resource) for resource in batch]
+    if batch:
+        batch[-1].scan_cache_class.flush()
+    return results
+
+
+def _init_scan_worker(with_licenses=False, with_copyrights=False):
+    """
+    Initialize a scan pool worker process: load once the data and detectors
+    used by the scans such that these are not loaded on the first scanned file
+    or reloaded by each worker recycled by the pool.
+
+    Note: on POSIX, the license index is built in the parent process and is
+    already available in a forked worker. On other OSes, it is loaded from the
+    index cache.
+
+    The watchdog thread enforcing the scan timeouts is started here too such
+    that it is already waiting for deadlines when the first file is scanned.
+    """
+    from scancode.interrupt import get_watchdog
+    get_watchdog()
+
+    # file infos are always collected
+    from typecode import magic2
+    magic2.get_detector(magic2.DETECT_TYPE)
+    magic2.get_detector(magic2.DETECT_MIME)
+
+    if with_licenses:
+        from licensedcode.cache import get_index
+        from licensedcode.cache import get_licenses_db
+        get_index(False)
+        get_licenses_db()
+
+    if with_copyrights:
+        from cluecode.copyrights import get_detector
+        get_detector()
+
+
+def _infoit(resource, diag, stream=False):
+    """
+    Collect file infos for a `resource` Resource and cache these on disk unless
+    `stream` is True. Return the resource updated with its infos. Note that this
+    is really only a wrapper function used as an execution unit for parallel
+    processing.
+    """
+    if resource.stored_infos is not None:
+        # this file is not on disk: its stored infos are reused
+        infos = resource.stored_infos
+    else:
+        # this is done here rather than when walking such that file infos
+        # collection runs in parallel in the pool workers.
+        infos = scan_infos(resource.abs_path, diag=diag)
+        if resource.stored_info_key and not infos['scan_errors']:
+            resource.scan_cache_class.put_stored_info(resource.stored_info_key, infos)
+    if stream:
+        resource.infos.update(infos)
+    else:
+        resource.put_info(infos)
+    return resource
+
+
+def _scanit(resource, scanners, diag, timeout=DEFAULT_TIMEOUT,
+            soft_timeout=None, processes=1, stream=False, timing=False, prefilters=None):
+    """
+    Run scans and cache results on disk for a `resource` Resource with collected
+    infos. Return a tuple of (success, scanned relative path, file infos, scan
+    details, timings, skipped scans) where sucess is True on success, False on
+    error. Note that
+    this is really only a wrapper function used as an execution unit for
+    parallel processing.
+
+    If `stream` is True, nothing is cached on disk (except in a persistent scans
+    store if any) and the returned scan details is a mapping of scans. Otherwise
+    the scan details are None.
+
+    If `timing` is True, the returned timings is a mapping of {scan name: (wall
+    time, peak RSS)} for each scanner run on this file. Otherwise, or if the
+    file was not scanned, the timings are None.
+
+    The returned skipped scans is a mapping of {scan name: pre-filter name} for
+    the scans skipped by the `prefilters` pre-filters.
+
+    `soft_timeout` and `prefilters` are passed to scan_one().
+    """
     success = True
-    scans_cache = scans_cache_class()
+    # the cache of a resource memoizes the keys of its path
+    scans_cache = resource.scan_cache_class
+    has_store = bool(scans_cache.scans_store_dir)
+
+    scan_result = None
+    timings = OrderedDict() if timing else None
+    skipped = OrderedDict()
+    if stream and has_store:
+        scan_result = scans_cache.get_scan(resource.rel_path, resource.infos)
+        resource.is_cached = scan_result is not None
 
     # note: "flag and function" expressions return the function if flag is True
     # note: the order of the scans matters to show things in logical order
@@ -760,22 +1476,31 @@ def _scanit(resource, scanners, scans_cache_class, diag, timeout=DEFAULT_TIMEOUT
         # Skip other scans if already cached
         # FIXME: ENSURE we only do this for files not directories
         if not resource.is_cached:
-            # run the scan as an interruptiple task
-            scans_runner = partial(scan_one, resource.abs_path, scanners, diag)
-            success, scan_result = interrupter(scans_runner, timeout=timeout)
-            if not success:
-                # Use scan errors as the scan result for that file on failure this is
-                # a top-level error not attachedd to a specific scanner, hence the
-                # "scan" key is used for these errors
-                scan_result = {'scan_errors': [scan_result]}
-
-            scans_cache.put_scan(resource.rel_path, resource.get_info(), scan_result)
+            if resource.reused_scan is not None:
+                # reuse the scan of a file unchanged since a previous scan
+                scan_result = resource.reused_scan
+            else:
+                # run the scan as an interruptiple task
+                scans_runner = partial(scan_one, resource.abs_path, scanners, diag,
+                                       timings=timings, soft_timeout=soft_timeout,
+                                       prefilters=prefilters, skipped=skipped)
+                success, scan_result = interrupter(scans_runner, timeout=timeout)
+                if not success:
+                    # Use scan errors as the scan result for that file on failure this is
+                    # a top-level error not attachedd to a specific scanner, hence the
+                    # "scan" key is used for these errors
+                    scan_result = {'scan_errors': [scan_result]}
+
+            if not stream or has_store:
+                scans_cache.put_scan(resource.rel_path, resource.infos, scan_result)
 
             # do not report success if some other errors happened
             if scan_result.get('scan_errors'):
                 success = False
 
-    return success, resource.rel_path
+    if not stream:
+        scan_result = None
+    return success, resource.rel_path, resource.infos, scan_result, timings, skipped
 
 
 def build_ignorer(ignores, unignores):
@@ -794,7 +1519,7 @@ def build_ignorer(ignores, unignores):
     return partial(ignore.is_ignored, ignores=ignores, unignores=unignores)
 
 
-def resource_paths(base_path, diag, scans_cache_class, pre_scan_plugins=None):
+def resource_paths(base_path, scans_cache_class, pre_scan_plugins=None, shard=None, git_export=None):
     """
     Yield `Resource` objects for all the files found at base_path
     (either a directory or file) given an absolute base_path. Only yield
@@ -802,8 +1527,17 @@ def resource_paths(base_path, diag, scans_cache_class, pre_scan_plugins=None):
     absolute path is a native OS path.
     base_path-relative path is a POSIX path.
 
+    If `shard` is a Shard, only yield the resources of this shard.
+
+    If `git_export` is a GitExport for the files of git commits exported to
+    `base_path`, the resources of the files that were not exported are yielded
+    too with their stored file infos.
+
     The relative path is guaranted to be unicode and may be URL-encoded and may not
     be suitable to address an actual file.
+
+    Note: file infos are not collected here but later when each resource is
+    scanned, such that walking stays cheap and only yields paths.
     """
     if base_path:
         if on_linux:
@@ -821,12 +1555,29 @@ def resource_paths(base_path, diag, scans_cache_class, pre_scan_plugins=None):
     ignores.update(ignore.ignores_VCS)
 
     ignorer = build_ignorer(ignores, unignores={})
+
+    if shard and shard.by == BY_SIZE:
+        # all the files must be walked first to assign them to shards by size
+        get_path = lambda p: get_relative_path(fileutils.as_posixpath(p), len_base_path, base_is_dir)
+        sized_paths = ((get_path(p), os.path.getsize(p))
+            for p in fileutils.resource_iter(base_path, ignored=ignorer, with_dirs=False))
+        if git_export:
+            sized_paths = chain(sized_paths, ((path, infos.get('size') or 0)
+                for path, infos in git_export.stored_infos.items()))
+        shard.index_sizes(sized_paths)
+
     resources = fileutils.resource_iter(base_path, ignored=ignorer)
+    if git_export:
+        # the files that were not exported are not on disk
+        stored = git_export.stored_locations(base_path)
+        resources = chain(resources, (p for p in stored if not ignorer(p, skip_special=False)))
 
     for abs_path in resources:
         resource = Resource(scans_cache_class, abs_path, base_is_dir, len_base_path)
-        # always fetch infos and cache.
-        resource.put_info(scan_infos(abs_path, diag=diag))
+        if shard and resource.rel_path not in shard:
+            continue
+        if git_export:
+            git_export.setup_resource(resource)
         if pre_scan_plugins:
             for plugin in pre_scan_plugins:
                 resource = plugin.process_resource(resource)
@@ -855,7 +1606,12 @@ def scan_infos(input_file, diag=False):
     return infos
 
 
-def scan_one(location, scanners, diag=False):
+# names of the scans that stop cooperatively at a soft timeout
+SOFT_TIMEOUT_SCANS = ('licenses', 'copyrights',)
+
+
+def scan_one(location, scanners, diag=False, timings=None, soft_timeout=None,
+             prefilters=None, skipped=None):
     """
     Scan one file or directory at `location` and return a scan result
     mapping, calling every scanner callable in the `scanners` mapping of
@@ -865,6 +1621,18 @@ def scan_one(location, scanners, diag=False):
     error messages. If `diag` is True, 'scan_errors' error messages also
     contain detailed diagnostic information such as a traceback if
     available.
+
+    If `timings` is a mapping, it is updated with a (wall time in seconds,
+    peak RSS in KB) tuple for each scan name.
+
+    If `soft_timeout` is not None, each of the SOFT_TIMEOUT_SCANS scanners is
+    called with a `deadline` Deadline of `soft_timeout` seconds. If a scanner
+    stopped at its deadline, its partial results are kept and its scan name is
+    listed in a 'truncated_scans' key of the scan result.
+
+    If `prefilters` is a sequence of Prefilters, the scans these pre-filters
+    skip are not run and have an empty result. If `skipped` is a mapping, it is
+    updated with the {scan name: pre-filter name} of these skipped scans.
     """
     if on_linux:
         location = path_to_bytes(location)
@@ -873,9 +1641,32 @@ def scan_one(location, scanners, diag=False):
 
     scan_result = OrderedDict()
     scan_errors = []
+    truncated_scans = []
+
+    skipped_scans = {}
+    if prefilters:
+        scan_names = [scan_name for scan_name, scanner in scanners.items() if scanner]
+        try:
+            skipped_scans = get_skipped_scans(location, prefilters, scan_names)
+        except Exception:
+            # let the scanners report the errors of a file that cannot be filtered
+            pass
+        if skipped is not None:
+            skipped.update(skipped_scans)
+
     for scan_name, scanner in scanners.items():
         if not scanner:
             continue
+        if scan_name in skipped_scans:
+            scan_result[scan_name] = []
+            continue
+        if timings is not None:
+            reset_peak_rss()
+            scan_start = time()
+        deadline = None
+        if soft_timeout is not None and scan_name in SOFT_TIMEOUT_SCANS:
+            deadline = Deadline(soft_timeout)
+            scanner = partial(scanner, deadline=deadline)
         try:
             scan_details = scanner(location)
             # consume generators
@@ -891,15 +1682,25 @@ def scan_one(location, scanners, diag=False):
             if diag:
                 messages.append('ERROR: ' + scan_name + ': ' + traceback.format_exc())
             scan_errors.extend(messages)
+        finally:
+            if timings is not None:
+                timings[scan_name] = time() - scan_start, get_peak_rss()
+        if deadline and deadline.reached:
+            truncated_scans.append(scan_name)
 
+    if truncated_scans:
+        scan_result['truncated_scans'] = truncated_scans
     # put errors last, after scans proper
     scan_result['scan_errors'] = scan_errors
     return scan_result
 
 
-def save_results(scanners, files_count, results, format, options, input, output_file):
+def save_results(scanners, files_count, results, format, options, input, output_file, tag_input=False):
     """
     Save scan results to file or screen.
+
+    If `tag_input` is True, the results are tagged with their `input` such that
+    the results of several inputs can be saved to the same JSON Lines output.
     """
 
     # note: in tests, sys.stdout is not used, but is instead some io
@@ -916,6 +1717,7 @@ def save_results(scanners, files_count, results, format, options, input, output_
 
     # Write scan results to file or screen as a formatted output ...
     # ... using a user-provided custom format template
+    import plugincode.output
     format_plugins = plugincode.output.get_format_plugins()
     if format not in format_plugins:
         # format may be a custom template file path
@@ -932,9 +1734,12 @@ def save_results(scanners, files_count, results, format, options, input, output_
     # ... or  using the selected format plugin
     else:
         writer = format_plugins[format]
+        # only the jsonlines writer supports tagging results with their input
+        writer_kwargs = dict(tag_input=True) if tag_input else {}
         # FIXME: carrying an echo function does not make sense
         # FIXME: do not use input as a variable name
         writer(files_count=files_count, version=version, notice=notice,
                scanned_files=results,
                options=options,
-               input=input, output_file=output_file, _echo=echo_stderr)
+               input=input, output_file=output_file, _echo=echo_stderr,
+               **writer_kwargs)
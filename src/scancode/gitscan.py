@@ -0,0 +1,290 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+from datetime import datetime
+from hashlib import sha1
+import os
+import subprocess
+
+from commoncode import fileutils
+from commoncode.fileutils import path_to_bytes
+from commoncode.fileutils import path_to_unicode
+from commoncode.system import on_linux
+
+
+"""
+Scan the files of a local git repository read from its object database rather
+than from its working tree: either all the files of a commit tree or only the
+files added or modified between two commits.
+
+The files are enumerated from git trees and the content of each blob is read
+once with its git object id. These files are exported to a temporary directory
+that is then scanned as if it were the repository directory. No network access
+is ever needed.
+
+With a persistent scans store, the file infos of each exported file are stored
+keyed by its blob id and file name. A file whose blob has stored file infos and
+a stored scan is not exported at all: its stored infos and scan are reused. The
+files of a commit tree are all dated with the commit date.
+"""
+
+# git file modes of regular files: symlinks and submodules are not scanned
+REGULAR_FILE_MODES = (b'100644', b'100755',)
+
+
+class GitError(Exception):
+    pass
+
+
+def git(repo_dir, args, stdin=None):
+    """
+    Run git with the `args` list of arguments in the `repo_dir` git repository
+    and return its output. Raise a GitError on failure.
+    """
+    cmd = ['git'] + args
+    try:
+        proc = subprocess.Popen(cmd, cwd=repo_dir, stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitError('cannot run git: %s' % e)
+    stdout, stderr = proc.communicate(stdin)
+    if proc.returncode:
+        raise GitError(stderr.strip() or 'git %s failed' % ' '.join(args))
+    return stdout
+
+
+def parse_commits(commits):
+    """
+    Return a tuple of (base commit or None, head commit) given a `commits`
+    string as either "<commit>" or "<base>..<head>" where an empty <head>
+    defaults to HEAD.
+    """
+    if '..' not in commits:
+        return None, commits
+    base, _, head = commits.partition('..')
+    if not base:
+        raise GitError('missing base commit in: %(commits)s' % locals())
+    return base, head or 'HEAD'
+
+
+def get_tree_blobs(repo_dir, commit):
+    """
+    Yield tuples of (path, blob id) for the regular files of the tree of a
+    `commit` in the git repository at `repo_dir`.
+    """
+    output = git(repo_dir, ['ls-tree', '-r', '-z', '--full-tree', commit])
+    for entry in output.split(b'\0'):
+        if not entry:
+            continue
+        # each entry is "<mode> <type> <object id>\t<path>"
+        meta, _, path = entry.partition(b'\t')
+        mode, _type, blob_id = meta.split(b' ')
+        if mode in REGULAR_FILE_MODES:
+            yield path, blob_id
+
+
+def get_changed_blobs(repo_dir, base, head):
+    """
+    Yield tuples of (path, blob id) for the regular files added or modified
+    between the `base` and `head` commits in the git repository at `repo_dir`.
+    """
+    output = git(repo_dir, ['diff', '--raw', '-z', '--no-abbrev', '--no-renames',
+                            '--diff-filter=AMT', base, head, '--'])
+    fields = output.split(b'\0')
+    # each change is a ":<old mode> <new mode> <old id> <new id> <status>"
+    # field followed by a path field
+    for meta, path in zip(fields[::2], fields[1::2]):
+        _old_mode, mode, _old_id, blob_id, _status = meta.lstrip(b':').split(b' ')
+        if mode in REGULAR_FILE_MODES:
+            yield path, blob_id
+
+
+def get_commit_time(repo_dir, commit):
+    """
+    Return the commit time of a `commit` of the git repository at `repo_dir` as
+    a POSIX timestamp.
+    """
+    return int(git(repo_dir, ['log', '-1', '--format=%ct', commit]).strip())
+
+
+def blob_info_key(blob_id, path):
+    """
+    Return a scans store key for the file infos of a file with a `blob_id` git
+    blob id at `path`: the file infos depend on the file content and name.
+    """
+    name = path.rpartition(b'/')[2]
+    return sha1(blob_id + b'\0' + name).hexdigest()
+
+
+class GitExport(object):
+    """
+    The regular files of git commits exported to a `target_dir` directory,
+    except for the files whose file infos and scan are reused from a persistent
+    scans store. All the files are dated with a `commit_time` timestamp.
+    """
+    def __init__(self, target_dir, commit_time):
+        self.target_dir = target_dir
+        self.commit_time = commit_time
+        # the YYYY-MM-DD date of the files
+        self.date = datetime.utcfromtimestamp(commit_time).isoformat()[:10]
+        # mapping of {path: scans store key of the file infos} for the
+        # exported files
+        self.info_keys = {}
+        # mapping of {path: file infos} for the files not exported
+        self.stored_infos = OrderedDict()
+
+    def stored_locations(self, base_path):
+        """
+        Yield the locations of the files not exported for a `base_path` native
+        path to the exported directory.
+        """
+        for path in self.stored_infos:
+            if on_linux:
+                path = path_to_bytes(path)
+                yield os.path.join(base_path, *path.split(b'/'))
+            else:
+                yield os.path.join(base_path, *path.split('/'))
+
+    def setup_resource(self, resource):
+        """
+        Set the stored infos of a `resource` Resource of a file not exported or
+        the scans store key of its file infos otherwise.
+        """
+        infos = self.stored_infos.get(resource.rel_path)
+        if infos is not None:
+            resource.stored_infos = infos
+        else:
+            resource.stored_info_key = self.info_keys.get(resource.rel_path)
+
+
+def export_blobs(repo_dir, blobs, target_dir, mtime=None):
+    """
+    Write the content of each (path, blob id) of a `blobs` iterable read from the
+    git repository at `repo_dir` to a file at this path relative to
+    `target_dir`. Each distinct blob is read only once from git. Set the
+    modification time of the files to `mtime` if provided. Return the number
+    of exported files.
+    """
+    paths_by_blob_id = OrderedDict()
+    for path, blob_id in blobs:
+        paths_by_blob_id.setdefault(blob_id, []).append(path)
+
+    if on_linux:
+        target_dir = path_to_bytes(target_dir)
+        separator = b'/'
+    else:
+        target_dir = path_to_unicode(target_dir)
+        separator = '/'
+
+    exported = 0
+    proc = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=repo_dir,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        for blob_id, paths in paths_by_blob_id.items():
+            proc.stdin.write(blob_id + b'\n')
+            proc.stdin.flush()
+            # the output is a "<object id> <type> <size>" line, then the
+            # content and a line feed
+            header = proc.stdout.readline().split()
+            if len(header) != 3:
+                raise GitError('cannot read git object: %s' % blob_id)
+            content = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)
+
+            first_location = None
+            for path in paths:
+                if not on_linux:
+                    path = path.decode('utf-8')
+                location = os.path.join(target_dir, *path.split(separator))
+                fileutils.create_dir(os.path.dirname(location))
+                if first_location:
+                    fileutils.copyfile(first_location, location)
+                else:
+                    with open(location, 'wb') as exported_file:
+                        exported_file.write(content)
+                    first_location = location
+                if mtime is not None:
+                    os.utime(location, (mtime, mtime))
+                exported += 1
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return exported
+
+
+def export_commits(repo_dir, commits, scans_cache=None):
+    """
+    Export the files of the `commits` of the git repository at `repo_dir` to a
+    new temporary directory named after `repo_dir` and return a GitExport.
+    `commits` is either "<commit>" to export all the files of a commit tree or
+    "<base>..<head>" to export only the files added or modified between two
+    commits.
+
+    If `scans_cache` is a scans cache with a persistent scans store, the files
+    with file infos and a scan in this store are not exported.
+    """
+    repo_dir = os.path.abspath(os.path.expanduser(repo_dir))
+    if not os.path.isdir(repo_dir):
+        raise GitError('not a directory: %(repo_dir)s' % locals())
+
+    # resolve the commits first to fail early on invalid commits
+    base, head = parse_commits(commits)
+    for commit in (base, head):
+        if commit:
+            try:
+                git(repo_dir, ['rev-parse', '--verify', '--quiet', commit + '^{commit}'])
+            except GitError:
+                raise GitError('unknown git commit: %(commit)s' % locals())
+
+    if base:
+        blobs = get_changed_blobs(repo_dir, base, head)
+    else:
+        blobs = get_tree_blobs(repo_dir, head)
+
+    target_dir = os.path.join(fileutils.get_temp_dir('scancode_git'), fileutils.file_name(repo_dir))
+    fileutils.create_dir(target_dir)
+    git_export = GitExport(target_dir, get_commit_time(repo_dir, head))
+
+    if scans_cache and scans_cache.scans_store_dir:
+        to_export = []
+        for path, blob_id in blobs:
+            key = blob_info_key(blob_id, path)
+            infos = scans_cache.get_stored_info(key)
+            if infos is not None and scans_cache.has_stored_scan(infos):
+                infos['date'] = git_export.date
+                git_export.stored_infos[path_to_unicode(path)] = infos
+            else:
+                git_export.info_keys[path_to_unicode(path)] = key
+                to_export.append((path, blob_id))
+        blobs = to_export
+
+    export_blobs(repo_dir, blobs, target_dir, mtime=git_export.commit_time)
+    return git_export
@@ -0,0 +1,155 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import json
+
+from scancode.cache import get_rooted_path
+
+
+"""
+Incremental scans: reuse the scan results of a previous JSON scan output for the
+files that did not change since this previous scan.
+
+A file is unchanged if it has the same path, size, modification date and SHA1
+as in the previous scan. The previous scan must have been run with the --info
+option and with the same ScanCode version and scan options as the current scan.
+"""
+
+# options that must have the same value in a previous scan and in the current
+# scan for the previous scan results to be reused
+REUSED_SCAN_OPTIONS = (
+    '--copyright',
+    '--license',
+    '--package',
+    '--email',
+    '--url',
+    '--license-score',
+    '--license-text',
+    '--license-url-template',
+    '--diag',
+    '--prefilter',
+    '--strip-root',
+    '--full-root',
+)
+
+
+class PreviousScanError(Exception):
+    pass
+
+
+def load_scan(location):
+    """
+    Return a tuple of (header mapping, list of scanned files mappings) loaded
+    from the JSON or JSON Lines scan output file at `location`.
+    """
+    with open(location, 'rb') as scan_file:
+        content = scan_file.read()
+    try:
+        scan = json.loads(content, object_pairs_hook=OrderedDict)
+        return scan, scan.get('files', [])
+    except ValueError:
+        pass
+
+    # JSON Lines: a first header line then one line per file
+    header = OrderedDict()
+    files = []
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        scan_line = json.loads(line, object_pairs_hook=OrderedDict)
+        header.update(scan_line.get('header', {}))
+        files.extend(scan_line.get('files', []))
+    return header, files
+
+
+class PreviousScan(object):
+    """
+    An index by path of the scan results of the files of a previous scan used
+    to reuse the scan results of the files unchanged since this scan.
+    """
+    def __init__(self, location, scan_names, options, version):
+        """
+        Load the previous scan output file at `location` for the `scan_names`
+        list of scans, the current scan `options` mapping and the current
+        ScanCode `version`. Raise a PreviousScanError if the previous scan
+        cannot be reused.
+        """
+        self.location = location
+        self.scan_names = [name for name in scan_names if name != 'infos']
+        # mapping of {rooted path: ((size, date, sha1), scan details)}
+        self.files = {}
+        self.reused_count = 0
+
+        try:
+            header, files = load_scan(location)
+        except ValueError as e:
+            raise PreviousScanError('invalid JSON scan file: %s' % e)
+
+        previous_version = header.get('scancode_version')
+        if previous_version != version:
+            raise PreviousScanError(
+                'scanned with ScanCode version %(previous_version)s' % locals())
+
+        previous_options = header.get('scancode_options') or {}
+        if not previous_options.get('--info'):
+            raise PreviousScanError('scanned without the --info option')
+        for option in REUSED_SCAN_OPTIONS:
+            if (previous_options.get(option) or None) != (options.get(option) or None):
+                raise PreviousScanError('scanned with a different %(option)s option' % locals())
+
+        for scanned_file in files:
+            if scanned_file.get('type') != 'file':
+                continue
+            if scanned_file.get('scan_errors') or scanned_file.get('truncated_scans'):
+                # partial scans are scanned again
+                continue
+            if not all(name in scanned_file for name in self.scan_names):
+                continue
+            scan_details = OrderedDict((name, scanned_file[name]) for name in self.scan_names)
+            scan_details['scan_errors'] = []
+            key = scanned_file.get('size'), scanned_file.get('date'), scanned_file.get('sha1')
+            self.files[scanned_file['path']] = key, scan_details
+
+    def reusable(self, resources, root_dir=None):
+        """
+        Yield the Resource with collected infos from a `resources` iterable,
+        setting the `reused_scan` of the resources unchanged since the previous
+        scan to their previous scan details.
+        """
+        for resource in resources:
+            previous = self.files.pop(get_rooted_path(resource.rel_path, root_dir), None)
+            if previous:
+                infos = resource.infos
+                key, scan_details = previous
+                if infos.get('sha1') and key == (infos.get('size'), infos.get('date'), infos.get('sha1')):
+                    resource.reused_scan = scan_details
+                    self.reused_count += 1
+            yield resource
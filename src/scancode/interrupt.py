@@ -15,19 +15,26 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
-from commoncode.system import on_windows
+import ctypes
+import os
+import threading
+from time import time
+
+try:
+    from thread import get_ident
+except ImportError:
+    from _thread import get_ident
 
 DEFAULT_TIMEOUT = 120  # seconds
 
 
 """
 This modules povides an interruptible() function to run a callable and
-stop it after a timeout with a windows and POSIX implementation.
+stop it after a timeout.
 
 Call `func` function with `args` and `kwargs` arguments and return a
-tuple of (success, return value). `func` is invoked through an OS-
-specific wrapper and will be interrupted if it does not return within
-`timeout` seconds.
+tuple of (success, return value). `func` is invoked in the calling thread
+and will be interrupted if it does not return within `timeout` seconds.
 
 `func` returned results must be pickable.
 `timeout` in seconds defaults to DEFAULT_TIMEOUT.
@@ -41,125 +48,169 @@ tuple is the returned value of `func`.
 If success is False, the call did not complete within `timeout`
 seconds and was interrupted. In this case, the second item in the
 tuple is an error message string.
+
+The timeouts are enforced by a single watchdog thread per process rather
+than with a signal and an interval timer armed for each call: arming and
+disarming the watchdog for a call only updates a mapping of deadlines. When
+a deadline expires, the watchdog raises a TimeoutError asynchronously in the
+thread running `func` and raises it again until `func` returns in case
+`func` catches and ignores it. A call that returns after its deadline has
+expired is reported as interrupted. Like a signal handler, this asynchronous
+exception is only raised between two Python bytecodes: a long running call
+into C code is interrupted only when it returns.
 """
 
 class TimeoutError(Exception):
     pass
 
 
-if not on_windows:
+def async_raise(tid, exctype=Exception):
     """
-    Some code based in part and inspired from the RobotFramework and
-    heavily modified.
-
-    Copyright 2008-2015 Nokia Networks
-    Copyright 2016-     Robot Framework Foundation
-
-    Licensed under the Apache License, Version 2.0 (the "License");
-    you may not use this file except in compliance with the License.
-    You may obtain a copy of the License at
+    Raise an Exception of `exctype` in the Thread with id `tid`. Clear a
+    pending and not yet raised exception of this thread if `exctype` is None.
 
-        http://www.apache.org/licenses/LICENSE-2.0
-
-    Unless required by applicable law or agreed to in writing, software
-    distributed under the License is distributed on an "AS IS" BASIS,
-    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
-    implied. See the License for the specific language governing
-    permissions and limitations under the License.
+    Based on Killable Threads By Tomer Filiba
+    from http://tomerfiliba.com/recipes/Thread2/
+    license: public domain.
     """
+    assert isinstance(tid, (int, long)), 'Invalid  thread id: must an integer'
 
-    import signal
-
-    def interruptible(func, args=None, kwargs=None, timeout=DEFAULT_TIMEOUT):
-        """
-        POSIX, signals-based interruptible runner.
-        """
-
-        def handler(signum, frame):
-            raise TimeoutError
+    tid = ctypes.c_long(tid)
+    exception = ctypes.py_object(exctype) if exctype is not None else None
+    res = ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, exception)
+    if res == 0:
+        raise ValueError('Invalid thread id.')
+    elif res != 1:
+        # if it returns a number greater than one, you're in trouble,
+        # and you should call it again with exc=NULL to revert the effect
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, None)
+        raise SystemError('PyThreadState_SetAsyncExc failed.')
 
-        try:
-            signal.signal(signal.SIGALRM, handler)
-            signal.setitimer(signal.ITIMER_REAL, timeout)
-            return True, func(*(args or ()), **(kwargs or {}))
-        except TimeoutError:
-            return False, ('ERROR: Processing interrupted: timeout after '
-                           '%(timeout)d seconds.' % locals())
 
-        except Exception:
-            import traceback
-            return False, ('ERROR: Unknown error:\n' + traceback.format_exc())
+# seconds between two TimeoutError raised in a thread that is still armed
+REFIRE_INTERVAL = 0.1
 
-        finally:
-            signal.setitimer(signal.ITIMER_REAL, 0)
 
-else:
+class Watchdog(object):
     """
-    Run a function in an interruptible thread with a timeout.
-    Based on an idea of dano "Dan O'Reilly"
-    http://stackoverflow.com/users/2073595/dano
-    But not code has been reused from this post.
+    A daemon thread raising a TimeoutError in the threads whose armed deadline
+    has expired, and raising it again every REFIRE_INTERVAL seconds until these
+    threads are disarmed.
     """
-
-    import ctypes
-    import multiprocessing
-    import Queue
-    try:
-        import thread
-    except ImportError:
-        import _thread as thread
-
-
-    def interruptible(func, args=None, kwargs=None, timeout=DEFAULT_TIMEOUT):
+    def __init__(self):
+        self.pid = os.getpid()
+        # note: a plain lock rather than the default RLock such that acquiring
+        # it never runs Python code in the watched threads
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        # mapping of {thread id: deadline time}
+        self.deadlines = {}
+        # ids of the threads where a TimeoutError was raised since armed
+        self.fired = set()
+        # the time when the watchdog thread checks the deadlines next or None
+        self.wake_at = None
+        self.thread = threading.Thread(target=self.watch, name='scancode-watchdog')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def arm(self, timeout):
         """
-        Windows, threads-based interruptible runner. It can work also on
-        POSIX, but is not reliable and works only if everything is pickable.
+        Raise a TimeoutError in the current thread if it is not disarmed
+        within `timeout` seconds.
         """
-        # We run `func` in a thread and run a loop until timeout
-        results = Queue.Queue()
-
-        def runner():
-            results.put(func(*(args or ()), **(kwargs or {})))
+        tid = get_ident()
+        deadline = time() + timeout
+        with self.lock:
+            self.fired.discard(tid)
+            self.deadlines[tid] = deadline
+            # only wake up the watchdog thread if it would check too late
+            if self.wake_at is None or deadline < self.wake_at:
+                self.condition.notify()
+
+    def disarm(self):
+        """
+        Cancel the deadline of the current thread. A TimeoutError for this
+        thread that was not raised yet is cancelled too. Return True if a
+        TimeoutError was raised for this thread since it was armed.
+        """
+        tid = get_ident()
+        with self.lock:
+            self.deadlines.pop(tid, None)
+            if tid not in self.fired:
+                return False
+            async_raise(tid, None)
+            self.fired.discard(tid)
+            return True
+
+    def watch(self):
+        with self.condition:
+            while True:
+                now = time()
+                for tid, deadline in list(self.deadlines.items()):
+                    if deadline > now:
+                        continue
+                    try:
+                        async_raise(tid, TimeoutError)
+                    except (ValueError, SystemError):
+                        # this thread is gone
+                        del self.deadlines[tid]
+                        continue
+                    self.fired.add(tid)
+                    # the TimeoutError may be caught and ignored by the called
+                    # function such as with a broad except clause: raise it
+                    # again later until this thread is disarmed
+                    self.deadlines[tid] = now + REFIRE_INTERVAL
+                if self.deadlines:
+                    self.wake_at = min(self.deadlines.values())
+                    self.condition.wait(self.wake_at - now)
+                else:
+                    self.wake_at = None
+                    self.condition.wait()
+
+
+# the Watchdog of the current process
+_watchdog = None
+_watchdog_lock = threading.Lock()
+
+
+def get_watchdog():
+    """
+    Return the Watchdog of the current process, started on first use.
+    """
+    global _watchdog
+    with _watchdog_lock:
+        if _watchdog is None or _watchdog.pid != os.getpid():
+            _watchdog = Watchdog()
+        return _watchdog
 
-        tid = thread.start_new_thread(runner, ())
 
+def interruptible(func, args=None, kwargs=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Watchdog-based interruptible runner.
+    """
+    watchdog = get_watchdog()
+    try:
         try:
-            res = results.get(timeout=timeout)
-            return True, res
-        except (Queue.Empty, multiprocessing.TimeoutError):
-            return False, ('ERROR: Processing interrupted: timeout after '
-                           '%(timeout)d seconds.' % locals())
+            watchdog.arm(timeout)
+            result = True, func(*(args or ()), **(kwargs or {}))
+        except TimeoutError:
+            raise
         except Exception:
             import traceback
-            return False, ('ERROR: Unknown error:\n' + traceback.format_exc())
+            result = False, ('ERROR: Unknown error:\n' + traceback.format_exc())
         finally:
-            try:
-                async_raise(tid, Exception)
-            except (SystemExit, ValueError):
-                pass
-
-
-    def async_raise(tid, exctype=Exception):
-        """
-        Raise an Exception in the Thread with id `tid`. Perform cleanup if
-        needed.
-
-        Based on Killable Threads By Tomer Filiba
-        from http://tomerfiliba.com/recipes/Thread2/
-        license: public domain.
-        """
-        assert isinstance(tid, int), 'Invalid  thread id: must an integer'
-
-        tid = ctypes.c_long(tid)
-        exception = ctypes.py_object(Exception)
-        res = ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, exception)
-        if res == 0:
-            raise ValueError('Invalid thread id.')
-        elif res != 1:
-            # if it returns a number greater than one, you're in trouble,
-            # and you should call it again with exc=NULL to revert the effect
-            ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, 0)
-            raise SystemError('PyThreadState_SetAsyncExc failed.')
+            timed_out = watchdog.disarm()
+
+    except TimeoutError:
+        # the TimeoutError may also have been raised while disarming
+        watchdog.disarm()
+        timed_out = True
+
+    if timed_out:
+        # also when the TimeoutError was caught and ignored in `func`
+        return False, ('ERROR: Processing interrupted: timeout after '
+                       '%(timeout)d seconds.' % locals())
+    return result
 
 
 def fake_interruptible(func, args=None, kwargs=None, timeout=DEFAULT_TIMEOUT):
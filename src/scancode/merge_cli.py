@@ -0,0 +1,112 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from functools import partial
+
+import click
+click.disable_unicode_literals_warning = True
+
+from commoncode import fileutils
+
+import plugincode.output
+
+from scancode.cli import print_about
+from scancode.cli import version
+from scancode.incremental import load_scan
+from scancode.shard import merge_shards
+from scancode.shard import ShardMergeError
+from scancode import utils
+
+
+echo_stderr = partial(click.secho, err=True)
+
+
+# merged scans can only be saved in the formats that can be merged
+MERGE_FORMATS = ('json', 'json-pp', 'jsonlines',)
+
+
+def print_version(ctx, param, value):
+    if not value or ctx.resilient_parsing:
+        return
+    echo_stderr('ScanCode scancode-merge version ' + version)
+    ctx.exit()
+
+
+epilog_text = '''\b\bExamples:
+
+\b
+Scan the 'samples' directory in two shards, possibly on two machines, then
+merge the two shard scans in a single scan saved to 'samples.json':
+
+    scancode --shard 1/2 samples samples-1.json
+    scancode --shard 2/2 samples samples-2.json
+    scancode-merge samples-1.json samples-2.json samples.json
+'''
+
+
+class MergeCommand(utils.BaseCommand):
+    short_usage_help = '''
+Try 'scancode-merge --help' for help on options and arguments.'''
+
+
+@click.command(name='scancode-merge', epilog=epilog_text, cls=MergeCommand)
+@click.pass_context
+
+@click.argument('shard_scans', metavar='<shard_scan>...', nargs=-1, required=True,
+                type=click.Path(exists=True, dir_okay=False, readable=True, path_type=fileutils.PATH_TYPE))
+@click.argument('output_file', metavar='<output_file>', type=click.File(mode='wb', lazy=False))
+
+@click.option('-f', '--format', is_flag=False, default='json', show_default=True, type=click.Choice(MERGE_FORMATS),
+              help='Set <output_file> format.')
+@click.option('--quiet', is_flag=True, default=False, help='Do not print any summary message.')
+
+@click.help_option('-h', '--help')
+@click.option('--about', is_flag=True, is_eager=True, callback=print_about, help='Show information about ScanCode and licensing and exit.')
+@click.option('--version', is_flag=True, is_eager=True, callback=print_version, help='Show the version and exit.')
+
+def scancode_merge(ctx, shard_scans, output_file, format, quiet, *args, **kwargs):  # @ReservedAssignment
+    """merge the JSON or JSON Lines <shard_scan> scans of all the shards of a scan run with the --shard option and save the merged scan to <output_file>.
+    """
+    try:
+        header, files = merge_shards([load_scan(shard_scan) for shard_scan in shard_scans])
+    except (ShardMergeError, ValueError) as e:
+        echo_stderr('Cannot merge shard scans: %s' % e, fg='red')
+        ctx.exit(1)
+
+    writer = plugincode.output.get_format_plugins()[format]
+    writer(files_count=len(files), version=header.get('scancode_version'),
+           notice=header.get('scancode_notice'), scanned_files=files,
+           options=header.get('scancode_options', {}),
+           input=None, output_file=output_file, _echo=echo_stderr)
+
+    if not quiet:
+        files_count = len(files)
+        shards_count = len(shard_scans)
+        echo_stderr('Merged %(files_count)d files from %(shards_count)d shard scans.' % locals(), fg='green')
+    ctx.exit(0)
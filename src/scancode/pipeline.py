@@ -0,0 +1,148 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+from functools import partial
+import threading
+import traceback
+
+# Python 2 and 3 support
+try:
+    # Python 2
+    import Queue as queue
+except ImportError:
+    # Python 3
+    import queue
+
+
+"""
+Bounded pipeline stages running a function on a pool with backpressure.
+
+A multiprocessing Pool.imap consumes its whole input iterable into an unbounded
+task queue as fast as it can, and all its results are queued until consumed:
+with a slow consumer, a large input is entirely walked and kept in memory. A
+bounded_imap instead feeds the pool from its own thread with at most a fixed
+number of items queued or in flight. A new item is fed only once the result of
+a previous item has been consumed, such that a slow consumer throttles the
+upstream stages all the way to the walk of the scanned files.
+"""
+
+# default maximum number of items queued or in flight per process
+QUEUE_DEPTH = 8
+
+# wait for results with a timeout such that a KeyboardInterrupt is not blocked
+# forever waiting on a queue (see also scancode.pool)
+WAIT_TIMEOUT = 1e10
+
+# end of input marker
+_DONE = object()
+
+
+def _call(func, item):
+    """
+    Return a tuple of (True, func(item)) or (False, error message) if calling
+    `func` failed.
+    """
+    try:
+        return True, func(item)
+    except Exception:
+        return False, traceback.format_exc()
+
+
+class PipelineError(Exception):
+    pass
+
+
+def bounded_imap(pool, func, items, max_queued, ordered=False):
+    """
+    Yield the results of calling `func` on each item of the `items` iterable
+    using a multiprocessing or thread `pool` with at most `max_queued` items
+    queued or in flight at any time. Results are yielded in the order of the
+    `items` if `ordered` is True or as soon as available otherwise.
+
+    Raise a PipelineError if calling `func` fails or if iterating `items`
+    fails.
+    """
+    assert max_queued > 0
+    slots = threading.Semaphore(max_queued)
+    # queue of (index, success, result) tuples
+    results = queue.Queue()
+    call = partial(_call, func)
+
+    def feed():
+        count = 0
+        try:
+            iterator = iter(items)
+            while True:
+                # wait for a free slot before getting the next item such that
+                # the upstream stages are throttled too
+                slots.acquire()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                pool.apply_async(call, (item,),
+                                 callback=partial(_put_result, results, count))
+                count += 1
+            results.put((count, True, _DONE))
+        except Exception:
+            results.put((count, False, traceback.format_exc()))
+
+    feeder = threading.Thread(target=feed, name='bounded_imap feeder')
+    # do not keep the process running if the results are not consumed
+    feeder.daemon = True
+    feeder.start()
+
+    # mapping of {index: result} of results received out of order
+    pending = {}
+    next_index = 0
+    total = None
+    while total is None or next_index < total:
+        index, success, result = results.get(True, WAIT_TIMEOUT)
+        if result is _DONE:
+            total = index
+            continue
+        if not success:
+            raise PipelineError(result)
+        if not ordered:
+            slots.release()
+            next_index += 1
+            yield result
+            continue
+        pending[index] = result
+        while next_index in pending:
+            result = pending.pop(next_index)
+            slots.release()
+            next_index += 1
+            yield result
+
+
+def _put_result(results, index, success_result):
+    success, result = success_result
+    results.put((index, success, result))
@@ -56,3 +56,7 @@ pool.IMapUnorderedIterator.__next__ = pool.IMapUnorderedIterator.next
 
 def get_pool(processes=None, initializer=None, initargs=(), maxtasksperchild=None):
     return pool.Pool(processes, initializer, initargs, maxtasksperchild)
+
+
+def get_thread_pool(processes=None, initializer=None, initargs=()):
+    return pool.ThreadPool(processes, initializer, initargs)
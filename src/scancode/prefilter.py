@@ -0,0 +1,181 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+
+"""
+Pre-filters deciding which scanners to run on a file: each pre-filter is a
+named test on the content type of a file that skips some scans of the files
+that pass this test because these scans cannot or are unlikely to produce any
+finding for this file. The default pre-filters only skip scans that would not
+return anything. The optional pre-filters are enabled by name and may skip
+rare findings such as copyrights in the metadata of media files.
+"""
+
+# scans that detect clues in the text of a file
+TEXT_SCANS = ('licenses', 'copyrights', 'emails', 'urls',)
+
+# binary data files larger than this size in bytes are considered as large
+LARGE_DATA_SIZE = 5 * 1000 * 1000
+
+# files whose leading bytes have a Shannon entropy below this value are mostly
+# made of a few repeated bytes
+LOW_ENTROPY = 1.3
+
+# number of leading bytes of a file used to compute its entropy
+ENTROPY_LENGTH = 5000
+
+
+class Prefilter(object):
+    """
+    A pre-filter named `name` that skips the `scans` scan names for the files
+    whose content type passes the `test` function. `test` accepts a
+    typecode.contenttype.Type and returns True if the scans should be skipped.
+    Note that `test` must be a module-level function such that a Prefilter can
+    be sent to the scan processes.
+    """
+    def __init__(self, name, test, scans=TEXT_SCANS):
+        self.name = name
+        self.test = test
+        self.scans = scans
+
+    def __repr__(self):
+        return 'Prefilter(%r)' % self.name
+
+
+def is_empty(T):
+    return T.size == 0
+
+
+def has_no_text(T):
+    return not T.contains_text
+
+
+def is_media(T):
+    return T.is_media
+
+
+def is_large_data(T):
+    return (T.size > LARGE_DATA_SIZE and not T.is_text
+            and 'data' in T.filetype_file.lower())
+
+
+def is_low_entropy(T):
+    from typecode.entropy import entropy
+    return entropy(T.location, length=ENTROPY_LENGTH) < LOW_ENTROPY
+
+
+# pre-filters that only skip scans returning nothing, always enabled
+DEFAULT_PREFILTERS = (
+    Prefilter('empty', is_empty),
+    Prefilter('no_text', has_no_text),
+)
+
+# pre-filters enabled by name
+OPTIONAL_PREFILTERS = OrderedDict([
+    ('media', Prefilter('media', is_media)),
+    ('large-data', Prefilter('large-data', is_large_data)),
+    ('low-entropy', Prefilter('low-entropy', is_low_entropy)),
+])
+
+
+def get_prefilters(names=()):
+    """
+    Return a tuple of the default Prefilters and of the optional Prefilters
+    with `names`.
+    """
+    return DEFAULT_PREFILTERS + tuple(OPTIONAL_PREFILTERS[name] for name in names)
+
+
+def get_skipped_scans(location, prefilters, scan_names):
+    """
+    Return a mapping of {scan name: pre-filter name} for the scans in
+    `scan_names` that the first matching pre-filter in the `prefilters`
+    sequence skips for the file at `location`. Directories are never filtered.
+    """
+    from typecode.contenttype import get_type
+
+    skipped = OrderedDict()
+    T = get_type(location)
+    if not T.is_file:
+        return skipped
+    for prefilter in prefilters:
+        scans = [s for s in scan_names if s in prefilter.scans and s not in skipped]
+        if scans and prefilter.test(T):
+            for scan_name in scans:
+                skipped[scan_name] = prefilter.name
+    return skipped
+
+
+class SkippedScans(object):
+    """
+    Aggregate counters of the scans skipped by pre-filters.
+    """
+    def __init__(self):
+        # mapping of {pre-filter name: [files count, mapping of {scan name: count}]}
+        self.counts = OrderedDict()
+
+    def add(self, skipped):
+        """
+        Add the `skipped` mapping of {scan name: pre-filter name} of a file.
+        """
+        if not skipped:
+            return
+        prefilter_names = set()
+        for scan_name, prefilter_name in skipped.items():
+            counts = self.counts.setdefault(prefilter_name, [0, OrderedDict()])
+            if prefilter_name not in prefilter_names:
+                counts[0] += 1
+                prefilter_names.add(prefilter_name)
+            counts[1][scan_name] = counts[1].get(scan_name, 0) + 1
+
+    def summary(self):
+        """
+        Return a mapping of {pre-filter name: {'files_count': count, 'scans':
+        mapping of {scan name: skipped count}}}.
+        """
+        summary = OrderedDict()
+        for prefilter_name, (files_count, scans) in self.counts.items():
+            summary[prefilter_name] = OrderedDict([
+                ('files_count', files_count),
+                ('scans', OrderedDict(scans)),
+            ])
+        return summary
+
+    def report(self):
+        """
+        Return a list of report lines for the skipped scans.
+        """
+        lines = []
+        for prefilter_name, details in self.summary().items():
+            scans = ', '.join('%s: %d' % item for item in details['scans'].items())
+            lines.append('  %s: %d files (%s)' % (prefilter_name, details['files_count'], scans))
+        return lines
@@ -0,0 +1,290 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import struct
+
+
+"""
+A compact binary record format for the JSON-like scan data saved in a scans
+cache: the file infos and scan results of one file.
+
+A record is a MAGIC header followed by a tree of tagged values:
+ - integers are varints: a tag byte and one byte for 0 to 127 such as most
+   line numbers,
+ - strings are UTF-8 and each string is stored once per record: any later
+   occurrence such as a repeated license key or URL is a reference to the first
+   one. The keys and common values of scan results such as `start_line` or
+   `matched_rule` are references to a static table of KNOWN_STRINGS and are
+   never stored.
+ - mappings are ordered and the keys of a mapping are stored once per record
+   as a "shape": mappings with the same keys such as all the license matches
+   of a file only store their values.
+
+This format is typically half the size of the same data as JSON. Note that
+records are meant for a cache: this format is tied to the KNOWN_STRINGS table
+and to the RECORD_VERSION in the MAGIC header that must be bumped when this
+table or the format changes.
+"""
+
+RECORD_VERSION = 1
+
+# all records start with this header that is never the start of a JSON document
+MAGIC = b'\xffSCR' + chr(RECORD_VERSION)
+
+# Strings known to both the writer and the reader of a record. Only append to
+# this table and bump the RECORD_VERSION when changing it.
+KNOWN_STRINGS = (
+    # file infos
+    'path', 'type', 'name', 'base_name', 'extension', 'date', 'size', 'sha1',
+    'md5', 'files_count', 'mime_type', 'file_type', 'programming_language',
+    'is_binary', 'is_text', 'is_archive', 'is_media', 'is_source', 'is_script',
+    'file', 'directory', 'text/plain',
+    # scans
+    'scan_errors', 'truncated_scans', 'licenses', 'copyrights', 'packages',
+    'emails', 'urls',
+    # licenses
+    'key', 'score', 'short_name', 'category', 'owner', 'homepage_url',
+    'text_url', 'reference_url', 'spdx_license_key', 'spdx_url', 'start_line',
+    'end_line', 'matched_rule', 'identifier', 'license_choice', 'matcher',
+    'rule_length', 'matched_length', 'match_coverage', 'rule_relevance',
+    'matched_text', '',
+    'Attribution', 'Commercial', 'Copyleft', 'Copyleft Limited',
+    'Free Restricted', 'Patent License', 'Permissive', 'Proprietary Free',
+    'Public Domain', 'Unstated License', 'Unspecified',
+    '1-hash', '2-aho', '3-seq', '4-spdx-id',
+    # copyrights, emails and urls
+    'statements', 'holders', 'authors', 'email', 'url',
+)
+
+# value tags
+(NONE, FALSE, TRUE, INT, NEG_INT, FLOAT, STRING, STRING_REF,
+ LIST, MAPPING, MAPPING_REF) = range(11)
+
+_pack_double = struct.Struct(b'<d').pack
+_unpack_double = struct.Struct(b'<d').unpack_from
+
+# precomputed byte strings of common tags followed by a one byte varint
+_BYTES = [chr(i) for i in range(256)]
+_INTS = [chr(INT) + chr(i) for i in range(128)]
+_STRING_REFS = [chr(STRING_REF) + chr(i) for i in range(128)]
+_MAPPING_REFS = [chr(MAPPING_REF) + chr(i) for i in range(128)]
+_NONE, _FALSE, _TRUE, _NEG_INT, _FLOAT, _STRING, _LIST, _MAPPING = [
+    chr(t) for t in (NONE, FALSE, TRUE, NEG_INT, FLOAT, STRING, LIST, MAPPING)]
+
+
+class RecordError(Exception):
+    pass
+
+
+def is_record(data):
+    """
+    Return True if the `data` byte string is a record.
+    """
+    return data[:len(MAGIC)] == MAGIC
+
+
+def _varint(n, append, _bytes=_BYTES):
+    """
+    Append the varint bytes of a positive integer `n` with `append`.
+    """
+    while n > 0x7f:
+        append(_bytes[0x80 | (n & 0x7f)])
+        n >>= 7
+    append(_bytes[n])
+
+
+def dumps(value):
+    """
+    Return a record byte string for a JSON-like `value` made of mappings,
+    lists or tuples, strings, integers, floats, booleans and None.
+    """
+    out = [MAGIC]
+    append = out.append
+    strings = dict(_KNOWN_REFS)
+    shapes = {}
+
+    def dump_string(s):
+        ref = strings.get(s)
+        if ref is None:
+            if type(s) is bytes:
+                s = s.decode('utf-8')
+                ref = strings.get(s)
+        if ref is not None:
+            if ref < 0x80:
+                append(_STRING_REFS[ref])
+            else:
+                append(_BYTES[STRING_REF])
+                _varint(ref, append)
+            return
+        strings[s] = len(strings)
+        s = s.encode('utf-8')
+        append(_STRING)
+        _varint(len(s), append)
+        append(s)
+
+    def dump(v):
+        t = type(v)
+        if t is unicode or t is bytes:
+            dump_string(v)
+        elif t is int or t is long:
+            if 0 <= v < 0x80:
+                append(_INTS[v])
+            elif v >= 0:
+                append(_BYTES[INT])
+                _varint(v, append)
+            else:
+                append(_NEG_INT)
+                _varint(-v, append)
+        elif t is bool:
+            # note: bool is not int for this type check
+            append(_TRUE if v else _FALSE)
+        elif v is None:
+            append(_NONE)
+        elif isinstance(v, dict):
+            keys = tuple(v)
+            shape = shapes.get(keys)
+            if shape is None:
+                shapes[keys] = len(shapes)
+                append(_MAPPING)
+                _varint(len(keys), append)
+                for key in keys:
+                    dump_string(key)
+            elif shape < 0x80:
+                append(_MAPPING_REFS[shape])
+            else:
+                append(_BYTES[MAPPING_REF])
+                _varint(shape, append)
+            for item in v.itervalues():
+                dump(item)
+        elif t is list or t is tuple:
+            append(_LIST)
+            _varint(len(v), append)
+            for item in v:
+                dump(item)
+        elif t is float:
+            append(_FLOAT)
+            append(_pack_double(v))
+        else:
+            raise RecordError('Unsupported record value type: %(t)r' % locals())
+
+    dump(value)
+    return b''.join(out)
+
+
+def loads(data):
+    """
+    Return a JSON-like value loaded from a `data` record byte string. Mappings
+    are loaded as OrderedDict, strings as unicode and tuples as lists.
+    """
+    if not is_record(data):
+        raise RecordError('Invalid or unsupported record version.')
+
+    # note: indexing a bytearray returns integers
+    codes = bytearray(data)
+    strings = list(KNOWN_STRINGS)
+    shapes = []
+    # position in data
+    pos = [len(MAGIC)]
+
+    def varint():
+        p = pos[0]
+        b = codes[p]
+        p += 1
+        n = b & 0x7f
+        shift = 7
+        while b > 0x7f:
+            b = codes[p]
+            p += 1
+            n |= (b & 0x7f) << shift
+            shift += 7
+        pos[0] = p
+        return n
+
+    def load():
+        p = pos[0]
+        tag = codes[p]
+        if tag <= TRUE or tag == FLOAT:
+            # these tags have no varint
+            if tag == NONE:
+                pos[0] = p + 1
+                return None
+            if tag == TRUE:
+                pos[0] = p + 1
+                return True
+            if tag == FALSE:
+                pos[0] = p + 1
+                return False
+            pos[0] = p + 9
+            return _unpack_double(data, p + 1)[0]
+
+        # fast path for a one byte varint
+        n = codes[p + 1]
+        if n < 0x80:
+            pos[0] = p + 2
+        else:
+            pos[0] = p + 1
+            n = varint()
+
+        if tag == STRING_REF:
+            return strings[n]
+        if tag == INT:
+            return n
+        if tag == MAPPING_REF:
+            keys = shapes[n]
+            return OrderedDict(zip(keys, [load() for _ in keys]))
+        if tag == STRING:
+            start = pos[0]
+            pos[0] = end = start + n
+            s = data[start:end].decode('utf-8')
+            strings.append(s)
+            return s
+        if tag == LIST:
+            return [load() for _ in xrange(n)]
+        if tag == MAPPING:
+            keys = tuple([load() for _ in xrange(n)])
+            shapes.append(keys)
+            return OrderedDict(zip(keys, [load() for _ in keys]))
+        if tag == NEG_INT:
+            return -n
+        raise RecordError('Invalid record value tag: %(tag)r' % locals())
+
+    try:
+        value = load()
+    except (IndexError, UnicodeDecodeError, struct.error):
+        value = None
+        pos[0] = -1
+    if pos[0] != len(data):
+        raise RecordError('Truncated or invalid record.')
+    return value
+
+
+# mapping of {known string: reference}
+_KNOWN_REFS = {s: i for i, s in enumerate(KNOWN_STRINGS)}
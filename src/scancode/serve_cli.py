@@ -0,0 +1,137 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from functools import partial
+import signal
+
+import click
+click.disable_unicode_literals_warning = True
+
+# Import early because this import has monkey-patching side effects
+from scancode.pool import get_pool
+
+from scancode.cli import _init_scan_worker
+from scancode.cli import print_about
+from scancode.cli import version
+from scancode.server import ScanServer
+from scancode import utils
+
+
+echo_stderr = partial(click.secho, err=True)
+
+
+def print_version(ctx, param, value):
+    if not value or ctx.resilient_parsing:
+        return
+    echo_stderr('ScanCode scancode-serve version ' + version)
+    ctx.exit()
+
+
+epilog_text = '''\b\bExamples:
+
+\b
+Start a scan server with four scan processes:
+
+    scancode-serve --processes 4
+
+\b
+Scan the 'samples' directory for licenses and copyrights and get the results
+as JSON:
+
+    curl -d '{"args": ["--license", "--copyright", "/path/to/samples"]}' http://127.0.0.1:8765/scan
+
+\b
+Get the server metrics as JSON:
+
+    curl http://127.0.0.1:8765/metrics
+'''
+
+
+def _init_serve_worker():
+    """
+    Initialize a resident scan pool worker process. Ctrl+C is handled only in
+    the server process that terminates the pool on exit.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_scan_worker(with_licenses=True, with_copyrights=True)
+
+
+class ServeCommand(utils.BaseCommand):
+    short_usage_help = '''
+Try 'scancode-serve --help' for help on options and arguments.'''
+
+
+@click.command(name='scancode-serve', epilog=epilog_text, cls=ServeCommand)
+@click.pass_context
+
+@click.option('--host', default='127.0.0.1', show_default=True, help='Listen on this host address.')
+@click.option('--port', default=8765, show_default=True, type=int, help='Listen on this port.')
+@click.option('-n', '--processes', is_flag=False, default=1, type=int, show_default=True,
+              help='Scan with this number of resident parallel processes. Use 0 to scan in the server process.')
+@click.option('--max-requests', is_flag=False, default=4, type=click.IntRange(min=1), show_default=True,
+              help='Run at most this number of concurrent scan requests. Other requests are rejected.')
+@click.option('--verbose', is_flag=True, default=False, help='Log every request.')
+
+@click.help_option('-h', '--help')
+@click.option('--about', is_flag=True, is_eager=True, callback=print_about, help='Show information about ScanCode and licensing and exit.')
+@click.option('--version', is_flag=True, is_eager=True, callback=print_version, help='Show the version and exit.')
+
+def scancode_serve(ctx, host, port, processes, max_requests, verbose, *args, **kwargs):
+    """run a scan server that keeps the license index and the scan processes loaded and accepts scan requests over HTTP.
+
+    POST a JSON object with scancode command line "args" to /scan to run a scan and get its results.
+    GET /metrics to get the server metrics.
+    The server can scan any path readable by its process and should only listen on localhost.
+    """
+    echo_stderr('Loading license detection index...', fg='green', nl=False)
+    # loaded in the server process such that forked workers share the index
+    _init_scan_worker(with_licenses=True, with_copyrights=True)
+    echo_stderr('Done.', fg='green')
+    # loaded once before the scan requests are run concurrently in threads
+    from scancode.cli import scancode
+    scancode.load_plugins()
+
+    pool = None
+    if processes:
+        pool = get_pool(processes=processes, maxtasksperchild=1000,
+                        initializer=_init_serve_worker)
+    try:
+        server = ScanServer((host, port), pool=pool, processes=processes,
+                            max_requests=max_requests, verbose=verbose)
+        echo_stderr('Serving scans on http://%s:%d/ with %d process(es)...'
+                    % (host, server.server_port, processes), fg='green')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            echo_stderr('\nStopped with Ctrl+C!')
+        server.server_close()
+    finally:
+        if pool:
+            pool.terminate()
+    ctx.exit(0)
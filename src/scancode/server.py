@@ -0,0 +1,258 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import json
+import os
+from threading import BoundedSemaphore
+from threading import Lock
+from time import time
+
+# Python 2 and 3 support
+try:
+    # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from BaseHTTPServer import HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    # Python 3
+    from http.server import BaseHTTPRequestHandler
+    from http.server import HTTPServer
+    from socketserver import ThreadingMixIn
+
+# Python 2 and 3 support
+try:
+    # Python 2
+    unicode
+except NameError:
+    # Python 3
+    unicode = str
+
+import click
+
+from commoncode import fileutils
+
+
+"""
+A long-running scan server that keeps the license index, the licenses and the
+scan workers pool resident in memory such that each scan request does not pay
+again for the process startup and the loading of the license index.
+
+The server accepts scan requests over HTTP as a POST to /scan of a JSON object
+such as {"args": ["--license", "--copyright", "/path/to/scan"]} where args are
+the scancode command line arguments. The scan results are returned in the
+requested output format (JSON by default). The server metrics are returned as
+JSON for a GET of /metrics.
+
+The server has no authentication: it can scan any path readable by the server
+process and should only listen on localhost.
+"""
+
+# content types by output format, defaulting to plain text
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'json-pp': 'application/json',
+    'jsonlines': 'application/x-ndjson',
+    'html': 'text/html',
+    'html-app': 'text/html',
+    'spdx-rdf': 'application/rdf+xml',
+}
+
+
+def get_format(args):
+    """
+    Return the output format requested in a list of scancode `args`.
+    """
+    scan_format = 'json'
+    for i, arg in enumerate(args):
+        if arg in ('-f', '--format') and i + 1 < len(args):
+            scan_format = args[i + 1]
+        elif arg.startswith('--format='):
+            scan_format = arg.partition('=')[2]
+    return scan_format
+
+
+class ServerMetrics(object):
+    """
+    Thread-safe counters of the scan requests handled by a ScanServer.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.start_time = time()
+        self.active = 0
+        self.requests = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.scan_time = 0
+        self.max_scan_time = 0
+
+    def started(self):
+        with self.lock:
+            self.requests += 1
+            self.active += 1
+
+    def finished(self, success, scan_time):
+        with self.lock:
+            self.active -= 1
+            if success:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.scan_time += scan_time
+            self.max_scan_time = max(self.max_scan_time, scan_time)
+
+    def reject(self):
+        with self.lock:
+            self.rejected += 1
+
+    def summary(self):
+        """
+        Return a mapping of the current metrics.
+        """
+        with self.lock:
+            summary = OrderedDict()
+            summary['uptime'] = time() - self.start_time
+            summary['active_requests'] = self.active
+            summary['requests'] = self.requests
+            summary['completed'] = self.completed
+            summary['failed'] = self.failed
+            summary['rejected'] = self.rejected
+            summary['total_scan_time'] = self.scan_time
+            finished = self.completed + self.failed
+            summary['average_scan_time'] = finished and self.scan_time / finished or 0
+            summary['max_scan_time'] = self.max_scan_time
+            return summary
+
+
+class ScanServer(ThreadingMixIn, HTTPServer):
+    """
+    An HTTP server running scans concurrently up to `max_requests` scan
+    requests, using a resident `pool` of scan workers with `processes`
+    processes (or no pool if `processes` is 0).
+    """
+    daemon_threads = True
+
+    def __init__(self, address, pool=None, processes=0, max_requests=4, verbose=False):
+        HTTPServer.__init__(self, address, ScanRequestHandler)
+        self.pool = pool
+        self.processes = processes
+        self.max_requests = max_requests
+        self.requests_limit = BoundedSemaphore(max_requests)
+        self.verbose = verbose
+        self.metrics = ServerMetrics()
+
+    def metrics_summary(self):
+        summary = self.metrics.summary()
+        summary['processes'] = self.processes
+        summary['max_requests'] = self.max_requests
+        return summary
+
+    def run_scan(self, args):
+        """
+        Run a scan for a list of scancode command line `args` and return a
+        tuple of (scancode exit code, scan output bytes). Raise a click
+        UsageError on invalid arguments.
+        """
+        from scancode.cli import scancode
+        output_file = os.path.join(fileutils.get_temp_dir('scancode-serve'), 'scan')
+        try:
+            try:
+                scancode.main(args=list(args) + ['--quiet', output_file],
+                              prog_name='scancode', standalone_mode=False,
+                              obj=dict(pool=self.pool, processes=self.processes))
+                rc = 0
+            except SystemExit as e:
+                rc = e.code or 0
+            with open(output_file, 'rb') as output:
+                return rc, output.read()
+        finally:
+            fileutils.delete(fileutils.parent_directory(output_file))
+
+
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handle scan and metrics requests of a ScanServer.
+    """
+    def do_GET(self):
+        if self.path.rstrip('/') != '/metrics':
+            return self.send_json(404, {'error': 'Not found: %s' % self.path})
+        self.send_json(200, self.server.metrics_summary())
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/scan':
+            return self.send_json(404, {'error': 'Not found: %s' % self.path})
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            args = json.loads(self.rfile.read(length))['args']
+            if not isinstance(args, list) or not all(isinstance(arg, unicode) for arg in args):
+                raise ValueError('args must be a list of strings')
+        except (ValueError, KeyError, TypeError) as e:
+            return self.send_json(400, {'error': 'Invalid scan request: %s' % e})
+
+        server = self.server
+        if not server.requests_limit.acquire(False):
+            server.metrics.reject()
+            return self.send_json(503, {'error': 'Too many concurrent scan requests.'},
+                                  headers={'Retry-After': '1'})
+        server.metrics.started()
+        start = time()
+        rc = None
+        try:
+            rc, output = server.run_scan(args)
+        except click.ClickException as e:
+            error = 400, {'error': e.format_message()}
+        except Exception as e:
+            error = 500, {'error': 'Scan failed: %r' % e}
+        finally:
+            server.metrics.finished(rc == 0, time() - start)
+            server.requests_limit.release()
+
+        if rc is None:
+            return self.send_json(*error)
+        content_type = CONTENT_TYPES.get(get_format(args), 'text/plain')
+        self.send_content(200, output, content_type, headers={'X-ScanCode-Exit-Code': str(rc)})
+
+    def send_json(self, status, data, headers=None):
+        self.send_content(status, json.dumps(data), 'application/json', headers)
+
+    def send_content(self, status, content, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):  # @ReservedAssignment
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
@@ -0,0 +1,179 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+from hashlib import sha1
+import heapq
+
+from commoncode.fileutils import path_to_bytes
+
+
+"""
+Deterministic partitioning of the files of a scan in shards such that a large
+codebase can be scanned in parallel by several scancode processes, each
+scanning one shard, possibly on different machines. The partial scans are then
+merged back in a single scan with scancode-merge.
+
+Files are assigned to shards either by a hash of their path or in bins of
+balanced sizes. In both cases, the assignment only depends on the paths
+relative to the scanned root and on the file sizes such that every process
+computes the same partition independently.
+"""
+
+# shard assignment modes
+BY_PATH = 'path'
+BY_SIZE = 'size'
+SHARD_MODES = (BY_PATH, BY_SIZE,)
+
+
+def parse_shard(value):
+    """
+    Return a tuple of (shard number, shards count) given a "i/N" string `value`
+    where 1 <= i <= N. Raise a ValueError if the value is invalid.
+    """
+    number, _, count = value.partition('/')
+    number = int(number)
+    count = int(count)
+    if not 1 <= number <= count:
+        raise ValueError('shard number must be between 1 and %(count)d' % locals())
+    return number, count
+
+
+def path_shard(path, count):
+    """
+    Return the shard number between 1 and `count` assigned to a `path`.
+    """
+    return int(sha1(path_to_bytes(path)).hexdigest()[:8], 16) % count + 1
+
+
+def size_shards(sized_paths, count):
+    """
+    Return a mapping of {path: shard number} assigning each path of a
+    `sized_paths` iterable of (path, size) to one of `count` shards such that the
+    total size of each shard is balanced, assigning the largest files first to
+    the shard with the smallest total size.
+    """
+    shards = [(0, number) for number in range(1, count + 1)]
+    shards_by_path = {}
+    for path, size in sorted(sized_paths, key=lambda ps: (-ps[1], ps[0])):
+        total, number = heapq.heappop(shards)
+        shards_by_path[path] = number
+        heapq.heappush(shards, (total + size, number))
+    return shards_by_path
+
+
+class Shard(object):
+    """
+    Select the paths of shard `number` of `count` shards assigned by path hash
+    or by size.
+    """
+    def __init__(self, number, count, by=BY_PATH):
+        assert by in SHARD_MODES
+        self.number = number
+        self.count = count
+        self.by = by
+        # mapping of {path: shard number} for paths assigned by size
+        self.shards_by_path = {}
+
+    def index_sizes(self, sized_paths):
+        """
+        Assign by size the paths of a `sized_paths` iterable of (path, size).
+        Other paths are assigned by path hash.
+        """
+        self.shards_by_path = size_shards(sized_paths, self.count)
+
+    def __contains__(self, path):
+        number = self.shards_by_path.get(path)
+        if number is None:
+            number = path_shard(path, self.count)
+        return number == self.number
+
+
+class ShardMergeError(Exception):
+    pass
+
+
+def merge_shards(scans):
+    """
+    Return a tuple of (header, files) for a scan merged from a `scans` list of
+    (header, files) tuples for the scans of all the shards of a scan. Raise a
+    ShardMergeError if these scans are not the scans of all the shards of the
+    same scan.
+
+    The merged files are sorted by path and the merged header is the header of
+    the first scan without the shard options and with the merged files count.
+    """
+    files_by_shard = {}
+    first_key = None
+    header = None
+    for scan_header, files in scans:
+        options = dict(scan_header.get('scancode_options') or {})
+        shard = options.pop('--shard', None)
+        shard_by = options.pop('--shard-by', None)
+        if not shard:
+            raise ShardMergeError('not the scan of a shard: the --shard option is missing')
+        number, count = parse_shard(shard)
+
+        key = scan_header.get('scancode_version'), options, count, shard_by
+        if first_key is None:
+            first_key = key
+            header = scan_header
+        elif key != first_key:
+            raise ShardMergeError(
+                'shard %(shard)s was scanned with a different ScanCode version or options' % locals())
+
+        if number in files_by_shard:
+            raise ShardMergeError('shard %(shard)s is duplicated' % locals())
+        files_by_shard[number] = files
+
+    if header is None:
+        raise ShardMergeError('no scan to merge')
+
+    _version, _options, count, _shard_by = first_key
+    missing = sorted(set(range(1, count + 1)).difference(files_by_shard))
+    if missing:
+        missing = ', '.join('%d/%d' % (number, count) for number in missing)
+        raise ShardMergeError('missing shards: %(missing)s' % locals())
+
+    merged_files = []
+    for files in files_by_shard.values():
+        merged_files.extend(files)
+    merged_files.sort(key=lambda f: f.get('path', '').split('/'))
+
+    merged_header = header.__class__()
+    for name, value in header.items():
+        if name == 'scancode_options':
+            value = value.__class__((k, v) for k, v in value.items()
+                                    if k not in ('--shard', '--shard-by'))
+        elif name == 'files_count':
+            value = len(merged_files)
+        elif name == 'files':
+            continue
+        merged_header[name] = value
+    return merged_header, merged_files
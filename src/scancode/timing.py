@@ -0,0 +1,171 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import heapq
+import sys
+
+
+"""
+Per-scanner and per-file scan timings: the wall time and peak memory used by
+each scanner on each scanned file are recorded in the scan workers and
+aggregated in the main process in a report of the per-scanner totals, time
+histograms and slowest files.
+"""
+
+# upper bounds in seconds of the scan time histograms buckets
+HISTOGRAM_BUCKETS = (0.01, 0.1, 1, 10, 100,)
+
+# number of slowest files reported
+TOP_FILES = 10
+
+
+def get_peak_rss():
+    """
+    Return the peak resident set size in KB of the current process since the
+    last call to reset_peak_rss() or since the process started.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # this is in bytes on macOS
+        rss = rss // 1024
+    return rss
+
+
+def reset_peak_rss():
+    """
+    Reset the peak resident set size of the current process to its current
+    resident set size. This is only supported on Linux: elsewhere, the peak is
+    the peak since the process started.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'wb') as clear_refs:
+            clear_refs.write(b'5')
+    except IOError:
+        pass
+
+
+class ScanTimings(object):
+    """
+    Aggregate the timings of scanned files. Each file timings is a mapping of
+    {scan name: (wall time in seconds, peak RSS in KB)} for each scanner.
+    """
+    def __init__(self, top=TOP_FILES, buckets=HISTOGRAM_BUCKETS):
+        self.top = top
+        self.buckets = buckets
+        # mapping of {scan name: [files count, total time, max time, max peak RSS]}
+        self.totals = OrderedDict()
+        # mapping of {scan name: list of files count by histogram bucket}
+        self.histograms = OrderedDict()
+        # min-heap of the slowest files as (total time, path, timings)
+        self.slowest = []
+
+    def add(self, path, timings):
+        """
+        Add the `timings` mapping of the scanned file at `path`.
+        """
+        if not timings:
+            return
+        file_time = 0
+        for scan_name, (scan_time, peak_rss) in timings.items():
+            file_time += scan_time
+            totals = self.totals.setdefault(scan_name, [0, 0, 0, 0])
+            totals[0] += 1
+            totals[1] += scan_time
+            totals[2] = max(totals[2], scan_time)
+            totals[3] = max(totals[3], peak_rss)
+            histogram = self.histograms.setdefault(scan_name, [0] * (len(self.buckets) + 1))
+            histogram[self.bucket(scan_time)] += 1
+
+        slow = file_time, path, timings
+        if len(self.slowest) < self.top:
+            heapq.heappush(self.slowest, slow)
+        else:
+            heapq.heappushpop(self.slowest, slow)
+
+    def bucket(self, scan_time):
+        """
+        Return the index of the histogram bucket for a `scan_time`.
+        """
+        for i, upper_bound in enumerate(self.buckets):
+            if scan_time < upper_bound:
+                return i
+        return len(self.buckets)
+
+    def summary(self):
+        """
+        Return a mapping of aggregated timings.
+        """
+        summary = OrderedDict()
+        scanners = OrderedDict()
+        for scan_name, (count, total, max_time, max_rss) in self.totals.items():
+            scanner = scanners[scan_name] = OrderedDict()
+            scanner['files_count'] = count
+            scanner['total_time'] = total
+            scanner['max_time'] = max_time
+            scanner['max_peak_rss'] = max_rss
+            scanner['histogram'] = self.histograms[scan_name][:]
+        summary['scanners'] = scanners
+        summary['slowest_files'] = [
+            OrderedDict([('path', path), ('time', file_time), ('timings', timings)])
+            for file_time, path, timings in sorted(self.slowest, reverse=True)]
+        return summary
+
+    def report(self):
+        """
+        Return a list of report lines for the aggregated timings.
+        """
+        summary = self.summary()
+        labels = ['<%ss' % upper_bound for upper_bound in self.buckets]
+        labels.append('>=%ss' % self.buckets[-1])
+
+        lines = ['Scanners timings:']
+        header = '  %-12s %8s %10s %10s %14s  ' % ('scanner', 'files', 'total (s)', 'max (s)', 'max peak (KB)')
+        lines.append(header + ' '.join('%7s' % label for label in labels))
+        for scan_name, scanner in summary['scanners'].items():
+            line = '  %-12s %8d %10.2f %10.2f %14d  ' % (
+                scan_name, scanner['files_count'], scanner['total_time'],
+                scanner['max_time'], scanner['max_peak_rss'])
+            lines.append(line + ' '.join('%7d' % count for count in scanner['histogram']))
+
+        if summary['slowest_files']:
+            lines.append('Slowest files:')
+            for slow in summary['slowest_files']:
+                details = ', '.join('%s: %.2fs' % (scan_name, scan_time)
+                                    for scan_name, (scan_time, _peak) in slow['timings'].items())
+                lines.append('  %.2fs %s (%s)' % (slow['time'], slow['path'], details))
+        return lines
@@ -48,6 +48,7 @@
 
 import os.path
 import ctypes
+import threading
 
 from commoncode import system
 from commoncode import command
@@ -77,9 +78,10 @@ magdir = command.get_base_dirs(basemag)[0]
 magic_db = os.path.join(magdir, 'magic.mgc')
 
 #
-# Cached detectors
+# Cached detectors: a libmagic detector cannot be used concurrently by several
+# threads and detectors are therefore cached per thread.
 #
-detectors = {}
+_thread_detectors = threading.local()
 
 
 # libmagic flags
@@ -133,15 +135,27 @@ def _detect(location, flags):
     Return the detected type using `flags` of file at `location` or an empty
     string. Raise an exception on errors.
     """
+    detector = get_detector(flags)
+    val = detector.get(location)
+    val = val or ''
+    val = val.decode('ascii', 'ignore').strip()
+    return ' '.join(val.split())
+
+
+def get_detector(flags):
+    """
+    Return a cached libmagic Detector for `flags` for the current thread,
+    creating and loading one if needed.
+    """
+    detectors = getattr(_thread_detectors, 'detectors', None)
+    if detectors is None:
+        detectors = _thread_detectors.detectors = {}
     try:
         detector = detectors[flags]
     except KeyError:
         detector = Detector(flags=flags)
         detectors[flags] = detector
-    val = detector.get(location)
-    val = val or ''
-    val = val.decode('ascii', 'ignore').strip()
-    return ' '.join(val.split())
+    return detector
 
 
 class MagicException(Exception):
@@ -28,6 +28,7 @@ from datetime import datetime
 
 from commoncode.testcase import FileBasedTesting
 from commoncode.timeutils import time2tstamp, tstamp2time, UTC
+from commoncode.timeutils import Deadline
 
 
 class TestTimeStamp(FileBasedTesting):
@@ -100,3 +101,18 @@ class TestTimeStamp(FileBasedTesting):
 
     def test_tstamp2time_raise(self):
         self.assertRaises(ValueError, tstamp2time, '201011A12T13:14:15Z')
+
+
+class TestDeadline(FileBasedTesting):
+
+    def test_deadline_without_timeout_never_expires(self):
+        deadline = Deadline()
+        assert not deadline.expired()
+        assert not deadline.reached
+
+    def test_deadline_expires_after_timeout(self):
+        deadline = Deadline(0.001)
+        from time import sleep
+        sleep(0.01)
+        assert deadline.expired()
+        assert deadline.reached
@@ -260,6 +260,20 @@ class TestIndexing(IndexTesting):
         except AssertionError as e:
             assert u'Duplicate rules' in str(e)
 
+    def test_dumps_and_loads_with_memory_mapped_arrays(self):
+        idx = index.LicenseIndex(self.get_test_rules('index/bsd'))
+        arrays_location = os.path.join(self.get_temp_dir(), 'arrays')
+        loaded = index.LicenseIndex.loads(idx.dumps(arrays_location), arrays_location)
+
+        assert idx.to_dict() == loaded.to_dict()
+        assert [list(tids) for tids in idx.tids_by_rid] == [list(tids) for tids in loaded.tids_by_rid]
+        assert list(idx.tids_msets_by_rid) == list(loaded.tids_msets_by_rid)
+
+        query = self.get_test_loc('index/querysimple')
+        expected = [(m.rule.identifier, m.qspan, m.ispan) for m in idx.match(location=query)]
+        result = [(m.rule.identifier, m.qspan, m.ispan) for m in loaded.match(location=query)]
+        assert expected == result
+
 
 class TestMatchNoTemplates(IndexTesting):
     test_data_dir = TEST_DATA_DIR
@@ -93,3 +93,16 @@ class TestAPI(FileBasedTesting):
                 (u'start_line', 11), (u'end_line', 11)])
         ]
         assert expected == cops
+
+    def test_expand_license_details_of_licenses_without_details(self):
+        test_file = self.get_test_loc('prefilter/apache-1.0.txt')
+        expected = list(api.get_licenses(test_file))
+        licenses = list(api.get_licenses(test_file, with_details=False))
+        assert expected
+        assert all('short_name' not in lic for lic in licenses)
+        scan_results = [OrderedDict(licenses=licenses), OrderedDict(licenses=[]), None]
+        expanded = list(api.expand_license_details(scan_results))
+        assert expected == expanded[0]['licenses']
+        assert [] == expanded[1]['licenses']
+        # expanding again is a no-op
+        assert expected == list(api.expand_license_details(expanded))[0]['licenses']
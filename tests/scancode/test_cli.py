@@ -423,6 +423,525 @@ def test_scan_works_with_no_processes_in_single_threaded_mode():
     assert sorted(res0['files']) == sorted(res1['files'])
 
 
+def test_scan_works_with_sqlite_cache_backend():
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+
+    # run the same scan with the file and the sqlite cache backends
+    result_file_1 = test_env.get_temp_file('json')
+    result1 = run_scan_click([ '--copyright', '--processes', '2', test_dir, result_file_1])
+    assert result1.exit_code == 0
+
+    result_file_2 = test_env.get_temp_file('json')
+    result2 = run_scan_click([ '--copyright', '--processes', '2', '--cache-backend', 'sqlite', test_dir, result_file_2])
+    assert result2.exit_code == 0
+    res1 = json.loads(open(result_file_1).read())
+    res2 = json.loads(open(result_file_2).read())
+    assert sorted(res1['files']) == sorted(res2['files'])
+
+
+def test_scan_works_with_binary_cache_format():
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+
+    # run the same scan with the json and the binary cache formats
+    result_file_1 = test_env.get_temp_file('json')
+    result1 = run_scan_click([ '--copyright', '--license', '--info', test_dir, result_file_1])
+    assert result1.exit_code == 0
+
+    result_file_2 = test_env.get_temp_file('json')
+    result2 = run_scan_click([ '--copyright', '--license', '--info', '--cache-format', 'binary', test_dir, result_file_2])
+    assert result2.exit_code == 0
+    with open(result_file_1) as res1, open(result_file_2) as res2:
+        assert json.load(res1)['files'] == json.load(res2)['files']
+
+
+def test_scan_with_cache_store_reuses_stored_scans():
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+    store_dir = test_env.get_temp_dir()
+
+    # run the same scan twice with the same store
+    result_file_1 = test_env.get_temp_file('json')
+    result1 = run_scan_click([ '--copyright', '--cache-store', store_dir, test_dir, result_file_1])
+    assert result1.exit_code == 0
+    stored = list(fileutils.file_iter(store_dir))
+    assert stored
+
+    result_file_2 = test_env.get_temp_file('json')
+    result2 = run_scan_click([ '--copyright', '--cache-store', store_dir, test_dir, result_file_2])
+    assert result2.exit_code == 0
+    assert stored == list(fileutils.file_iter(store_dir))
+    res1 = json.loads(open(result_file_1).read())
+    res2 = json.loads(open(result_file_2).read())
+    assert sorted(res1['files']) == sorted(res2['files'])
+
+
+def test_scan_with_resume_only_scans_files_not_scanned_before_an_interruption(monkeypatch):
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+    cache_dir = test_env.get_temp_dir()
+
+    result_file_1 = test_env.get_temp_file('json')
+    result1 = run_scan_click([ '--copyright', '--processes', '0', test_dir, result_file_1])
+    assert result1.exit_code == 0
+
+    # a scan interrupted after scanning all the files keeps its cache
+    def interrupted_save_results(*args, **kwargs):
+        raise KeyboardInterrupt()
+    monkeypatch.setattr(cli, 'save_results', interrupted_save_results)
+    result_file_2 = test_env.get_temp_file('json')
+    run_scan_click([ '--copyright', '--processes', '0', '--resume', cache_dir, test_dir, result_file_2],
+                   catch_exceptions=True)
+    assert list(fileutils.file_iter(cache_dir))
+    monkeypatch.undo()
+
+    scanned = []
+    scan_one = cli.scan_one
+    def counting_scan_one(location, *args, **kwargs):
+        scanned.append(location)
+        return scan_one(location, *args, **kwargs)
+    monkeypatch.setattr(cli, 'scan_one', counting_scan_one)
+
+    result3 = run_scan_click([ '--copyright', '--processes', '0', '--resume', cache_dir, test_dir, result_file_2])
+    assert result3.exit_code == 0
+    assert [] == scanned
+    assert os.path.exists(cache_dir)
+    assert not os.path.exists(os.path.join(cache_dir, 'scancode-cache'))
+    res1 = json.loads(open(result_file_1).read())
+    res2 = json.loads(open(result_file_2).read())
+    assert res1['files'] == res2['files']
+
+
+def test_scan_with_resume_deletes_only_its_cache_subdirectory():
+    test_file = test_env.get_test_loc('multiprocessing/apache-1.1.txt')
+    cache_dir = test_env.get_temp_dir()
+    keep = os.path.join(cache_dir, 'keep.txt')
+    with open(keep, 'wb') as kept:
+        kept.write(b'keep me')
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--info', '--resume', cache_dir, test_file, result_file])
+    assert result.exit_code == 0
+    assert ['keep.txt'] == os.listdir(cache_dir)
+    assert b'keep me' == open(keep, 'rb').read()
+
+
+def test_scan_with_resume_refuses_a_cache_subdirectory_not_created_by_scancode():
+    test_file = test_env.get_test_loc('multiprocessing/apache-1.1.txt')
+    cache_dir = test_env.get_temp_dir()
+    other = os.path.join(cache_dir, 'scancode-cache', 'other.txt')
+    fileutils.create_dir(fileutils.parent_directory(other))
+    with open(other, 'wb') as kept:
+        kept.write(b'keep me')
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--info', '--resume', cache_dir, test_file, result_file])
+    assert result.exit_code == 2
+    assert 'was not created by ScanCode' in result.output
+    assert os.path.exists(other)
+
+
+def test_scan_with_resume_refuses_to_resume_with_different_scan_options(monkeypatch):
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+    cache_dir = test_env.get_temp_dir()
+
+    def interrupted_save_results(*args, **kwargs):
+        raise KeyboardInterrupt()
+    monkeypatch.setattr(cli, 'save_results', interrupted_save_results)
+    result_file = test_env.get_temp_file('json')
+    run_scan_click([ '--copyright', '--processes', '0', '--resume', cache_dir, test_dir, result_file],
+                   catch_exceptions=True)
+    monkeypatch.undo()
+
+    result = run_scan_click([ '--license', '--processes', '0', '--resume', cache_dir, test_dir, result_file])
+    assert result.exit_code == 2
+    assert 'different scan options' in result.output
+    assert os.listdir(os.path.join(cache_dir, 'scancode-cache'))
+
+
+def test_scan_with_stream_saves_the_same_results():
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+
+    result_file_1 = test_env.get_temp_file('json')
+    result1 = run_scan_click([ '--copyright', '--info', '--processes', '2', test_dir, result_file_1])
+    assert result1.exit_code == 0
+
+    result_file_2 = test_env.get_temp_file('json')
+    result2 = run_scan_click([ '--copyright', '--info', '--processes', '2', '--stream', test_dir, result_file_2])
+    assert result2.exit_code == 0
+    res1 = json.loads(open(result_file_1).read())
+    res2 = json.loads(open(result_file_2).read())
+    assert res1['files_count'] == res2['files_count']
+    assert sorted(res1['files']) == sorted(res2['files'])
+
+
+def test_scan_with_stream_in_order_saves_results_in_order():
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+
+    result_file_1 = test_env.get_temp_file('json')
+    result1 = run_scan_click([ '--copyright', '--processes', '2', test_dir, result_file_1])
+    assert result1.exit_code == 0
+
+    result_file_2 = test_env.get_temp_file('json')
+    result2 = run_scan_click([ '--copyright', '--processes', '2', '--stream', '--stream-in-order', test_dir, result_file_2])
+    assert result2.exit_code == 0
+    res1 = json.loads(open(result_file_1).read())
+    res2 = json.loads(open(result_file_2).read())
+    assert res1['files'] == res2['files']
+
+
+def test_scan_with_stream_walks_the_tree_once_and_saves_files_count_last(monkeypatch):
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+
+    walks = []
+    resource_paths = cli.resource_paths
+    def counting_resource_paths(*args, **kwargs):
+        walks.append(True)
+        return resource_paths(*args, **kwargs)
+    monkeypatch.setattr(cli, 'resource_paths', counting_resource_paths)
+
+    result_file = test_env.get_temp_file('jsonlines')
+    result = run_scan_click([ '--copyright', '--processes', '2', '--stream',
+                             '--format', 'jsonlines', test_dir, result_file])
+    assert result.exit_code == 0
+    assert 1 == len(walks)
+
+    lines = [json.loads(line) for line in open(result_file).read().splitlines()]
+    assert 'files_count' not in lines[0]['header']
+    files = [f for line in lines for f in line.get('files', [])]
+    assert {'header': {'files_count': len(files)}} == lines[-1]
+    assert len(files) > 1
+
+
+def test_scan_scans_files_with_the_same_content_only_once(monkeypatch):
+    test_dir = test_env.get_temp_dir()
+    apache = test_env.get_test_loc('multiprocessing/apache-1.1.txt')
+    for name in ('a.txt', 'b.txt', 'c.txt'):
+        fileutils.copyfile(apache, os.path.join(test_dir, name))
+    fileutils.copyfile(test_env.get_test_loc('multiprocessing/apache-1.0.txt'), test_dir)
+
+    scanned = []
+    scan_one = cli.scan_one
+    def counting_scan_one(location, *args, **kwargs):
+        scanned.append(location)
+        return scan_one(location, *args, **kwargs)
+    monkeypatch.setattr(cli, 'scan_one', counting_scan_one)
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--processes', '0', test_dir, result_file])
+    assert result.exit_code == 0
+    assert 2 == len(scanned)
+    results = json.loads(open(result_file).read())
+    assert 4 == results['files_count']
+    copyrights = {fileutils.file_name(f['path']): f['copyrights'] for f in results['files']}
+    assert copyrights['a.txt']
+    assert copyrights['a.txt'] == copyrights['b.txt'] == copyrights['c.txt']
+
+
+def test_scan_with_stream_scans_files_with_the_same_content_only_once():
+    test_dir = test_env.get_temp_dir()
+    apache = test_env.get_test_loc('multiprocessing/apache-1.1.txt')
+    for name in ('a.txt', 'b.txt', 'c.txt'):
+        fileutils.copyfile(apache, os.path.join(test_dir, name))
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', '--processes', '2', '--stream', test_dir, result_file])
+    assert result.exit_code == 0
+    results = json.loads(open(result_file).read())
+    assert 3 == results['files_count']
+    names = sorted(f['name'] for f in results['files'])
+    assert ['a.txt', 'b.txt', 'c.txt'] == names
+    copyrights = [f['copyrights'] for f in results['files']]
+    assert copyrights[0]
+    assert copyrights[0] == copyrights[1] == copyrights[2]
+
+
+def test_scan_with_largest_first_saves_the_same_results():
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+
+    expected_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', '--processes', '2', test_dir, expected_file])
+    assert result.exit_code == 0
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', '--processes', '2', '--largest-first', test_dir, result_file])
+    assert result.exit_code == 0
+    assert 'Tail time:' in result.output
+    assert json.loads(open(expected_file).read())['files'] == json.loads(open(result_file).read())['files']
+
+
+def test_scan_with_timing_reports_scanners_timings():
+    test_dir = test_env.get_test_loc('multiprocessing')
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--email', '--processes', '2', '--timing', test_dir, result_file])
+    assert result.exit_code == 0
+    assert 'Scanners timings:' in result.output
+    assert '  copyrights          3 ' in result.output
+    assert '  emails              3 ' in result.output
+    assert 'Slowest files:' in result.output
+
+
+def test_scan_with_incremental_from_reuses_unchanged_files_and_saves_the_same_results():
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+    previous_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', '--processes', '2', test_dir, previous_file])
+    assert result.exit_code == 0
+
+    with open(os.path.join(test_dir, 'apache-1.0.txt'), 'ab') as modified:
+        modified.write(b'\nCopyright (c) 2017 Some Modified Holder\n')
+    fileutils.delete(os.path.join(test_dir, 'apache-1.1.txt'))
+    with open(os.path.join(test_dir, 'new.txt'), 'wb') as new:
+        new.write(b'Copyright (c) 2017 Some New Holder\n')
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', '--processes', '2',
+                             '--incremental-from', previous_file, test_dir, result_file])
+    assert result.exit_code == 0
+    assert 'Reused scans:    1 unchanged files.' in result.output
+
+    expected_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', '--processes', '2', test_dir, expected_file])
+    assert result.exit_code == 0
+    assert json.loads(open(expected_file).read())['files'] == json.loads(open(result_file).read())['files']
+
+
+def test_scan_with_incremental_from_scans_again_truncated_files():
+    test_dir = test_env.get_test_loc('multiprocessing', copy=True)
+    previous_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', test_dir, previous_file])
+    assert result.exit_code == 0
+
+    previous = json.loads(open(previous_file).read(), object_pairs_hook=OrderedDict)
+    for scanned_file in previous['files']:
+        if scanned_file['name'] == 'apache-1.0.txt':
+            scanned_file['truncated_scans'] = ['copyrights']
+    with open(previous_file, 'wb') as saved:
+        saved.write(json.dumps(previous))
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', '--incremental-from', previous_file, test_dir, result_file])
+    assert result.exit_code == 0
+    assert 'Reused scans:    2 unchanged files.' in result.output
+
+
+def test_scan_with_incremental_from_scans_all_files_with_a_different_license_url_template():
+    test_dir = test_env.get_test_loc('multiprocessing')
+    previous_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--license', '--info', test_dir, previous_file])
+    assert result.exit_code == 0
+
+    result_file = test_env.get_temp_file('json')
+    template = 'https://example.com/licenses/{}'
+    result = run_scan_click([ '--license', '--info', '--license-url-template', template,
+                             '--incremental-from', previous_file, test_dir, result_file])
+    assert result.exit_code == 0
+    assert 'Cannot reuse the previous scan: scanned with a different --license-url-template option.' in result.output
+    results = json.loads(open(result_file).read())
+    assert template == results['scancode_options']['--license-url-template']
+    urls = [match['reference_url'] for f in results['files'] for match in f['licenses']]
+    assert urls
+    assert all(url.startswith('https://example.com/licenses/') for url in urls)
+
+
+def test_scan_with_incremental_from_scans_all_files_with_different_scan_options():
+    test_dir = test_env.get_test_loc('multiprocessing')
+    previous_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', test_dir, previous_file])
+    assert result.exit_code == 0
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--email', '--info', '--incremental-from', previous_file, test_dir, result_file])
+    assert result.exit_code == 0
+    assert 'Cannot reuse the previous scan: scanned with a different --email option.' in result.output
+    assert 'Reused scans' not in result.output
+
+
+def test_scan_with_git_commits_scans_only_the_files_changed_between_commits():
+    from scancode.gitscan import git
+    test_dir = test_env.get_temp_dir()
+    git(test_dir, ['init', '-q'])
+    git(test_dir, ['config', 'user.email', 'test@example.com'])
+    git(test_dir, ['config', 'user.name', 'test'])
+    for name in ('a.txt', 'b.txt'):
+        with open(os.path.join(test_dir, name), 'wb') as f:
+            f.write(b'Copyright (c) 2010 Some Holder\n')
+    git(test_dir, ['add', '.'])
+    git(test_dir, ['commit', '-q', '-m', 'first'])
+    with open(os.path.join(test_dir, 'b.txt'), 'wb') as f:
+        f.write(b'Copyright (c) 2017 Some Other Holder\n')
+    git(test_dir, ['commit', '-q', '-a', '-m', 'second'])
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click(['--copyright', '--strip-root', '--git-commits', 'HEAD~1..HEAD', test_dir, result_file])
+    assert result.exit_code == 0
+    results = json.loads(open(result_file).read())
+    assert ['b.txt'] == [f['path'] for f in results['files']]
+    assert 'Copyright (c) 2017' in results['files'][0]['copyrights'][0]['statements'][0]
+
+
+def test_scan_with_git_commits_and_cache_store_reuses_stored_blobs():
+    from scancode.gitscan import git
+    test_dir = test_env.get_temp_dir()
+    git(test_dir, ['init', '-q'])
+    git(test_dir, ['config', 'user.email', 'test@example.com'])
+    git(test_dir, ['config', 'user.name', 'test'])
+    for name in ('a.txt', 'b.py'):
+        with open(os.path.join(test_dir, name), 'wb') as f:
+            f.write(b'Copyright (c) 2010 Some Holder\n')
+    git(test_dir, ['add', '.'])
+    git(test_dir, ['commit', '-q', '-m', 'first'])
+    store_dir = test_env.get_temp_dir()
+
+    args = ['--copyright', '--info', '--strip-root', '--cache-store', store_dir, '--git-commits', 'HEAD', test_dir]
+    result_file_1 = test_env.get_temp_file('json')
+    result = run_scan_click(args + [result_file_1])
+    assert result.exit_code == 0
+    result_file_2 = test_env.get_temp_file('json')
+    result = run_scan_click(args + [result_file_2])
+    assert result.exit_code == 0
+
+    results_1 = json.loads(open(result_file_1).read())
+    results_2 = json.loads(open(result_file_2).read())
+    assert 2 == results_2['files_count']
+    by_path = lambda f: f['path']
+    assert sorted(results_1['files'], key=by_path) == sorted(results_2['files'], key=by_path)
+    assert 'Python' == [f for f in results_2['files'] if f['path'] == 'b.py'][0]['programming_language']
+
+
+def test_scan_with_shards_and_merge_saves_the_same_results():
+    from click.testing import CliRunner
+    from scancode.merge_cli import scancode_merge
+    test_dir = test_env.get_test_loc('multiprocessing')
+    expected_file = test_env.get_temp_file('json')
+    result = run_scan_click(['--copyright', '--info', test_dir, expected_file])
+    assert result.exit_code == 0
+
+    for shard_by in ('path', 'size'):
+        shard_files = []
+        for shard in ('1/3', '2/3', '3/3'):
+            shard_file = test_env.get_temp_file('json')
+            result = run_scan_click(['--copyright', '--info', '--shard', shard, '--shard-by', shard_by, test_dir, shard_file])
+            assert result.exit_code == 0
+            shard_files.append(shard_file)
+
+        result_file = test_env.get_temp_file('json')
+        result = CliRunner().invoke(scancode_merge, shard_files + [result_file], catch_exceptions=False)
+        assert result.exit_code == 0
+
+        expected = json.loads(open(expected_file).read())
+        results = json.loads(open(result_file).read())
+        assert expected['files_count'] == results['files_count']
+        assert expected['scancode_options'] == results['scancode_options']
+        expected_files = sorted(expected['files'], key=lambda f: f['path'].split('/'))
+        assert expected_files == results['files']
+
+
+def test_scan_with_batch_scans_all_the_listed_inputs_in_one_jsonlines_output():
+    test_dir = test_env.get_test_loc('multiprocessing')
+    inputs = [os.path.join(test_dir, 'apache-1.0.txt'), os.path.join(test_dir, 'apache-1.1.txt')]
+    inputs_file = test_env.get_temp_file('txt')
+    with open(inputs_file, 'wb') as inputs_list:
+        inputs_list.write(b'\n'.join(path_to_bytes(i) for i in inputs))
+
+    result_file = test_env.get_temp_file('jsonlines')
+    result = run_scan_click(['--copyright', '--processes', '2', '--batch', '--format', 'jsonlines', inputs_file, result_file])
+    assert result.exit_code == 0
+    lines = [json.loads(line) for line in open(result_file)]
+    headers = [line['header'] for line in lines if 'header' in line]
+    assert inputs == [header['input'] for header in headers]
+    assert [1, 1] == [header['files_count'] for header in headers]
+    files_lines = [line for line in lines if 'files' in line]
+    assert inputs == [line['input'] for line in files_lines]
+    expected = ['multiprocessing/apache-1.0.txt', 'multiprocessing/apache-1.1.txt']
+    assert expected == [line['files'][0]['path'] for line in files_lines]
+
+
+def test_scancode_cli_import_does_not_import_the_scans_heavy_modules():
+    # the modules used only by some scans, outputs or options are imported only
+    # when used such that the CLI starts fast: see also the
+    # etc/scripts/import_time_report.py script to report slow imports
+    import subprocess
+    import sys
+    code = 'import sys, scancode.cli; print(" ".join(m for m in sys.modules if sys.modules[m]))'
+    imported = set(subprocess.check_output([sys.executable, '-c', code]).split())
+    heavy_modules = set([
+        'chardet', 'cluecode.copyrights', 'extractcode.libarchive2', 'licensedcode.index',
+        'lxml', 'multiprocessing', 'nltk', 'packagedcode', 'pygments', 'schematics',
+        'spdx', 'sqlite3', 'typecode.magic2', 'unicodecsv',
+    ])
+    assert set() == heavy_modules & imported
+
+    # the plugins are loaded only when used and are not used to print the version
+    plugin_modules = set([
+        'formattedcode', 'pluggy', 'plugincode.output', 'plugincode.post_scan',
+        'plugincode.pre_scan', 'scancode.plugin_ignore',
+    ])
+    assert set() == plugin_modules & imported
+    code = ('import sys, scancode.cli\n'
+            'try:\n'
+            '    scancode.cli.scancode.main(["--version"])\n'
+            'except SystemExit:\n'
+            '    print(" ".join(m for m in sys.modules if sys.modules[m]))')
+    imported = set(subprocess.check_output([sys.executable, '-c', code]).split())
+    assert set() == plugin_modules & imported
+
+
+def test_scan_options_of_plugins_are_available_after_an_info_option_in_the_same_process():
+    # a fresh process is needed as the plugins are loaded once per process
+    import subprocess
+    import sys
+    code = ('from click.testing import CliRunner\n'
+            'from scancode.cli import scancode\n'
+            'runner = CliRunner()\n'
+            'assert 0 == runner.invoke(scancode, ["--version"]).exit_code\n'
+            'print(runner.invoke(scancode, ["--help"]).output)')
+    output = subprocess.check_output([sys.executable, '-c', code])
+    assert '--mark-source' in output
+
+
+def test_scan_plugins_are_loaded_once_by_concurrent_threads():
+    # a fresh process is needed as the plugins are loaded once per process
+    import subprocess
+    import sys
+    code = ('import threading\n'
+            'from scancode.cli import scancode\n'
+            'threads = [threading.Thread(target=scancode.load_plugins) for _ in range(8)]\n'
+            'for thread in threads: thread.start()\n'
+            'for thread in threads: thread.join()\n'
+            'print(" ".join(p.name for p in scancode.params))')
+    names = subprocess.check_output([sys.executable, '-c', code]).split()
+    assert 1 == names.count('mark_source')
+
+
+def test_import_time_report_script_reports_plugins_imports():
+    import subprocess
+    import sys
+    script = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'etc', 'scripts', 'import_time_report.py')
+    output = subprocess.check_output([sys.executable, script, '--plugins', '--top', '5', 'scancode.cli'])
+    assert 'Imported scancode.cli in' in output
+    assert 'Loaded the plugins in' in output
+
+
+def test_scan_with_info_threads_saves_the_same_results():
+    test_dir = test_env.get_test_loc('multiprocessing')
+    expected_file = test_env.get_temp_file('json')
+    result = run_scan_click(['--copyright', '--info', '--processes', '2', test_dir, expected_file])
+    assert result.exit_code == 0
+
+    for cache_backend in ('file', 'sqlite'):
+        result_file = test_env.get_temp_file('json')
+        result = run_scan_click(['--copyright', '--info', '--processes', '2', '--info-threads', '3',
+                                 '--cache-backend', cache_backend, test_dir, result_file])
+        assert result.exit_code == 0
+        expected = json.loads(open(expected_file).read())['files']
+        results = json.loads(open(result_file).read())['files']
+        assert sorted(expected, key=lambda f: f['path']) == sorted(results, key=lambda f: f['path'])
+
+
+def test_batched_groups_small_items_and_keeps_large_items_alone():
+    items = [1, 2, 3, 10, 4, 4, 4, 4, 1, 12, 1]
+    result = list(cli.batched(items, get_cost=lambda i: i, max_cost=10, max_items=3))
+    expected = [[1, 2, 3], [10], [4, 4], [4, 4, 1], [12], [1]]
+    assert expected == result
+
+
 def test_scan_works_with_multiple_processes_and_timeouts():
     # this contains test files with a lot of copyrights that should
     # take more thant timeout to scan
@@ -454,6 +973,80 @@ def test_scan_works_with_multiple_processes_and_timeouts():
     assert sorted(expected) == sorted(x.items() for x in result_json['files'])
 
 
+def test_scan_with_soft_timeout_keeps_partial_results_of_truncated_scans():
+    test_dir = test_env.get_test_loc('timeout', copy=True)
+    result_file = test_env.get_temp_file('json')
+
+    result = run_scan_click(
+        [ '--copyright', '--license', '--soft-timeout', '0.000001',
+         '--strip-root', '--format', 'json', test_dir, result_file],
+    )
+
+    assert result.exit_code == 0
+    result_json = json.loads(open(result_file).read(), object_pairs_hook=OrderedDict)
+    assert 3 == len(result_json['files'])
+    for scanned_file in result_json['files']:
+        assert ['licenses', 'copyrights'] == scanned_file['truncated_scans']
+        assert [] == scanned_file['scan_errors']
+        # exact license matches are found before the sequence matching is stopped
+        assert scanned_file['licenses']
+
+
+def test_scan_with_prefilters_skips_text_scans_of_files_without_findings():
+    test_dir = test_env.get_test_loc('prefilter')
+    result_file = test_env.get_temp_file('json')
+
+    result = run_scan_click(
+        ['--copyright', '--license', '--prefilter', 'media', '--prefilter', 'low-entropy',
+         '--strip-root', '--format', 'json', test_dir, result_file])
+
+    assert result.exit_code == 0
+    assert 'Skipped scans:' in result.output
+    assert '  media: 1 files (licenses: 1, copyrights: 1)' in result.output
+    assert '  empty: 1 files (licenses: 1, copyrights: 1)' in result.output
+    result_json = json.loads(open(result_file).read())
+    scans = {f['path']: (len(f['licenses']), len(f['copyrights'])) for f in result_json['files']}
+    expected = {
+        'apache-1.0.txt': (2, 6),
+        'empty.txt': (0, 0),
+        'sample.png': (0, 0),
+        'sample1.jpg': (0, 0),
+        'zeros.bin': (0, 0),
+    }
+    assert expected == scans
+    assert ['low-entropy', 'media'] == result_json['scancode_options']['--prefilter']
+
+
+def test_scan_with_prefilters_and_cache_store_does_not_reuse_the_skipped_scans():
+    test_dir = test_env.get_test_loc('prefilter')
+    store_dir = test_env.get_temp_dir()
+
+    result_file_1 = test_env.get_temp_file('json')
+    result1 = run_scan_click(['--copyright', '--prefilter', 'media', '--strip-root',
+                              '--cache-store', store_dir, test_dir, result_file_1])
+    assert result1.exit_code == 0
+
+    result_file_2 = test_env.get_temp_file('json')
+    result2 = run_scan_click(['--copyright', '--strip-root', '--cache-store', store_dir, test_dir, result_file_2])
+    assert result2.exit_code == 0
+    # each run uses its own store directory
+    assert 2 == len(os.listdir(store_dir))
+    assert '  media: ' not in result2.output
+    assert '--prefilter' not in json.loads(open(result_file_2).read())['scancode_options']
+
+
+def test_scan_with_incremental_from_scans_all_files_with_different_prefilters():
+    test_dir = test_env.get_test_loc('prefilter')
+    previous_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', '--prefilter', 'media', test_dir, previous_file])
+    assert result.exit_code == 0
+
+    result_file = test_env.get_temp_file('json')
+    result = run_scan_click([ '--copyright', '--info', '--incremental-from', previous_file, test_dir, result_file])
+    assert result.exit_code == 0
+    assert 'Cannot reuse the previous scan: scanned with a different --prefilter option.' in result.output
+
+
 def test_scan_does_not_fail_when_scanning_unicode_files_and_paths():
     test_dir = test_env.get_test_loc(u'unicodepath/uc')
     result_file = test_env.get_temp_file('json')
@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+
+from commoncode.testcase import FileBasedTesting
+from commoncode import fileutils
+
+from scancode import gitscan
+
+
+class TestGitScan(FileBasedTesting):
+    test_data_dir = os.path.join(os.path.dirname(__file__), 'data')
+
+    def create_test_repo(self):
+        """
+        Return the path to a new git repository with two commits.
+        """
+        repo_dir = self.get_temp_dir()
+        git = lambda *args: gitscan.git(repo_dir, list(args))
+        git('init', '-q')
+        git('config', 'user.email', 'test@example.com')
+        git('config', 'user.name', 'test')
+
+        def write(path, content):
+            location = os.path.join(repo_dir, path)
+            fileutils.create_dir(os.path.dirname(location))
+            with open(location, 'wb') as f:
+                f.write(content)
+
+        write('a.txt', b'Copyright (c) 2010 A\n')
+        write('dir/b.txt', b'Copyright (c) 2010 B\n')
+        write('dir/same.txt', b'Copyright (c) 2010 B\n')
+        git('add', '.')
+        git('commit', '-q', '-m', 'first')
+        write('dir/b.txt', b'Copyright (c) 2017 B\n')
+        write('c.txt', b'Copyright (c) 2017 C\n')
+        fileutils.delete(os.path.join(repo_dir, 'a.txt'))
+        git('add', '-A', '.')
+        git('commit', '-q', '-m', 'second')
+        # uncommitted changes are ignored
+        write('dir/b.txt', b'Copyright (c) 2018 Uncommitted\n')
+        return repo_dir
+
+    def get_exported_files(self, exported_dir):
+        exported = {}
+        for top, _dirs, files in os.walk(exported_dir):
+            for name in files:
+                location = os.path.join(top, name)
+                path = fileutils.as_posixpath(os.path.relpath(location, exported_dir))
+                exported[path] = open(location, 'rb').read()
+        return exported
+
+    def test_parse_commits(self):
+        assert (None, 'HEAD') == gitscan.parse_commits('HEAD')
+        assert ('v1', 'v2') == gitscan.parse_commits('v1..v2')
+        assert ('v1', 'HEAD') == gitscan.parse_commits('v1..')
+        try:
+            gitscan.parse_commits('..v2')
+            self.fail('GitError not raised')
+        except gitscan.GitError:
+            pass
+
+    def test_export_commits_exports_the_files_of_a_commit_tree(self):
+        repo_dir = self.create_test_repo()
+        exported_dir = gitscan.export_commits(repo_dir, 'HEAD~1').target_dir
+        assert fileutils.file_name(repo_dir) == fileutils.file_name(exported_dir)
+        expected = {
+            'a.txt': b'Copyright (c) 2010 A\n',
+            'dir/b.txt': b'Copyright (c) 2010 B\n',
+            'dir/same.txt': b'Copyright (c) 2010 B\n',
+        }
+        assert expected == self.get_exported_files(exported_dir)
+
+    def test_export_commits_exports_only_the_files_changed_between_commits(self):
+        repo_dir = self.create_test_repo()
+        exported_dir = gitscan.export_commits(repo_dir, 'HEAD~1..HEAD').target_dir
+        expected = {
+            'c.txt': b'Copyright (c) 2017 C\n',
+            'dir/b.txt': b'Copyright (c) 2017 B\n',
+        }
+        assert expected == self.get_exported_files(exported_dir)
+
+    def test_export_commits_does_not_export_stored_blobs(self):
+        from scancode.cache import get_scans_cache_class
+        repo_dir = self.create_test_repo()
+        store_dir = self.get_temp_dir()
+        scans_cache = get_scans_cache_class(self.get_temp_dir(), scans_store_dir=store_dir)()
+        blob_id = dict(gitscan.get_tree_blobs(repo_dir, 'HEAD'))[b'c.txt']
+        infos = dict(sha1='a' * 40, size=21)
+        scans_cache.put_stored_info(gitscan.blob_info_key(blob_id, b'c.txt'), infos)
+        scans_cache.put_scan('c.txt', infos, dict(copyrights=[]))
+
+        git_export = gitscan.export_commits(repo_dir, 'HEAD', scans_cache=scans_cache)
+        expected = {'dir/b.txt': b'Copyright (c) 2017 B\n', 'dir/same.txt': b'Copyright (c) 2010 B\n'}
+        assert expected == self.get_exported_files(git_export.target_dir)
+        assert ['c.txt'] == list(git_export.stored_infos)
+        assert 21 == git_export.stored_infos['c.txt']['size']
+        assert git_export.date == git_export.stored_infos['c.txt']['date']
+        assert sorted(expected) == sorted(git_export.info_keys)
+
+    def test_export_commits_fails_on_unknown_commit(self):
+        repo_dir = self.create_test_repo()
+        try:
+            gitscan.export_commits(repo_dir, 'unknown..HEAD')
+            self.fail('GitError not raised')
+        except gitscan.GitError as e:
+            assert 'unknown git commit: unknown' in str(e)
@@ -82,7 +82,7 @@ class TestIgnoreFiles(FileBasedTesting):
             'user/src/test',
             'user/src/test/sample.txt'
         ]
-        test = [resource.rel_path for resource in resource_paths(test_dir, False, scan_cache_class, [test_plugin])]
+        test = [resource.rel_path for resource in resource_paths(test_dir, scan_cache_class, [test_plugin])]
         assert expected == sorted(test)
 
     def test_resource_paths_with_multiple_files(self):
@@ -96,7 +96,7 @@ class TestIgnoreFiles(FileBasedTesting):
             'user/src/test/sample.doc',
             'user/src/test/sample.txt'
         ]
-        test = [resource.rel_path for resource in resource_paths(test_dir, False, scan_cache_class, [test_plugin])]
+        test = [resource.rel_path for resource in resource_paths(test_dir, scan_cache_class, [test_plugin])]
         assert expected == sorted(test)
 
     def test_resource_paths_with_glob_file(self):
@@ -109,7 +109,7 @@ class TestIgnoreFiles(FileBasedTesting):
             'user/src/test',
             'user/src/test/sample.txt'
         ]
-        test = [resource.rel_path for resource in resource_paths(test_dir, False, scan_cache_class, [test_plugin])]
+        test = [resource.rel_path for resource in resource_paths(test_dir, scan_cache_class, [test_plugin])]
         assert expected == sorted(test)
 
     def test_resource_paths_with_glob_path(self):
@@ -122,7 +122,7 @@ class TestIgnoreFiles(FileBasedTesting):
             'user/src',
             'user/src/ignore.doc'
         ]
-        test = [resource.rel_path for resource in resource_paths(test_dir, False, scan_cache_class, [test_plugin])]
+        test = [resource.rel_path for resource in resource_paths(test_dir, scan_cache_class, [test_plugin])]
         assert expected == sorted(test)
 
     def test_resource_paths_with_multiple_plugins(self):
@@ -137,5 +137,12 @@ class TestIgnoreFiles(FileBasedTesting):
             'user/src',
             'user/src/test'
         ]
-        test = [resource.rel_path for resource in resource_paths(test_dir, False, scan_cache_class, test_plugins)]
+        test = [resource.rel_path for resource in resource_paths(test_dir, scan_cache_class, test_plugins)]
         assert expected == sorted(test)
+
+    def test_resource_paths_does_not_collect_file_infos(self):
+        test_dir = self.extract_test_tar('ignore/user.tgz')
+        scan_cache_class = get_scans_cache_class(self.get_temp_dir())
+        for resource in resource_paths(test_dir, scan_cache_class):
+            assert ['path'] == resource.infos.keys()
+            assert not resource.is_cached
@@ -30,6 +30,7 @@ from __future__ import unicode_literals
 import os
 import threading
 from time import sleep
+from time import time
 
 from commoncode.testcase import FileBasedTesting
 
@@ -37,7 +38,8 @@ from scancode import interrupt
 
 """
 Note that these tests check the active threads count before and after each test to
-verify there is no thread leak.
+verify there is no thread leak: the watchdog thread of the process is started
+before counting.
 """
 
 class TestInterrupt(FileBasedTesting):
@@ -45,6 +47,7 @@ class TestInterrupt(FileBasedTesting):
 
 
     def test_interruptible_can_run_function(self):
+        interrupt.get_watchdog()
         before = threading.active_count()
 
         def some_long_function(exec_time):
@@ -58,11 +61,12 @@ class TestInterrupt(FileBasedTesting):
         assert before == after
 
     def test_interruptible_stops_execution_on_timeout(self):
+        interrupt.get_watchdog()
         before = threading.active_count()
 
         def some_long_function(exec_time):
-            for i in range(exec_time):
-                sleep(i)
+            for i in range(exec_time * 100):
+                sleep(0.01)
             return 'OK'
 
         result = interrupt.interruptible(some_long_function, args=(20,), timeout=0.00001)
@@ -70,3 +74,65 @@ class TestInterrupt(FileBasedTesting):
 
         after = threading.active_count()
         assert before == after
+
+    def test_interruptible_does_not_interrupt_later_calls(self):
+        def busy_function(exec_time):
+            start = time()
+            while time() - start < exec_time:
+                pass
+            return 'OK'
+
+        result = interrupt.interruptible(busy_function, args=(10,), timeout=0.1)
+        assert (False, 'ERROR: Processing interrupted: timeout after 0 seconds.') == result
+        for _ in range(100):
+            assert (True, 'OK') == interrupt.interruptible(busy_function, args=(0.001,), timeout=0.05)
+        # a call longer than a previous timeout is not interrupted
+        result = interrupt.interruptible(busy_function, args=(0.2,), timeout=10)
+        assert (True, 'OK') == result
+
+    def test_interruptible_can_run_in_threads(self):
+        def busy_function(exec_time):
+            start = time()
+            while time() - start < exec_time:
+                pass
+            return 'OK'
+
+        results = {}
+
+        def runner(name, exec_time, timeout):
+            results[name] = interrupt.interruptible(busy_function, args=(exec_time,), timeout=timeout)
+
+        threads = [
+            threading.Thread(target=runner, args=('fast', 0.01, 10)),
+            threading.Thread(target=runner, args=('slow', 10, 0.2)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert (True, 'OK') == results['fast']
+        assert (False, 'ERROR: Processing interrupted: timeout after 0 seconds.') == results['slow']
+
+    def test_interruptible_stops_function_ignoring_timeout_errors(self):
+        def swallowing_function(exec_time):
+            start = time()
+            while time() - start < exec_time:
+                try:
+                    sum(range(100))
+                except:
+                    pass
+            return 'OK'
+
+        result = interrupt.interruptible(swallowing_function, args=(10,), timeout=0.05)
+        assert (False, 'ERROR: Processing interrupted: timeout after 0 seconds.') == result
+
+    def test_interruptible_reports_timeout_when_function_returns_after_ignoring_it(self):
+        def swallowing_function():
+            try:
+                sleep(0.2)
+            except:
+                pass
+            return 'OK'
+
+        result = interrupt.interruptible(swallowing_function, timeout=0.01)
+        assert (False, 'ERROR: Processing interrupted: timeout after 0 seconds.') == result
@@ -0,0 +1,98 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from multiprocessing.pool import ThreadPool
+import time
+from unittest import TestCase
+
+from scancode.pipeline import bounded_imap
+from scancode.pipeline import PipelineError
+
+
+def square(i):
+    return i * i
+
+
+def fail_on_three(i):
+    if i == 3:
+        raise Exception('three')
+    return i
+
+
+class TestBoundedImap(TestCase):
+
+    def setUp(self):
+        self.pool = ThreadPool(3)
+
+    def tearDown(self):
+        self.pool.terminate()
+
+    def test_bounded_imap_returns_all_results(self):
+        results = bounded_imap(self.pool, square, range(100), max_queued=4)
+        assert [i * i for i in range(100)] == sorted(results)
+
+    def test_bounded_imap_returns_ordered_results(self):
+        results = bounded_imap(self.pool, square, range(100), max_queued=4, ordered=True)
+        assert [i * i for i in range(100)] == list(results)
+
+    def test_bounded_imap_does_not_consume_more_items_than_max_queued(self):
+        fed = []
+
+        def items():
+            for i in range(100):
+                fed.append(i)
+                yield i
+
+        results = bounded_imap(self.pool, square, items(), max_queued=4, ordered=True)
+        consumed = 0
+        for _result in results:
+            consumed += 1
+            # give the feeder a chance to run ahead
+            if consumed % 10 == 0:
+                time.sleep(0.05)
+                assert len(fed) <= consumed + 4
+        assert 100 == consumed
+
+    def test_bounded_imap_raises_errors(self):
+        try:
+            list(bounded_imap(self.pool, fail_on_three, range(10), max_queued=2))
+            self.fail('PipelineError not raised')
+        except PipelineError as e:
+            assert 'three' in str(e)
+
+    def test_bounded_imap_raises_items_iteration_errors(self):
+        def items():
+            yield 1
+            raise Exception('walk failed')
+
+        try:
+            list(bounded_imap(self.pool, square, items(), max_queued=2))
+            self.fail('PipelineError not raised')
+        except PipelineError as e:
+            assert 'walk failed' in str(e)
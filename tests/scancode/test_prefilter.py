@@ -0,0 +1,79 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import os
+
+from commoncode.testcase import FileBasedTesting
+
+from scancode.prefilter import get_prefilters
+from scancode.prefilter import get_skipped_scans
+from scancode.prefilter import SkippedScans
+from scancode.prefilter import TEXT_SCANS
+
+
+class TestPrefilter(FileBasedTesting):
+    test_data_dir = os.path.join(os.path.dirname(__file__), 'data')
+
+    def check_skipped(self, file_name, prefilters):
+        test_file = self.get_test_loc(os.path.join('prefilter', file_name))
+        skipped = get_skipped_scans(test_file, prefilters, TEXT_SCANS + ('packages',))
+        return sorted(set(skipped.values())), list(skipped.keys())
+
+    def test_get_skipped_scans_with_default_prefilters(self):
+        prefilters = get_prefilters()
+        assert (['empty'], list(TEXT_SCANS)) == self.check_skipped('empty.txt', prefilters)
+        assert (['no_text'], list(TEXT_SCANS)) == self.check_skipped('sample.png', prefilters)
+        assert ([], []) == self.check_skipped('sample1.jpg', prefilters)
+        assert ([], []) == self.check_skipped('zeros.bin', prefilters)
+        assert ([], []) == self.check_skipped('apache-1.0.txt', prefilters)
+
+    def test_get_skipped_scans_with_optional_prefilters(self):
+        prefilters = get_prefilters(['media', 'low-entropy'])
+        assert (['media'], list(TEXT_SCANS)) == self.check_skipped('sample1.jpg', prefilters)
+        assert (['low-entropy'], list(TEXT_SCANS)) == self.check_skipped('zeros.bin', prefilters)
+        assert ([], []) == self.check_skipped('apache-1.0.txt', prefilters)
+
+    def test_get_skipped_scans_does_not_filter_directories(self):
+        test_dir = self.get_test_loc('prefilter')
+        assert {} == get_skipped_scans(test_dir, get_prefilters(), TEXT_SCANS)
+
+    def test_SkippedScans_counts_files_and_scans_by_prefilter(self):
+        skipped_scans = SkippedScans()
+        skipped_scans.add(OrderedDict([('licenses', 'empty'), ('copyrights', 'empty')]))
+        skipped_scans.add(OrderedDict([('licenses', 'empty')]))
+        skipped_scans.add(OrderedDict())
+        skipped_scans.add(None)
+        expected = OrderedDict([
+            ('empty', OrderedDict([
+                ('files_count', 2),
+                ('scans', OrderedDict([('licenses', 2), ('copyrights', 1)]))])),
+        ])
+        assert expected == skipped_scans.summary()
+        assert ['  empty: 2 files (licenses: 2, copyrights: 1)'] == skipped_scans.report()
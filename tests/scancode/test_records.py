@@ -0,0 +1,81 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import json
+import os
+
+from commoncode.testcase import FileBasedTesting
+
+from scancode import records
+
+
+class TestRecords(FileBasedTesting):
+    test_data_dir = os.path.join(os.path.dirname(__file__), 'data')
+
+    def test_records_roundtrip_values(self):
+        values = [
+            None, True, False, 0, 127, 128, 2 ** 70, -1, -300, 1.5, -0.25,
+            '', 'abc', 'caf\xe9 \u4e2d', b'bytes', [], [1, [2, [3]]], (1, 2),
+            OrderedDict(),
+            OrderedDict([('b', 1), ('a', OrderedDict([('b', 2), ('a', None)]))]),
+        ]
+        for value in values:
+            expected = list(value) if isinstance(value, tuple) else value
+            assert expected == records.loads(records.dumps(value))
+
+    def test_records_keep_mapping_keys_order_and_share_shapes(self):
+        lines = [OrderedDict([('start_line', i), ('end_line', i + 1)]) for i in range(200)]
+        value = OrderedDict([('zzz', lines), ('emails', 'a@b.com'), ('aaa', 'a@b.com')])
+        data = records.dumps(value)
+        result = records.loads(data)
+        assert value == result
+        assert ['zzz', 'emails', 'aaa'] == list(result)
+        # the keys are stored once and line numbers are varints
+        assert len(data) < len(json.dumps(value)) / 4
+
+    def test_records_loads_scan_results_as_json_does(self):
+        test_file = self.get_test_loc('records/scan.json')
+        with open(test_file, 'rb') as scan:
+            data = scan.read()
+        expected = json.loads(data, object_pairs_hook=OrderedDict)
+        record = records.dumps(expected)
+        assert expected == records.loads(record)
+        assert len(record) < len(data) / 2
+
+    def test_records_loads_rejects_invalid_records(self):
+        self.assertRaises(records.RecordError, records.loads, b'{}')
+        record = records.dumps(OrderedDict([('key', 'value')]))
+        self.assertRaises(records.RecordError, records.loads, record[:-2])
+        self.assertRaises(records.RecordError, records.dumps, set())
+
+    def test_is_record(self):
+        assert records.is_record(records.dumps([]))
+        assert not records.is_record(b'[]')
+        assert not records.is_record(b'')
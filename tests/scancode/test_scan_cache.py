@@ -31,7 +31,12 @@ import os
 
 from commoncode.testcase import FileBasedTesting
 
+from scancode.cache import get_scans_cache_class
+from scancode.cache import get_scans_store_dir
+from scancode.cache import ScanCacheError
+from scancode.cache import ScanDbCache
 from scancode.cache import ScanFileCache
+from scancode.cache import ScanFilter
 
 
 class TestCache(FileBasedTesting):
@@ -49,3 +54,234 @@ class TestCache(FileBasedTesting):
         cache.put_scan(path='abc', file_info=file_info, scan_result=package)
         assert file_info == cache.get_info(path='abc')
         assert package == cache.get_scan(path='abc', file_info=file_info)
+
+    def test_can_reuse_scans_from_store_across_caches(self):
+        file_info = dict(sha1='def')
+        scan_result = dict(licenses=[], scan_errors=[])
+        store_dir = self.get_temp_dir()
+
+        cache = ScanFileCache(self.get_temp_dir(), store_dir)
+        assert not cache.put_info(path='abc', file_info=file_info)
+        cache.put_scan(path='abc', file_info=file_info, scan_result=scan_result)
+        cache.clear()
+
+        cache2 = ScanFileCache(self.get_temp_dir(), store_dir)
+        assert cache2.put_info(path='other/abc', file_info=file_info)
+        assert scan_result == cache2.get_scan(path='other/abc', file_info=file_info)
+
+    def test_does_not_store_scans_with_errors(self):
+        file_info = dict(sha1='def')
+        scan_result = dict(licenses=[], scan_errors=['ERROR: timeout'])
+        store_dir = self.get_temp_dir()
+
+        cache = ScanFileCache(self.get_temp_dir(), store_dir)
+        cache.put_info(path='abc', file_info=file_info)
+        cache.put_scan(path='abc', file_info=file_info, scan_result=scan_result)
+        assert scan_result == cache.get_scan(path='abc', file_info=file_info)
+
+        cache2 = ScanFileCache(self.get_temp_dir(), store_dir)
+        assert not cache2.put_info(path='abc', file_info=file_info)
+        assert None == cache2.get_scan(path='abc', file_info=file_info)
+
+    def test_does_not_store_truncated_scans(self):
+        file_info = dict(sha1='def')
+        scan_result = dict(licenses=[], scan_errors=[], truncated_scans=['licenses'])
+        for cache_class in (ScanFileCache, ScanDbCache):
+            store_dir = self.get_temp_dir()
+            cache = cache_class(self.get_temp_dir(), store_dir)
+            cache.setup()
+            cache.put_info(path='abc', file_info=file_info)
+            cache.put_scan(path='abc', file_info=file_info, scan_result=scan_result)
+            assert scan_result == cache.get_scan(path='abc', file_info=file_info)
+            cache.clear()
+
+            cache2 = cache_class(self.get_temp_dir(), store_dir)
+            cache2.setup()
+            assert not cache2.put_info(path='abc', file_info=file_info)
+            assert None == cache2.get_scan(path='abc', file_info=file_info)
+
+    def test_get_scans_store_dir_depends_on_scan_options(self):
+        store_dir = self.get_temp_dir()
+        store1 = get_scans_store_dir(store_dir, dict(scans=['licenses']))
+        store2 = get_scans_store_dir(store_dir, dict(scans=['licenses']))
+        store3 = get_scans_store_dir(store_dir, dict(scans=['copyrights']))
+        assert store1 == store2
+        assert store1 != store3
+        assert os.path.isdir(store3)
+
+    def test_get_scans_cache_class_with_resume_dir_checks_scan_options(self):
+        resume_dir = self.get_temp_dir()
+        get_scans_cache_class(resume_dir=resume_dir, scan_options=dict(scans=['licenses']))
+        get_scans_cache_class(resume_dir=resume_dir, scan_options=dict(scans=['licenses']))
+        try:
+            get_scans_cache_class(resume_dir=resume_dir, scan_options=dict(scans=['copyrights']))
+            self.fail('Exception not raised')
+        except ScanCacheError as e:
+            assert 'different scan options' in str(e)
+
+    def test_db_cache_can_cache(self):
+        test_file = self.get_test_loc('cache/package/package.json')
+        from scancode import api
+        package = api.get_package_infos(test_file)
+        file_info = dict(sha1='def')
+
+        test_dir = self.get_temp_dir()
+        cache = ScanDbCache(test_dir)
+        cache.setup()
+        assert not cache.put_info(path='abc', file_info=file_info)
+        cache.put_scan(path='abc', file_info=file_info, scan_result=package)
+        assert file_info == cache.get_info(path='abc')
+        assert package == cache.get_scan(path='abc', file_info=file_info)
+        assert cache.put_info(path='abc', file_info=file_info)
+        assert None == cache.get_info(path='other')
+
+    def test_db_cache_can_reuse_scans_from_store_across_caches(self):
+        file_info = dict(sha1='def')
+        scan_result = dict(licenses=[], scan_errors=[])
+        store_dir = self.get_temp_dir()
+
+        cache = ScanDbCache(self.get_temp_dir(), store_dir)
+        cache.setup()
+        assert not cache.put_info(path='abc', file_info=file_info)
+        cache.put_scan(path='abc', file_info=file_info, scan_result=scan_result)
+        cache.clear()
+
+        cache2 = ScanDbCache(self.get_temp_dir(), store_dir)
+        cache2.setup()
+        assert cache2.put_info(path='other/abc', file_info=file_info)
+        assert scan_result == cache2.get_scan(path='other/abc', file_info=file_info)
+
+    def test_db_cache_saves_puts_in_batches(self):
+        import sqlite3
+        from scancode.cache import DB_BATCH_PUTS
+        file_info = dict(sha1='def')
+        cache = ScanDbCache(self.get_temp_dir())
+        cache.setup()
+        other = sqlite3.connect(cache.cache_db)
+        count_infos = lambda: other.execute('SELECT count(*) FROM infos').fetchone()[0]
+
+        cache.put_info(path='abc', file_info=file_info)
+        # a put not yet saved is visible only in the thread that put it
+        assert file_info == cache.get_info(path='abc')
+        assert 0 == count_infos()
+        cache.flush()
+        assert 1 == count_infos()
+
+        for i in range(DB_BATCH_PUTS + 1):
+            cache.put_info(path='path%d' % i, file_info=file_info)
+        assert 1 + DB_BATCH_PUTS == count_infos()
+        cache.flush()
+        assert 2 + DB_BATCH_PUTS == count_infos()
+        other.close()
+        cache.clear()
+
+    def test_can_cache_with_binary_records(self):
+        test_file = self.get_test_loc('cache/package/package.json')
+        from scancode import api
+        package = api.get_package_infos(test_file)
+        file_info = dict(sha1='def')
+
+        for cache_class in (ScanFileCache, ScanDbCache):
+            cache = cache_class(self.get_temp_dir(), record_format='binary')
+            cache.setup()
+            cache.put_info(path='abc', file_info=file_info)
+            cache.put_scan(path='abc', file_info=file_info, scan_result=package)
+            assert file_info == cache.get_info(path='abc')
+            assert package == cache.get_scan(path='abc', file_info=file_info)
+            cache.clear()
+
+    def test_can_reuse_json_scans_from_store_with_binary_records(self):
+        file_info = dict(sha1='def')
+        scan_result = dict(licenses=[], scan_errors=[])
+
+        for cache_class in (ScanFileCache, ScanDbCache):
+            store_dir = self.get_temp_dir()
+            cache = cache_class(self.get_temp_dir(), store_dir, record_format='json')
+            cache.setup()
+            cache.put_info(path='abc', file_info=file_info)
+            cache.put_scan(path='abc', file_info=file_info, scan_result=scan_result)
+            cache.clear()
+
+            cache2 = cache_class(self.get_temp_dir(), store_dir, record_format='binary')
+            cache2.setup()
+            assert cache2.put_info(path='abc', file_info=file_info)
+            assert scan_result == cache2.get_scan(path='abc', file_info=file_info)
+            cache2.clear()
+
+    def test_iterate_with_scan_filter_uses_scans_index(self):
+        gpl = dict(key='gpl-2.0', score=100.0)
+        mit = dict(key='mit', score=100.0)
+        scans = [
+            ('src/a.c', dict(sha1='a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1'), dict(licenses=[gpl, gpl], copyrights=[], scan_errors=[])),
+            ('src/sub/b.c', dict(sha1='b2b2b2b2b2b2b2b2b2b2b2b2b2b2b2b2b2b2b2b2'), dict(licenses=[mit], copyrights=[], scan_errors=[])),
+            ('src2/c.c', dict(sha1='c3c3c3c3c3c3c3c3c3c3c3c3c3c3c3c3c3c3c3c3'), dict(licenses=[], copyrights=[], scan_errors=['ERROR: timeout'])),
+            ('doc/d.txt', dict(sha1='d4d4d4d4d4d4d4d4d4d4d4d4d4d4d4d4d4d4d4d4'), dict(licenses=[], copyrights=[], scan_errors=[])),
+        ]
+        # a duplicate of src/a.c: it is not indexed
+        duplicate = ('src3/e.c', dict(sha1='a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1a1'))
+
+        for cache_class in (ScanFileCache, ScanDbCache):
+            cache = cache_class(self.get_temp_dir(), with_index=True)
+            cache.setup()
+            with open(cache.cache_files_log, 'wb') as files_log:
+                for path, file_info, scan_result in scans:
+                    cache.log_file_path(files_log, path)
+                    cache.put_info(path, file_info)
+                    cache.put_scan(path, file_info, scan_result)
+                cache.log_file_path(files_log, duplicate[0])
+                cache.put_info(*duplicate)
+
+            def iterated(**kwargs):
+                scan_filter = ScanFilter(**kwargs) if kwargs else None
+                results = cache.iterate(['licenses', 'copyrights'], scan_filter=scan_filter)
+                return [r['path'] for r in results]
+
+            assert ['src/a.c', 'src/sub/b.c', 'src2/c.c', 'doc/d.txt', 'src3/e.c'] == iterated()
+            assert ['src/a.c', 'src/sub/b.c', 'src2/c.c', 'src3/e.c'] == iterated(findings=['licenses'])
+            assert ['src2/c.c'] == iterated(findings=['copyrights'])
+            assert ['src2/c.c'] == iterated(with_errors=True)
+            assert ['src/a.c', 'src3/e.c'] == iterated(license_keys=['gpl-2.0'])
+            assert ['src/a.c', 'src/sub/b.c'] == iterated(path_prefix='src/')
+            assert ['src/sub/b.c'] == iterated(path_prefix='src', license_keys=['mit'])
+
+            results = cache.iterate(['licenses'], paths_subset=['doc/d.txt', 'src/a.c'])
+            assert ['doc/d.txt', 'src/a.c'] == [r['path'] for r in results]
+            cache.clear()
+
+    def test_cache_saves_scans_index_entries_only_with_index(self):
+        file_info = dict(sha1='def')
+        scan_result = dict(licenses=[dict(key='mit')], scan_errors=[])
+        for cache_class in (ScanFileCache, ScanDbCache):
+            cache = cache_class(self.get_temp_dir())
+            cache.setup()
+            cache.put_info(path='abc', file_info=file_info)
+            cache.put_scan(path='abc', file_info=file_info, scan_result=scan_result)
+            assert {} == cache.get_index()
+            cache.clear()
+
+            cache = cache_class(self.get_temp_dir(), with_index=True)
+            cache.setup()
+            cache.put_info(path='abc', file_info=file_info)
+            cache.put_scan(path='abc', file_info=file_info, scan_result=scan_result)
+            assert [['mit']] == [entry['licenses'] for entry in cache.get_index().values()]
+            cache.clear()
+
+    def test_cache_creates_no_directories_after_setup(self):
+        file_info = dict(sha1='da39a3ee5e6b4b0d3255bfef95601890afd80709')
+        scan_result = dict(licenses=[], scan_errors=[])
+        cache = ScanFileCache(self.get_temp_dir(), self.get_temp_dir())
+        cache.setup()
+
+        from commoncode import fileutils
+        create_dir = fileutils.create_dir
+        def failing_create_dir(location):
+            raise Exception('Unexpected directory creation: %(location)r' % locals())
+        try:
+            fileutils.create_dir = failing_create_dir
+            assert not cache.put_info(path='abc', file_info=file_info)
+            cache.put_scan(path='abc', file_info=file_info, scan_result=scan_result)
+            assert file_info == cache.get_info(path='abc')
+            assert scan_result == cache.get_scan(path='abc', file_info=file_info)
+            assert None == cache.get_info(path='other')
+        finally:
+            fileutils.create_dir = create_dir
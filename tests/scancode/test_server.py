@@ -0,0 +1,101 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import json
+import os
+from threading import Thread
+from unittest import TestCase
+import urllib2
+
+from commoncode.testcase import FileBasedTesting
+
+from scancode.server import get_format
+from scancode.server import ScanServer
+
+
+class TestScanServer(FileBasedTesting):
+
+    def setUp(self):
+        self.server = ScanServer(('127.0.0.1', 0), max_requests=1)
+        self.url = 'http://127.0.0.1:%d/' % self.server.server_port
+        thread = Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def post(self, path, data):
+        try:
+            response = urllib2.urlopen(self.url + path, json.dumps(data))
+            return response.getcode(), response.info(), response.read()
+        except urllib2.HTTPError as e:
+            return e.code, e.info(), e.read()
+
+    def test_ScanServer_scans_and_reports_metrics(self):
+        test_dir = self.get_temp_dir()
+        with open(os.path.join(test_dir, 'a.txt'), 'wb') as f:
+            f.write(b'Copyright (c) 2017 Some Holder\n')
+
+        status, headers, content = self.post('scan', {'args': ['--copyright', '--strip-root', test_dir]})
+        assert 200 == status
+        assert 'application/json' == headers['Content-Type']
+        assert '0' == headers['X-ScanCode-Exit-Code']
+        results = json.loads(content)
+        assert 1 == results['files_count']
+        assert 'a.txt' == results['files'][0]['path']
+        assert 'Copyright (c) 2017' in results['files'][0]['copyrights'][0]['statements'][0]
+
+        status, _headers, content = self.post('scan', {'args': ['--bogus', test_dir]})
+        assert 400 == status
+        assert 'no such option: --bogus' in json.loads(content)['error']
+
+        metrics = json.loads(urllib2.urlopen(self.url + 'metrics').read())
+        assert 2 == metrics['requests']
+        assert 1 == metrics['completed']
+        assert 1 == metrics['failed']
+        assert 0 == metrics['active_requests']
+
+    def test_ScanServer_rejects_requests_over_the_concurrency_limit(self):
+        self.server.requests_limit.acquire()
+        try:
+            status, headers, _content = self.post('scan', {'args': ['--copyright', self.get_temp_dir()]})
+        finally:
+            self.server.requests_limit.release()
+        assert 503 == status
+        assert '1' == headers['Retry-After']
+
+
+class TestGetFormat(TestCase):
+
+    def test_get_format(self):
+        assert 'json' == get_format(['--license', 'path'])
+        assert 'html' == get_format(['-f', 'html', 'path'])
+        assert 'jsonlines' == get_format(['--format=jsonlines', 'path'])
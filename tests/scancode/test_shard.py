@@ -0,0 +1,111 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+from unittest import TestCase
+
+from scancode.shard import merge_shards
+from scancode.shard import parse_shard
+from scancode.shard import Shard
+from scancode.shard import ShardMergeError
+
+
+class TestShard(TestCase):
+
+    def test_parse_shard(self):
+        assert (2, 3) == parse_shard('2/3')
+        for invalid in ('0/3', '4/3', '3', 'a/b', '1/0'):
+            try:
+                parse_shard(invalid)
+                self.fail('ValueError not raised for: ' + invalid)
+            except ValueError:
+                pass
+
+    def test_Shard_assigns_each_path_to_a_single_shard(self):
+        paths = ['dir/file%d.c' % i for i in range(100)]
+        shards = [Shard(number, 3) for number in (1, 2, 3)]
+        for path in paths:
+            assert 1 == sum(path in shard for shard in shards)
+        assert all(any(path in shard for path in paths) for shard in shards)
+
+    def test_Shard_by_size_balances_the_shards_total_sizes(self):
+        sized_paths = [('a', 10), ('b', 7), ('c', 5), ('d', 4), ('e', 3), ('f', 1)]
+        totals = []
+        for number in (1, 2):
+            shard = Shard(number, 2, by='size')
+            shard.index_sizes(sized_paths)
+            totals.append(sum(size for path, size in sized_paths if path in shard))
+        assert [15, 15] == totals
+
+
+class TestMergeShards(TestCase):
+
+    def get_scan(self, shard, paths, **options):
+        scan_options = OrderedDict([('--copyright', True), ('--shard', shard), ('--shard-by', 'path')])
+        scan_options.update(options)
+        header = OrderedDict([
+            ('scancode_notice', 'notice'),
+            ('scancode_version', '2.2.1'),
+            ('scancode_options', scan_options),
+            ('files_count', len(paths)),
+        ])
+        return header, [OrderedDict([('path', path)]) for path in paths]
+
+    def test_merge_shards_merges_the_files_sorted_by_path(self):
+        scans = [
+            self.get_scan('2/2', ['root/b', 'root/a/c']),
+            self.get_scan('1/2', ['root', 'root/a', 'root/a-b']),
+        ]
+        header, files = merge_shards(scans)
+        assert ['root', 'root/a', 'root/a/c', 'root/a-b', 'root/b'] == [f['path'] for f in files]
+        assert 5 == header['files_count']
+        assert OrderedDict([('--copyright', True)]) == header['scancode_options']
+
+    def test_merge_shards_fails_on_missing_or_duplicated_shards(self):
+        scans = [self.get_scan('1/3', ['a']), self.get_scan('3/3', ['b'])]
+        try:
+            merge_shards(scans)
+            self.fail('ShardMergeError not raised')
+        except ShardMergeError as e:
+            assert 'missing shards: 2/3' == str(e)
+
+        scans = [self.get_scan('1/2', ['a']), self.get_scan('1/2', ['b'])]
+        try:
+            merge_shards(scans)
+            self.fail('ShardMergeError not raised')
+        except ShardMergeError as e:
+            assert 'shard 1/2 is duplicated' == str(e)
+
+    def test_merge_shards_fails_on_different_options(self):
+        scans = [self.get_scan('1/2', ['a']), self.get_scan('2/2', ['b'], **{'--email': True})]
+        try:
+            merge_shards(scans)
+            self.fail('ShardMergeError not raised')
+        except ShardMergeError as e:
+            assert 'different' in str(e)
@@ -0,0 +1,64 @@
+#
+# Copyright (c) 2017 nexB Inc. and others. All rights reserved.
+# http://nexb.com and https://github.com/nexB/scancode-toolkit/
+# The ScanCode software is licensed under the Apache License version 2.0.
+# Data generated with ScanCode require an acknowledgment.
+# ScanCode is a trademark of nexB Inc.
+#
+# You may not use this software except in compliance with the License.
+# You may obtain a copy of the License at: http://apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+#
+# When you publish or redistribute any data created with ScanCode or any ScanCode
+# derivative work, you must accompany this data with the following acknowledgment:
+#
+#  Generated with ScanCode and provided on an "AS IS" BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, either express or implied. No content created from
+#  ScanCode should be considered or used as legal advice. Consult an Attorney
+#  for any legal advice.
+#  ScanCode is a free software code scanning tool from nexB Inc. and others.
+#  Visit https://github.com/nexB/scancode-toolkit/ for support and download.
+
+
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+from unittest import TestCase
+
+from scancode.timing import ScanTimings
+
+
+class TestScanTimings(TestCase):
+
+    def test_ScanTimings_aggregates_scanners_totals_and_histograms(self):
+        timings = ScanTimings(top=2, buckets=(0.1, 1))
+        timings.add('a', OrderedDict([('licenses', (0.5, 100)), ('copyrights', (0.05, 120))]))
+        timings.add('b', OrderedDict([('licenses', (2.0, 300)), ('copyrights', (0.02, 90))]))
+        timings.add('c', None)
+
+        summary = timings.summary()
+        licenses = summary['scanners']['licenses']
+        assert 2 == licenses['files_count']
+        assert 2.5 == licenses['total_time']
+        assert 2.0 == licenses['max_time']
+        assert 300 == licenses['max_peak_rss']
+        assert [0, 1, 1] == licenses['histogram']
+        assert [2, 0, 0] == summary['scanners']['copyrights']['histogram']
+
+    def test_ScanTimings_reports_the_slowest_files_first(self):
+        timings = ScanTimings(top=2)
+        timings.add('fast', {'licenses': (0.1, 0)})
+        timings.add('slowest', {'licenses': (3.0, 0)})
+        timings.add('slow', {'licenses': (1.0, 0)})
+        timings.add('faster', {'licenses': (0.01, 0)})
+
+        slowest = [slow['path'] for slow in timings.summary()['slowest_files']]
+        assert ['slowest', 'slow'] == slowest
+        report = timings.report()
+        assert 'Slowest files:' in report
+        assert '  3.00s slowest (licenses: 3.00s)' in report